@@ -0,0 +1,46 @@
+"""
+pytest-benchmark suite of hot view code paths, run against the recorded
+upstream payloads in zomato_core/fixtures/upstream.
+
+    pytest benchmarks --benchmark-autosave    # save a baseline
+    pytest benchmarks --benchmark-compare     # compare with the latest one
+
+Comparing fails once a benchmark's minimum time regressed by more than
+BENCHMARK_MAX_REGRESSION percent, 15 by default, unless
+--benchmark-compare-fail says otherwise.
+"""
+import json
+import os
+from pathlib import Path
+from typing import Callable, Dict
+
+import pytest
+from django.test import RequestFactory
+from pytest_benchmark.utils import parse_compare_fail
+
+from zomato_search.users.tests.factories import UserFactory
+
+FIXTURES = Path(__file__).resolve().parent.parent / 'zomato_search' / 'zomato_core' / 'fixtures' / 'upstream'
+
+
+@pytest.hookimpl(tryfirst=True)
+def pytest_configure(config):
+    if config.getoption('benchmark_compare', None) and not config.getoption('benchmark_compare_fail', None):
+        threshold = os.environ.get('BENCHMARK_MAX_REGRESSION', '15')
+        config.option.benchmark_compare_fail = [parse_compare_fail(f'min:{threshold}%')]
+
+
+@pytest.fixture(scope='session')
+def upstream() -> Callable[[str], Dict]:
+    """Loads a recorded upstream response by name, e.g. 'search'."""
+    def load(name: str) -> Dict:
+        return json.loads((FIXTURES / f'{name}.json').read_text())
+    return load
+
+
+@pytest.fixture
+def page_request():
+    """GET request of a signed in user that was never saved."""
+    request = RequestFactory().get('/')
+    request.user = UserFactory.build()
+    return request
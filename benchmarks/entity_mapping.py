@@ -0,0 +1,86 @@
+"""
+Search page -> entity mapping: the hand-written loop with ``__dict__``
+entities it replaced, against ``SEARCH_RESTAURANT`` with slotted ones.
+
+    python -m benchmarks.entity_mapping [--pages 500]
+"""
+import argparse
+import json
+import timeit
+import tracemalloc
+from pathlib import Path
+
+from zomato_search.zomato_core.classes.mapping import SEARCH_RESTAURANT
+
+FIXTURES = Path(__file__).resolve().parent.parent / 'zomato_search' / 'zomato_core' / 'fixtures' / 'upstream'
+
+
+class DictRestaurant:
+    def __init__(self):
+        self.id = None
+        self.name = None
+        self.url = None
+        self.rating = None
+        self.average_cost_for_two = None
+        self.thumbnail_url = None
+        self.has_online_delivery = None
+        self.cuisines = None
+        self.phone_numbers = None
+        self.address = None
+        self.location = None
+        self.photos_url = None
+        self.menu_url = None
+        self.review_count = None
+        self.review_average = None
+
+
+def map_by_hand(data):
+    restaurants = list()
+    for item in data['restaurants']:
+        restaurant = DictRestaurant()
+        item = item['restaurant']
+        restaurant.id = item['id']
+        restaurant.name = item['name']
+        restaurant.url = item['url'].split('?')[0]
+        restaurant.has_online_delivery = item['has_online_delivery']
+        restaurant.cuisines = item['cuisines']
+        restaurant.average_cost_for_two = item['average_cost_for_two']
+        restaurant.phone_numbers = item['phone_numbers']
+        restaurant.thumbnail_url = item['thumb']
+        restaurant.location = item['location']['locality']
+        restaurants.append(restaurant)
+    return restaurants
+
+
+def map_by_schema(data):
+    return SEARCH_RESTAURANT.map_many(data['restaurants'])
+
+
+def retained_bytes(map_page, data, pages: int) -> int:
+    """Memory held by the entities of ``pages`` mapped pages."""
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    kept = [map_page(data) for _ in range(pages)]
+    retained = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    del kept
+    return retained
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--pages', type=int, default=500)
+    args = parser.parse_args()
+
+    data = json.loads((FIXTURES / 'search.json').read_text())
+    assert [r.__dict__ for r in map_by_hand(data)] == [r.as_dict() for r in map_by_schema(data)]
+
+    print(f'{"":8} {"us/page":>10} {"bytes/page":>12}')
+    for name, map_page in (('by hand', map_by_hand), ('schema', map_by_schema)):
+        runs = timeit.repeat(lambda: map_page(data), number=args.pages, repeat=5)
+        per_page = min(runs) / args.pages * 1e6
+        print(f'{name:8} {per_page:10.1f} {retained_bytes(map_page, data, args.pages) / args.pages:12.0f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,28 @@
+from zomato_search.zomato_core.classes.zomato_handler import ZomatoHandler
+from zomato_search.zomato_core.views import SearchCuisine, SearchResults
+
+
+class FixtureHandler(ZomatoHandler):
+    def __init__(self, cuisines):
+        self.cuisines = cuisines
+
+    def get_cuisines(self):
+        return self.cuisines
+
+
+def test_search_results_restaurants(benchmark, upstream):
+    page = upstream('search')
+
+    restaurants = benchmark(SearchResults()._get_restaurants, page)
+
+    assert len(restaurants) == len(page['restaurants'])
+
+
+def test_search_cuisine_items(benchmark, upstream):
+    handler = FixtureHandler(upstream('cuisines'))
+    view = SearchCuisine()
+    view.api = handler
+
+    cuisines = benchmark(view.get_items)
+
+    assert len(cuisines) == len(handler.cuisines['cuisines'])
@@ -0,0 +1,40 @@
+import pytest
+
+from zomato_search.users.models import User
+from zomato_search.zomato_core.models import Review, RestaurantReviewStats
+from zomato_search.zomato_core.views import RestaurantDetails
+
+REVIEWS = 10000
+RESTAURANTS = 5
+
+
+@pytest.fixture
+def reviews(db):
+    User.objects.bulk_create(User(username=f'user{index}') for index in range(REVIEWS // RESTAURANTS))
+    Review.objects.bulk_create(
+        (Review(user=user, restaurant_id=restaurant_id, text='Good food, slow service', rating=user.id % 5 + 1)
+         for user in User.objects.all() for restaurant_id in range(1, RESTAURANTS + 1))
+    )
+    RestaurantReviewStats.rebuild()
+    return list(Review.objects.filter(restaurant_id=1).order_by('-id').values_list('id', flat=True))
+
+
+def test_first_review_page(benchmark, reviews):
+    page, before = benchmark(RestaurantDetails()._get_reviews, 1)
+
+    assert [review.id for review in page] == reviews[:RestaurantDetails.REVIEWS_PAGE_SIZE]
+
+
+def test_deep_review_page(benchmark, reviews):
+    before = reviews[len(reviews) // 2]
+
+    page, _ = benchmark(RestaurantDetails()._get_reviews, 1, before=before)
+
+    # The reviews already shown come first, then the next page.
+    assert [review.id for review in page] == reviews[:len(reviews) // 2 + 1 + RestaurantDetails.REVIEWS_PAGE_SIZE]
+
+
+def test_review_stats(benchmark, reviews):
+    stats = benchmark(RestaurantDetails()._get_review_stats, 1)
+
+    assert stats.count == len(reviews) == REVIEWS // RESTAURANTS
@@ -0,0 +1,41 @@
+from django.template import engines
+from django.template.loader import render_to_string
+from django.utils.html import escape
+
+from zomato_search.zomato_core.classes.codec import project_restaurant
+from zomato_search.zomato_core.forms.review_form import ReviewForm
+from zomato_search.zomato_core.models import Review, RestaurantReviewStats
+from zomato_search.zomato_core.views import RestaurantDetails, SearchResults
+
+
+def test_render_search_results(benchmark, upstream, page_request):
+    context = SearchResults()._get_context(upstream('search'), 20, 0, 'cuisines', ['1'])
+
+    html = benchmark(render_to_string, 'search_results.html', context, page_request)
+
+    assert escape(context['restaurants'][0].name.upper()) in html
+
+
+def test_render_restaurant_details(benchmark, upstream, page_request):
+    restaurant = RestaurantDetails.build_restaurant(1, project_restaurant(upstream('restaurant')))
+    reviews = [Review(id=id, user=page_request.user, restaurant_id=1, text='Good food, slow service', rating=4)
+               for id in range(RestaurantDetails.REVIEWS_PAGE_SIZE, 0, -1)]
+    context = {
+        'restaurant': restaurant,
+        'reviews': reviews,
+        'next_reviews': 1,
+        'review_stats': RestaurantReviewStats(restaurant_id=1, count=20, total=80, rating_4=20),
+        'review_form': ReviewForm(),
+    }
+
+    html = benchmark(render_to_string, 'restaurant_details.html', context, page_request)
+
+    assert escape(restaurant.name.upper()) in html
+
+
+def test_render_review_form(benchmark, page_request):
+    template = engines['django'].from_string('{% load material_form %}{% form form=form %}{% endform %}')
+
+    html = benchmark(template.render, {'form': ReviewForm()}, page_request)
+
+    assert 'name="rating"' in html
@@ -0,0 +1,36 @@
+"""
+Gunicorn settings, see http://docs.gunicorn.org/en/stable/settings.html
+
+Views spend most of their time waiting on the Zomato API, so each worker
+process serves requests from a pool of threads instead of one at a time.
+
+Prometheus metrics run in multiprocess mode: workers write their samples
+to files under prometheus_multiproc_dir and /metrics sums them, whichever
+worker serves the scrape.
+"""
+import multiprocessing
+import os
+import shutil
+import tempfile
+
+workers = int(os.environ.get("WEB_CONCURRENCY", multiprocessing.cpu_count() * 2 + 1))
+worker_class = "gthread"
+threads = int(os.environ.get("GUNICORN_THREADS", 16))
+timeout = int(os.environ.get("GUNICORN_TIMEOUT", 30))
+keepalive = 5
+
+# Must be set before workers import prometheus_client.
+os.environ.setdefault("prometheus_multiproc_dir", os.path.join(tempfile.gettempdir(), "zomato_search_metrics"))
+
+
+def on_starting(server):
+    # Samples of a previous run would be summed into this one.
+    directory = os.environ["prometheus_multiproc_dir"]
+    shutil.rmtree(directory, ignore_errors=True)
+    os.makedirs(directory)
+
+
+def child_exit(server, worker):
+    from prometheus_client import multiprocess
+
+    multiprocess.mark_process_dead(worker.pid)
@@ -134,6 +134,8 @@ AUTH_PASSWORD_VALIDATORS = [
 # ------------------------------------------------------------------------------
 # https://docs.djangoproject.com/en/dev/ref/settings/#middleware
 MIDDLEWARE = [
+    "zomato_search.zomato_core.middleware.ViewMetricsMiddleware",
+    "zomato_search.zomato_core.middleware.ServerTimingMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.locale.LocaleMiddleware",
@@ -171,7 +173,10 @@ MEDIA_URL = "/media/"
 TEMPLATES = [
     {
         # https://docs.djangoproject.com/en/dev/ref/settings/#std:setting-TEMPLATES-BACKEND
-        "BACKEND": "django.template.backends.django.DjangoTemplates",
+        # Renders are timed for the Server-Timing header.
+        "BACKEND": "zomato_search.utils.template_backends.TimedDjangoTemplates",
+        # Keeps the engine alias of the stock backend, engines["django"].
+        "NAME": "django",
         # https://docs.djangoproject.com/en/dev/ref/settings/#template-dirs
         "DIRS": [str(APPS_DIR.path("templates"))],
         "OPTIONS": {
@@ -273,5 +278,105 @@ ACCOUNT_ADAPTER = "zomato_search.users.adapters.AccountAdapter"
 SOCIALACCOUNT_ADAPTER = "zomato_search.users.adapters.SocialAccountAdapter"
 
 
+# django-rest-framework
+# ------------------------------------------------------------------------------
+# https://www.django-rest-framework.org/api-guide/settings/
+REST_FRAMEWORK = {
+    "DEFAULT_AUTHENTICATION_CLASSES": [
+        "rest_framework.authentication.SessionAuthentication",
+        "rest_framework.authentication.BasicAuthentication",
+    ],
+    "DEFAULT_PERMISSION_CLASSES": ["rest_framework.permissions.IsAuthenticated"],
+    "DEFAULT_VERSIONING_CLASS": "rest_framework.versioning.NamespaceVersioning",
+    "ALLOWED_VERSIONS": ["v1"],
+}
+
+
 # Your stuff...
 # ------------------------------------------------------------------------------
+
+# Zomato
+# ------------------------------------------------------------------------------
+ZOMATO_API_HOST = env("ZOMATO_API_HOST", default="https://developers.zomato.com/api/v2.1")
+# Keep-alive connections each worker process holds open to the API.
+ZOMATO_API_POOL_SIZE = env.int("ZOMATO_API_POOL_SIZE", default=10)
+# Concurrent connections of an AsyncZomatoClient.
+ZOMATO_ASYNC_API_POOL_SIZE = env.int("ZOMATO_ASYNC_API_POOL_SIZE", default=100)
+# (connect, read) seconds per upstream call.
+ZOMATO_API_TIMEOUT = (
+    env.float("ZOMATO_API_CONNECT_TIMEOUT", default=3.05),
+    env.float("ZOMATO_API_READ_TIMEOUT", default=10),
+)
+# Calls the API key may make per day, shared by every worker.
+ZOMATO_DAILY_QUOTA = env.int("ZOMATO_DAILY_QUOTA", default=1000)
+# Bump to drop every cached upstream payload after a payload format change.
+ZOMATO_CACHE_VERSION = env.int("ZOMATO_CACHE_VERSION", default=1)
+# Seconds each reference-data endpoint is served from the cache.
+ZOMATO_CACHE_TIMEOUTS = {
+    "cuisines": env.int("ZOMATO_CUISINES_CACHE_TIMEOUT", default=60 * 60 * 24),
+    "categories": env.int("ZOMATO_CATEGORIES_CACHE_TIMEOUT", default=60 * 60 * 24),
+    "types": env.int("ZOMATO_TYPES_CACHE_TIMEOUT", default=60 * 60 * 24),
+}
+# Search result pages kept per worker, keyed on the normalized query.
+ZOMATO_SEARCH_CACHE_TIMEOUT = env.int("ZOMATO_SEARCH_CACHE_TIMEOUT", default=60 * 10)
+ZOMATO_SEARCH_CACHE_MAX_ENTRIES = env.int("ZOMATO_SEARCH_CACHE_MAX_ENTRIES", default=1000)
+# Search pages after the one shown are fetched ahead into a short-lived store,
+# until ZOMATO_PREFETCH_QUOTA_SHARE of the daily quota is used.
+ZOMATO_PREFETCH_DEPTH = env.int("ZOMATO_PREFETCH_DEPTH", default=1)
+ZOMATO_PREFETCH_TIMEOUT = env.int("ZOMATO_PREFETCH_TIMEOUT", default=60 * 2)
+ZOMATO_PREFETCH_MAX_ENTRIES = env.int("ZOMATO_PREFETCH_MAX_ENTRIES", default=500)
+ZOMATO_PREFETCH_QUOTA_SHARE = env.float("ZOMATO_PREFETCH_QUOTA_SHARE", default=0.5)
+# Restaurant details are refreshed in the background once older than the soft
+# timeout, and evicted after the hard timeout.
+ZOMATO_DETAILS_CACHE_SOFT_TIMEOUT = env.int("ZOMATO_DETAILS_CACHE_SOFT_TIMEOUT", default=60 * 15)
+ZOMATO_DETAILS_CACHE_HARD_TIMEOUT = env.int("ZOMATO_DETAILS_CACHE_HARD_TIMEOUT", default=60 * 60 * 24)
+# Identical upstream calls in flight are coalesced. Other workers wait up to
+# ZOMATO_FLIGHT_TIMEOUT seconds for the caller holding the lock.
+ZOMATO_FLIGHT_TIMEOUT = env.float("ZOMATO_FLIGHT_TIMEOUT", default=15)
+ZOMATO_FLIGHT_POLL_INTERVAL = env.float("ZOMATO_FLIGHT_POLL_INTERVAL", default=0.05)
+# Searches on facets mirrored by sync_restaurants within ZOMATO_CATALOG_MAX_AGE
+# seconds are answered from the database.
+ZOMATO_LOCAL_SEARCH = env.bool("ZOMATO_LOCAL_SEARCH", default=True)
+ZOMATO_CATALOG_MAX_AGE = env.int("ZOMATO_CATALOG_MAX_AGE", default=60 * 60 * 24 * 7)
+# sync_restaurants stops once this share of the daily quota is used.
+ZOMATO_SYNC_QUOTA_SHARE = env.float("ZOMATO_SYNC_QUOTA_SHARE", default=0.8)
+# Restaurants in upstream search responses are added to the mirror's text
+# index, searched with PostgreSQL full-text search or, on other databases, an
+# in-process index rebuilt every ZOMATO_TEXT_INDEX_MAX_AGE seconds.
+ZOMATO_INGEST_SEARCH_RESULTS = env.bool("ZOMATO_INGEST_SEARCH_RESULTS", default=True)
+ZOMATO_TEXT_INDEX_MAX_AGE = env.int("ZOMATO_TEXT_INDEX_MAX_AGE", default=60 * 5)
+ZOMATO_TEXT_SEARCH_LIMIT = env.int("ZOMATO_TEXT_SEARCH_LIMIT", default=1000)
+# Multi-facet searches use in-process bitmaps of the mirror's facets, rebuilt
+# every ZOMATO_FACET_INDEX_MAX_AGE seconds.
+ZOMATO_FACET_INDEX_MAX_AGE = env.int("ZOMATO_FACET_INDEX_MAX_AGE", default=60 * 5)
+# Typeahead suggestions: cuisines, restaurants and past queries made at least
+# ZOMATO_TYPEAHEAD_MIN_QUERY_COUNT times, rebuilt in the background once
+# ZOMATO_TYPEAHEAD_MAX_AGE seconds old.
+ZOMATO_TYPEAHEAD_LIMIT = env.int("ZOMATO_TYPEAHEAD_LIMIT", default=8)
+ZOMATO_TYPEAHEAD_MAX_AGE = env.int("ZOMATO_TYPEAHEAD_MAX_AGE", default=60 * 5)
+ZOMATO_TYPEAHEAD_MIN_QUERY_COUNT = env.int("ZOMATO_TYPEAHEAD_MIN_QUERY_COUNT", default=2)
+ZOMATO_TYPEAHEAD_MAX_QUERIES = env.int("ZOMATO_TYPEAHEAD_MAX_QUERIES", default=5000)
+# Search result pages an export fetches ahead of the one being streamed.
+ZOMATO_EXPORT_FETCH_AHEAD = env.int("ZOMATO_EXPORT_FETCH_AHEAD", default=3)
+# Cached values of CompactSerializer are zlib compressed from this size on.
+ZOMATO_CODEC_COMPRESS_MIN_BYTES = env.int("ZOMATO_CODEC_COMPRESS_MIN_BYTES", default=1024)
+ZOMATO_CODEC_COMPRESS_LEVEL = env.int("ZOMATO_CODEC_COMPRESS_LEVEL", default=6)
+# Restaurants one compare page or batch details request may ask for.
+ZOMATO_COMPARE_MAX_RESTAURANTS = env.int("ZOMATO_COMPARE_MAX_RESTAURANTS", default=10)
+# /metrics is served to these addresses, and to requests sending
+# "Authorization: Bearer <ZOMATO_METRICS_TOKEN>" when a token is set.
+ZOMATO_METRICS_ALLOWED_IPS = env.list("ZOMATO_METRICS_ALLOWED_IPS", default=["127.0.0.1"])
+ZOMATO_METRICS_TOKEN = env("ZOMATO_METRICS_TOKEN", default="")
+# Requests are timed per phase: upstream calls, database queries and template
+# rendering. The breakdown is sent as a Server-Timing header and logged for
+# requests taking ZOMATO_SLOW_REQUEST_SECONDS or more (0 disables the log).
+ZOMATO_SERVER_TIMING = env.bool("ZOMATO_SERVER_TIMING", default=True)
+ZOMATO_SLOW_REQUEST_SECONDS = env.float("ZOMATO_SLOW_REQUEST_SECONDS", default=2)
+# Thread pools shared by each worker process, by name.
+ZOMATO_EXECUTOR_WORKERS = {
+    "refresh": env.int("ZOMATO_REFRESH_WORKERS", default=4),
+    "fanout": env.int("ZOMATO_FANOUT_WORKERS", default=8),
+    "prefetch": env.int("ZOMATO_PREFETCH_WORKERS", default=2),
+    "sync": env.int("ZOMATO_SYNC_WORKERS", default=4),
+    "ingest": env.int("ZOMATO_INGEST_WORKERS", default=1),
+}
@@ -18,13 +18,21 @@ DATABASES["default"]["CONN_MAX_AGE"] = env.int("CONN_MAX_AGE", default=60)  # no
 # ------------------------------------------------------------------------------
 CACHES = {
     "default": {
-        "BACKEND": "django_redis.cache.RedisCache",
+        # django-redis, with the hottest keys also held in each worker.
+        "BACKEND": "zomato_search.utils.cache.TieredRedisCache",
         "LOCATION": env("REDIS_URL"),
         "OPTIONS": {
             "CLIENT_CLASS": "django_redis.client.DefaultClient",
             # Mimicing memcache behavior.
             # http://niwinz.github.io/django-redis/latest/#_memcached_exceptions_behavior
             "IGNORE_EXCEPTIONS": True,
+            # Pickle, zlib compressed above ZOMATO_CODEC_COMPRESS_MIN_BYTES.
+            "SERIALIZER": "zomato_search.zomato_core.classes.codec.CompactSerializer",
+            "LOCAL_PREFIXES": ["zomato:cuisines:", "zomato:categories:", "zomato:types:"],
+            "LOCAL_MAX_ENTRIES": env.int("LOCAL_CACHE_MAX_ENTRIES", default=1000),
+            "LOCAL_TIMEOUT": env.int("LOCAL_CACHE_TIMEOUT", default=60),
+            # Seconds another worker's write may go unnoticed.
+            "LOCAL_MAX_STALENESS": env.float("LOCAL_CACHE_MAX_STALENESS", default=1),
         },
     }
 }
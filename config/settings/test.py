@@ -49,3 +49,5 @@ EMAIL_BACKEND = "django.core.mail.backends.locmem.EmailBackend"
 
 # Your stuff...
 # ------------------------------------------------------------------------------
+ZOMATO_KEY = env("ZOMATO_KEY", default="test")
+ZOMATO_INGEST_SEARCH_RESULTS = False
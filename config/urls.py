@@ -12,6 +12,7 @@ urlpatterns = [
                   path("users/", include("zomato_search.users.urls", namespace="users")),
                   path("accounts/", include("allauth.urls")),
                   # Your stuff: custom urls includes go here
+                  path("api/v1/", include("zomato_search.zomato_core.api.urls", namespace="v1")),
               ] + static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
 
 if settings.DEBUG:
@@ -0,0 +1,17 @@
+"""
+Load testing without spending API quota: a fake Zomato upstream serving
+recorded responses, and a harness driving the site through gunicorn.
+
+    python -m loadtest.fake_zomato --latency lognormal:80:0.5 --error-rate 0.01 &
+    DJANGO_SETTINGS_MODULE=config.settings.local ZOMATO_KEY=load \\
+        ZOMATO_API_HOST=http://127.0.0.1:8001/api/v2.1 ZOMATO_DAILY_QUOTA=1000000 \\
+        gunicorn config.wsgi:application --config config/gunicorn.py --bind 127.0.0.1:8000 &
+    python -m loadtest.harness --users 20 --duration 60 --username load --password secret
+
+The harness signs in as an existing user, create it with
+``python manage.py createsuperuser``. Upstream request counts per endpoint
+are served by the fake on /stats.
+"""
+from pathlib import Path
+
+FIXTURES = Path(__file__).resolve().parent.parent / 'zomato_search' / 'zomato_core' / 'fixtures' / 'upstream'
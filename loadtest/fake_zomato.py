@@ -0,0 +1,153 @@
+"""
+Stand-in for the Zomato v2.1 API serving the recorded responses in
+zomato_core/fixtures/upstream, with injected latency and errors.
+
+    python -m loadtest.fake_zomato --port 8001 \\
+        --latency lognormal:80:0.5 --latency /search=lognormal:250:0.6 \\
+        --error-rate 0.01 --timeout-rate 0.005
+
+Latencies are 'fixed:MS', 'uniform:LOW_MS:HIGH_MS' or
+'lognormal:MEDIAN_MS:SIGMA', for every endpoint or, prefixed with
+'/endpoint=', for one. Point the site at it with
+ZOMATO_API_HOST=http://127.0.0.1:8001/api/v2.1.
+"""
+import argparse
+import asyncio
+import copy
+import json
+import math
+import random
+from typing import Callable, Dict
+
+from aiohttp import web
+
+from loadtest import FIXTURES
+
+PREFIX = '/api/v2.1'
+PAGE_SIZE = 20
+# The real search API does not page past its first 100 results.
+MAX_RESULTS = 100
+
+
+def parse_latency(spec: str) -> Callable[[], float]:
+    """Seconds sampler for a latency spec, see the module docstring."""
+    kind, _, raw = spec.partition(':')
+    try:
+        numbers = [float(value) for value in raw.split(':')]
+        if kind == 'fixed':
+            delay, = numbers
+            return lambda: delay / 1000
+        if kind == 'uniform':
+            low, high = numbers
+            return lambda: random.uniform(low, high) / 1000
+        if kind == 'lognormal':
+            median, sigma = numbers
+            return lambda: random.lognormvariate(math.log(median / 1000), sigma)
+    except ValueError:
+        pass
+    raise argparse.ArgumentTypeError(f'invalid latency {spec!r}')
+
+
+class FakeZomato:
+    def __init__(self, latencies: Dict[str, Callable[[], float]], error_rate: float = 0.0, error_status: int = 503,
+                 timeout_rate: float = 0.0, hang: float = 60.0):
+        self.latencies = latencies
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.timeout_rate = timeout_rate
+        self.hang = hang
+        self.responses = {name: json.loads((FIXTURES / f'{name}.json').read_text())
+                          for name in ('search', 'restaurant', 'cuisines', 'categories', 'establishments')}
+        self.requests = {}  # type: Dict[str, int]
+
+    def app(self) -> web.Application:
+        app = web.Application(middlewares=[self.upstream_behaviour])
+        app.add_routes([
+            web.get(f'{PREFIX}/search', self.search),
+            web.get(f'{PREFIX}/restaurant', self.restaurant),
+            web.get(f'{PREFIX}/cuisines', self.fixture('cuisines')),
+            web.get(f'{PREFIX}/categories', self.fixture('categories')),
+            web.get(f'{PREFIX}/establishments', self.fixture('establishments')),
+            web.get('/stats', self.stats),
+        ])
+        return app
+
+    @web.middleware
+    async def upstream_behaviour(self, request: web.Request, handler):
+        if not request.path.startswith(PREFIX):
+            return await handler(request)
+
+        endpoint = request.path[len(PREFIX):]
+        self.requests[endpoint] = self.requests.get(endpoint, 0) + 1
+        if 'user-key' not in request.headers:
+            return web.json_response({'code': 403, 'status': 'Forbidden', 'message': 'Invalid API Key'}, status=403)
+
+        latency = self.latencies.get(endpoint) or self.latencies.get('')
+        if latency:
+            await asyncio.sleep(latency())
+        draw = random.random()
+        if draw < self.timeout_rate:
+            await asyncio.sleep(self.hang)
+        elif draw < self.timeout_rate + self.error_rate:
+            return web.json_response({'code': self.error_status, 'status': 'Injected error'},
+                                     status=self.error_status)
+        return await handler(request)
+
+    async def search(self, request: web.Request) -> web.Response:
+        """The recorded page, with ids shifted by ``start`` so pages differ."""
+        start = int(request.query.get('start', 0))
+        page = copy.deepcopy(self.responses['search'])
+        found = min(page['results_found'], MAX_RESULTS)
+        restaurants = page['restaurants'][:max(0, min(PAGE_SIZE, found - start))]
+        for item in restaurants:
+            restaurant = item['restaurant']
+            restaurant['id'] = str(int(restaurant['id']) + start)
+            restaurant['R'] = dict(restaurant.get('R', {}), res_id=int(restaurant['id']))
+        page.update(results_start=start, results_shown=len(restaurants), restaurants=restaurants)
+        return web.json_response(page)
+
+    async def restaurant(self, request: web.Request) -> web.Response:
+        res_id = request.query.get('res_id', '')
+        if not res_id.isdigit():
+            return web.json_response({'code': 404, 'status': 'Not Found'}, status=404)
+        restaurant = copy.deepcopy(self.responses['restaurant'])
+        restaurant['id'] = res_id
+        restaurant['R'] = dict(restaurant.get('R', {}), res_id=int(res_id))
+        return web.json_response(restaurant)
+
+    def fixture(self, name: str):
+        async def handler(request: web.Request) -> web.Response:
+            return web.json_response(self.responses[name])
+        return handler
+
+    async def stats(self, request: web.Request) -> web.Response:
+        return web.json_response(self.requests)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8001)
+    parser.add_argument('--latency', action='append', default=[], metavar='[/ENDPOINT=]SPEC')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='share of requests answered with an error')
+    parser.add_argument('--error-status', type=int, default=503)
+    parser.add_argument('--timeout-rate', type=float, default=0.0,
+                        help='share of requests left hanging for --hang seconds')
+    parser.add_argument('--hang', type=float, default=60.0)
+    args = parser.parse_args()
+
+    latencies = {}
+    for spec in args.latency:
+        endpoint, _, spec = spec.rpartition('=')
+        try:
+            latencies[endpoint] = parse_latency(spec)
+        except argparse.ArgumentTypeError as e:
+            parser.error(str(e))
+
+    fake = FakeZomato(latencies, error_rate=args.error_rate, error_status=args.error_status,
+                      timeout_rate=args.timeout_rate, hang=args.hang)
+    web.run_app(fake.app(), host=args.host, port=args.port)
+
+
+if __name__ == '__main__':
+    main()
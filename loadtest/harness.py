@@ -0,0 +1,154 @@
+"""
+Drives the site with virtual users, each signing in and then looping
+through search, paging, restaurant details and posting a review, and
+reports throughput and latency percentiles per step.
+
+    python -m loadtest.harness --base-url http://127.0.0.1:8000 \\
+        --users 20 --duration 60 --username load --password secret
+"""
+import argparse
+import json
+import random
+import re
+import threading
+import time
+from typing import Dict, List, Optional
+
+import requests
+
+from loadtest import FIXTURES
+
+DETAILS_LINK_RE = re.compile(r'href="/details/(\d+)"')
+SEARCH_TEXTS = ('', '', 'pizza', 'cafe', 'biryani', 'chinese')
+PERCENTILES = (50, 90, 95, 99)
+
+
+def percentile(ordered: List[float], percent: float) -> float:
+    """Nearest-rank percentile of an ascending list."""
+    return ordered[max(0, int(-(-len(ordered) * percent // 100)) - 1)]
+
+
+class Recorder:
+    def __init__(self):
+        self.latencies = {}  # type: Dict[str, List[float]]
+        self.errors = {}  # type: Dict[str, int]
+        self._lock = threading.Lock()
+
+    def record(self, step: str, seconds: float, ok: bool) -> None:
+        with self._lock:
+            self.latencies.setdefault(step, []).append(seconds)
+            if not ok:
+                self.errors[step] = self.errors.get(step, 0) + 1
+
+    def report(self, elapsed: float) -> Dict[str, Dict]:
+        report = {}
+        with self._lock:
+            for step, latencies in self.latencies.items():
+                ordered = sorted(latencies)
+                row = {'requests': len(ordered), 'errors': self.errors.get(step, 0),
+                       'per_second': round(len(ordered) / elapsed, 2)}
+                row.update({f'p{percent}_ms': round(percentile(ordered, percent) * 1000, 1)
+                            for percent in PERCENTILES})
+                row['max_ms'] = round(ordered[-1] * 1000, 1)
+                report[step] = row
+        return report
+
+
+class VirtualUser:
+    def __init__(self, base_url: str, username: str, password: str, recorder: Recorder, cuisine_ids: List[int],
+                 think_time: float = 0.0, timeout: float = 30.0):
+        self.base_url = base_url.rstrip('/')
+        self.username = username
+        self.password = password
+        self.recorder = recorder
+        self.cuisine_ids = cuisine_ids
+        self.think_time = think_time
+        self.timeout = timeout
+        self.session = requests.Session()
+
+    def run(self, deadline: float) -> None:
+        if not self.login():
+            return
+        while time.monotonic() < deadline:
+            self.visit()
+
+    def login(self) -> bool:
+        self.request('login form', 'GET', '/accounts/login/')
+        response = self.request('login', 'POST', '/accounts/login/',
+                                {'login': self.username, 'password': self.password})
+        return response is not None and response.url.rstrip('/') != f'{self.base_url}/accounts/login'
+
+    def visit(self) -> None:
+        self.request('search form', 'GET', '/search/cuisine/')
+        ids = [str(id) for id in random.sample(self.cuisine_ids, random.randint(1, 3))]
+        form = {'by': 'cuisines', 'ids': ids, 'search_dish': random.choice(SEARCH_TEXTS)}
+        response = self.request('search', 'POST', '/search-results/', form)
+        restaurant_ids = DETAILS_LINK_RE.findall(response.text) if response is not None else []
+
+        response = self.request('next page', 'POST', '/search-results/', {
+            'next': '', 'next_page': 20, 'previous_page': 0, 'by': 'cuisines', 'ids': ','.join(ids)})
+        if response is not None:
+            restaurant_ids += DETAILS_LINK_RE.findall(response.text)
+        if not restaurant_ids:
+            return
+
+        path = f'/details/{random.choice(restaurant_ids)}'
+        self.request('details', 'GET', path)
+        self.request('review', 'POST', path, {'text': 'Load test review', 'rating': random.randint(1, 5)})
+
+    def request(self, step: str, method: str, path: str, data: Dict = None) -> Optional[requests.Response]:
+        url = f'{self.base_url}{path}'
+        if data is not None:
+            data = dict(data, csrfmiddlewaretoken=self.session.cookies.get('csrftoken', ''))
+        started = time.perf_counter()
+        try:
+            response = self.session.request(method, url, data=data, headers={'Referer': url}, timeout=self.timeout)
+        except requests.RequestException:
+            self.recorder.record(step, time.perf_counter() - started, False)
+            return None
+        self.recorder.record(step, time.perf_counter() - started, response.ok)
+        if self.think_time:
+            time.sleep(random.expovariate(1 / self.think_time))
+        return response
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--base-url', default='http://127.0.0.1:8000')
+    parser.add_argument('--users', type=int, default=10)
+    parser.add_argument('--duration', type=float, default=60, help='seconds')
+    parser.add_argument('--think-time', type=float, default=0.0, help='mean seconds between requests')
+    parser.add_argument('--username', required=True)
+    parser.add_argument('--password', required=True)
+    parser.add_argument('--json', action='store_true', help='print the report as JSON')
+    args = parser.parse_args()
+
+    cuisines = json.loads((FIXTURES / 'cuisines.json').read_text())['cuisines']
+    cuisine_ids = [item['cuisine']['cuisine_id'] for item in cuisines]
+    recorder = Recorder()
+    started = time.monotonic()
+    deadline = started + args.duration
+    users = [VirtualUser(args.base_url, args.username, args.password, recorder, cuisine_ids, args.think_time)
+             for _ in range(args.users)]
+    threads = [threading.Thread(target=user.run, args=(deadline,)) for user in users]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    elapsed = time.monotonic() - started
+    report = recorder.report(elapsed)
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return
+
+    columns = ['requests', 'errors', 'per_second'] + [f'p{percent}_ms' for percent in PERCENTILES] + ['max_ms']
+    print(f'{"step":12}' + ''.join(f'{column:>12}' for column in columns))
+    for step, row in report.items():
+        print(f'{step:12}' + ''.join(f'{row[column]:>12}' for column in columns))
+    total = sum(row['requests'] for row in report.values())
+    print(f'{total} requests in {elapsed:.1f}s, {total / elapsed:.1f}/s')
+
+
+if __name__ == '__main__':
+    main()
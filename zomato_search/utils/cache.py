@@ -0,0 +1,163 @@
+import threading
+import time
+from typing import Any, Dict, Iterable, Optional
+
+from django.core.cache.backends.base import BaseCache, DEFAULT_TIMEOUT
+from django_redis.cache import RedisCache
+
+from zomato_search.zomato_core.classes.cache import CacheStats, LRUCache
+
+MISSING = object()
+
+
+class TieredCacheMixin(BaseCache):
+    """
+    Serves keys starting with one of ``OPTIONS['LOCAL_PREFIXES']`` from a
+    per-process ``LRUCache`` in front of the shared backend.
+
+    Every write or delete of such a key increments a generation counter in
+    the shared backend. Workers re-read it at most every
+    ``OPTIONS['LOCAL_MAX_STALENESS']`` seconds and drop their local entries
+    when it moved, so no worker serves a value longer than that after
+    another one changed it. Local entries also expire after
+    ``OPTIONS['LOCAL_TIMEOUT']`` seconds.
+
+    Mix it in before a ``BaseCache`` backend taking ``(server, params)``.
+    """
+    GENERATION_KEY = 'tiered-cache:generation'
+
+    def __init__(self, server, params):
+        super().__init__(server, params)
+        options = params.get('OPTIONS', {})
+        self.local_prefixes = tuple(options.get('LOCAL_PREFIXES', ()))
+        self.max_staleness = options.get('LOCAL_MAX_STALENESS', 1)
+        self.local = LRUCache(options.get('LOCAL_MAX_ENTRIES', 1000), options.get('LOCAL_TIMEOUT', 30))
+        self.remote_stats = CacheStats()
+        self._generation = None  # type: Optional[int]
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None, version=None, **kwargs):
+        if not self._is_local(key):
+            return self._get_remote(key, default, version, **kwargs)
+
+        local_key = self.make_key(key, version=version)
+        if self._sync_generation():
+            entry = self.local.get(local_key)
+            if entry is not None:
+                self.local.stats.hit()
+                return entry[0]
+        self.local.stats.miss()
+
+        generation = self._generation
+        value = self._get_remote(key, MISSING, version, **kwargs)
+        if value is MISSING:
+            return default
+        if generation is not None and generation == self._generation:
+            self.local.set(local_key, (value,))
+        return value
+
+    def get_many(self, keys, version=None, **kwargs):
+        keys = list(keys)
+        values = {key: self.get(key, MISSING, version=version) for key in keys if self._is_local(key)}
+        remote = [key for key in keys if not self._is_local(key)]
+        if remote:
+            found = super().get_many(remote, version=version, **kwargs)
+            self._count_remote(len(found), len(remote) - len(found))
+            values.update(found)
+        return {key: value for key, value in values.items() if value is not MISSING}
+
+    def set(self, key, value, timeout=DEFAULT_TIMEOUT, version=None, **kwargs):
+        result = super().set(key, value, timeout=timeout, version=version, **kwargs)
+        if self._is_local(key):
+            self._changed([key], version)
+        return result
+
+    def add(self, key, value, timeout=DEFAULT_TIMEOUT, version=None, **kwargs):
+        added = super().add(key, value, timeout=timeout, version=version, **kwargs)
+        if added and self._is_local(key):
+            self._changed([key], version)
+        return added
+
+    def set_many(self, data, timeout=DEFAULT_TIMEOUT, version=None, **kwargs):
+        result = super().set_many(data, timeout=timeout, version=version, **kwargs)
+        self._changed([key for key in data if self._is_local(key)], version)
+        return result
+
+    def delete(self, key, version=None, **kwargs):
+        result = super().delete(key, version=version, **kwargs)
+        if self._is_local(key):
+            self._changed([key], version)
+        return result
+
+    def delete_many(self, keys, version=None, **kwargs):
+        keys = list(keys)
+        result = super().delete_many(keys, version=version, **kwargs)
+        self._changed([key for key in keys if self._is_local(key)], version)
+        return result
+
+    def clear(self):
+        result = super().clear()
+        with self._lock:
+            self.local.clear()
+            self._generation = None
+        return result
+
+    def tier_stats(self) -> Dict[str, Dict]:
+        return {'local': self.local.stats.as_dict(), 'remote': self.remote_stats.as_dict()}
+
+    def _is_local(self, key: Any) -> bool:
+        return isinstance(key, str) and key.startswith(self.local_prefixes)
+
+    def _get_remote(self, key, default, version, **kwargs):
+        value = super().get(key, MISSING, version=version, **kwargs)
+        self._count_remote(value is not MISSING, value is MISSING)
+        return default if value is MISSING else value
+
+    def _count_remote(self, hits: int, misses: int) -> None:
+        for _ in range(hits):
+            self.remote_stats.hit()
+        for _ in range(misses):
+            self.remote_stats.miss()
+
+    def _sync_generation(self) -> bool:
+        """
+        Re-reads the shared generation when it may be stale. False while it
+        cannot be read, local entries must not be served then.
+        """
+        now = time.monotonic()
+        if self._generation is not None and now - self._checked_at < self.max_staleness:
+            return True
+
+        generation = super().get(self.GENERATION_KEY, version=1)
+        if generation is None:
+            super().add(self.GENERATION_KEY, 0, timeout=None, version=1)
+            generation = super().get(self.GENERATION_KEY, version=1)
+        with self._lock:
+            if generation is None or generation != self._generation:
+                self.local.clear()
+            self._generation = generation
+            self._checked_at = now
+        return generation is not None
+
+    def _changed(self, keys: Iterable, version) -> None:
+        keys = list(keys)
+        if not keys:
+            return
+        try:
+            generation = super().incr(self.GENERATION_KEY, version=1)
+        except ValueError:
+            super().add(self.GENERATION_KEY, 0, timeout=None, version=1)
+            generation = super().incr(self.GENERATION_KEY, version=1)
+        with self._lock:
+            if self._generation is None or generation != self._generation + 1:
+                # Another worker changed keys in between.
+                self.local.clear()
+            for key in keys:
+                self.local.invalidate(self.make_key(key, version=version))
+            self._generation = generation
+            self._checked_at = time.monotonic()
+
+
+class TieredRedisCache(TieredCacheMixin, RedisCache):
+    """django-redis backend with a worker-local tier, see ``TieredCacheMixin``."""
@@ -0,0 +1,60 @@
+import pytest
+from django.core.cache.backends.locmem import LocMemCache
+
+from zomato_search.utils.cache import TieredCacheMixin
+
+
+class TieredLocMemCache(TieredCacheMixin, LocMemCache):
+    pass
+
+
+def worker(**options):
+    options = dict({'LOCAL_PREFIXES': ['zomato:cuisines:'], 'LOCAL_MAX_STALENESS': 60}, **options)
+    return TieredLocMemCache('tiered-test', {'OPTIONS': options})
+
+
+@pytest.fixture
+def workers():
+    first, second = worker(), worker()
+    first.clear()
+    return first, second
+
+
+class TestTieredCache:
+    def test_serves_local_keys_from_memory(self, workers):
+        first, second = workers
+        first.set('zomato:cuisines:4', ['Pizza'])
+
+        assert second.get('zomato:cuisines:4') == ['Pizza']
+        assert second.get('zomato:cuisines:4') == ['Pizza']
+        assert second.tier_stats()['local'] == {'hits': 1, 'misses': 1, 'hit_rate': 0.5}
+        assert second.tier_stats()['remote']['hits'] == 1
+
+    def test_other_keys_stay_remote(self, workers):
+        first, second = workers
+        first.set('zomato:restaurant:1', {'id': 1})
+
+        assert second.get('zomato:restaurant:1') == {'id': 1}
+        assert second.get('missing', 'default') == 'default'
+        assert len(second.local) == 0
+
+    def test_writes_are_seen_within_the_staleness_bound(self, workers):
+        first, second = workers
+        first.set('zomato:cuisines:4', ['Pizza'])
+        assert second.get('zomato:cuisines:4') == ['Pizza']
+
+        first.set('zomato:cuisines:4', ['Pizza', 'Biryani'])
+
+        assert second.get('zomato:cuisines:4') == ['Pizza']
+        second.max_staleness = 0
+        assert second.get('zomato:cuisines:4') == ['Pizza', 'Biryani']
+
+    def test_own_writes_are_seen_at_once(self, workers):
+        first, _ = workers
+        first.set('zomato:cuisines:4', ['Pizza'])
+        assert first.get('zomato:cuisines:4') == ['Pizza']
+
+        first.delete('zomato:cuisines:4')
+
+        assert first.get('zomato:cuisines:4') is None
+        assert first.get_many(['zomato:cuisines:4', 'other']) == {}
@@ -0,0 +1,59 @@
+from base64 import b64decode, b64encode
+from collections import OrderedDict
+from typing import Dict, List, Optional
+
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import CursorPagination
+from rest_framework.request import Request
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+from zomato_search.zomato_core.classes.zomato_handler import ZomatoHandler
+
+
+class ReviewCursorPagination(CursorPagination):
+    """Newest reviews first, keyed on the review id like the details page."""
+    page_size = 20
+    ordering = '-id'
+
+
+class SearchCursorPagination:
+    """
+    Opaque cursors over the result offsets of the search API, which pages by
+    ``start`` and stops after ``ZomatoHandler.MAX_RESULTS`` results. Facet
+    searches are answered locally and page through all of them.
+    """
+    cursor_query_param = 'cursor'
+    invalid_cursor_message = 'Invalid cursor'
+
+    def get_start(self, request: Request) -> int:
+        cursor = request.query_params.get(self.cursor_query_param)
+        if not cursor:
+            return 0
+        try:
+            start = int(b64decode(cursor.encode('ascii'), validate=True).decode('ascii'))
+        except (TypeError, ValueError, UnicodeError):
+            raise NotFound(self.invalid_cursor_message)
+        if start < 0 or start % ZomatoHandler.PAGE_SIZE:
+            raise NotFound(self.invalid_cursor_message)
+        return start
+
+    def get_paginated_response(self, request: Request, data: Dict, results: List) -> Response:
+        start = int(data['results_start'])
+        end = int(data.get('results_found') or 0)
+        if 'facets' not in data:
+            end = min(end, ZomatoHandler.MAX_RESULTS)
+        next_start = start + ZomatoHandler.PAGE_SIZE
+        response = OrderedDict([
+            ('count', data.get('results_found')),
+            ('next', self._link(request, next_start) if data['results_shown'] and next_start < end else None),
+            ('previous', self._link(request, max(start - ZomatoHandler.PAGE_SIZE, 0)) if start else None),
+            ('results', results),
+        ])
+        if 'facets' in data:
+            response['facets'] = data['facets']
+        return Response(response)
+
+    def _link(self, request: Request, start: int) -> Optional[str]:
+        cursor = b64encode(str(start).encode('ascii')).decode('ascii')
+        return replace_query_param(request.build_absolute_uri(), self.cursor_query_param, cursor)
@@ -0,0 +1,55 @@
+from rest_framework import serializers
+
+from zomato_search.zomato_core.models import Review
+
+
+class FieldsMixin(serializers.Serializer):
+    """Leaves out the fields not named in the request's ``?fields=``, when given."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        request = self.context.get('request')
+        fields = request.query_params.get('fields') if request is not None else None
+        if fields:
+            selected = {name.strip() for name in fields.split(',')}
+            for name in set(self.fields) - selected:
+                self.fields.pop(name)
+
+
+class UpstreamURLField(serializers.CharField):
+    """Upstream URLs without their tracking query string."""
+
+    def to_representation(self, value):
+        return super().to_representation(value).split('?')[0]
+
+
+class RestaurantSerializer(FieldsMixin, serializers.Serializer):
+    """A restaurant of a search API response, or of the catalog's ``as_payload``."""
+    id = serializers.IntegerField()
+    name = serializers.CharField()
+    url = UpstreamURLField()
+    thumb = serializers.CharField(required=False)
+    cuisines = serializers.CharField(required=False)
+    has_online_delivery = serializers.BooleanField(required=False)
+    average_cost_for_two = serializers.IntegerField(required=False)
+    phone_numbers = serializers.CharField(required=False)
+    locality = serializers.CharField(source='location.locality', required=False)
+    rating = serializers.FloatField(source='user_rating.aggregate_rating', required=False)
+
+
+class RestaurantDetailsSerializer(RestaurantSerializer):
+    """A restaurant API response, with ``review_count`` and ``review_average`` added."""
+    address = serializers.CharField(source='location.address', required=False)
+    featured_image = serializers.CharField(required=False)
+    photos_url = UpstreamURLField(required=False)
+    menu_url = UpstreamURLField(required=False)
+    review_count = serializers.IntegerField()
+    review_average = serializers.FloatField(allow_null=True)
+
+
+class ReviewSerializer(FieldsMixin, serializers.ModelSerializer):
+    user = serializers.CharField(source='user.username')
+
+    class Meta:
+        model = Review
+        fields = ['id', 'user', 'rating', 'text']
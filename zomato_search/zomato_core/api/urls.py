@@ -0,0 +1,10 @@
+from django.urls import path
+
+from zomato_search.zomato_core.api.views import SearchAPIView, RestaurantAPIView, RestaurantReviewsAPIView
+
+app_name = 'api'
+urlpatterns = [
+    path('search/', SearchAPIView.as_view(), name='search'),
+    path('restaurants/<int:id>/', RestaurantAPIView.as_view(), name='restaurant'),
+    path('restaurants/<int:id>/reviews/', RestaurantReviewsAPIView.as_view(), name='restaurant_reviews'),
+]
@@ -0,0 +1,113 @@
+from typing import Dict
+
+from django.utils.cache import get_conditional_response, set_response_etag
+from rest_framework import status
+from rest_framework.exceptions import APIException, ValidationError
+from rest_framework.generics import ListAPIView
+from rest_framework.request import Request
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from zomato_search.zomato_core.api.pagination import SearchCursorPagination, ReviewCursorPagination
+from zomato_search.zomato_core.api.serializers import RestaurantSerializer, RestaurantDetailsSerializer, \
+    ReviewSerializer
+from zomato_search.zomato_core.classes.zomato_client import ZomatoAPIException
+from zomato_search.zomato_core.classes.zomato_handler import ZomatoHandler, NoSearchCriteriaException
+from zomato_search.zomato_core.models import Review, RestaurantReviewStats
+
+
+class UpstreamUnavailable(APIException):
+    status_code = status.HTTP_502_BAD_GATEWAY
+    default_detail = 'The Zomato API did not answer, try again later.'
+    default_code = 'upstream_unavailable'
+
+
+class ETagMixin(APIView):
+    """
+    Sets an ETag on successful GET responses and answers a matching
+    If-None-Match with 304 Not Modified, without the body.
+    """
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(request, response, *args, **kwargs)
+        if request.method in ('GET', 'HEAD') and response.status_code == status.HTTP_200_OK:
+            response.render()
+            set_response_etag(response)
+            return get_conditional_response(request, etag=response['ETag'], response=response)
+        return response
+
+
+class FacetsNotMirrored(APIException):
+    status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    default_detail = 'Searching several facets at once needs them mirrored, try again after the next sync.'
+    default_code = 'facets_not_mirrored'
+
+
+class SearchAPIView(ETagMixin, APIView):
+    """
+    Restaurants of the city by ``categories``, ``cuisines`` or ``types``
+    (comma separated ids), optionally matching ``q``.
+
+    Several dimensions at once, or ``match_all=true`` for restaurants in
+    every facet given instead of any, are answered from the mirrored
+    catalog with the number of matches per facet under ``facets``.
+    """
+    pagination_class = SearchCursorPagination
+    DIMENSIONS = ('categories', 'cuisines', 'types')
+
+    def get(self, request: Request) -> Response:
+        paginator = self.pagination_class()
+        params = request.query_params
+        kwargs = {dimension: params.getlist(dimension) for dimension in self.DIMENSIONS}
+        start = paginator.get_start(request)
+        match_all = params.get('match_all', '').lower() in ('1', 'true', 'yes')
+
+        handler = ZomatoHandler()
+        try:
+            if match_all or sum(1 for ids in kwargs.values() if ids) > 1:
+                data = self._facet_search(handler, params.get('q', ''), kwargs, match_all, start)
+            else:
+                kwargs.update(q=params.get('q', ''), start=start)
+                data = handler.search(**kwargs)
+                if data['results_shown'] == ZomatoHandler.PAGE_SIZE:
+                    handler.prefetch(results_found=data['results_found'], **kwargs)
+        except NoSearchCriteriaException:
+            raise ValidationError('Pass categories, cuisines or types to search by.')
+        except ZomatoAPIException:
+            raise UpstreamUnavailable()
+
+        restaurants = [item['restaurant'] for item in data['restaurants']]
+        serializer = RestaurantSerializer(restaurants, many=True, context={'request': request, 'view': self})
+        return paginator.get_paginated_response(request, data, serializer.data)
+
+    @staticmethod
+    def _facet_search(handler: ZomatoHandler, q: str, kwargs: Dict, match_all: bool, start: int) -> Dict:
+        if q:
+            raise ValidationError('q cannot be combined with several dimensions or match_all.')
+        data = handler.facet_search(match_all=match_all, start=start, **kwargs)
+        if data is None:
+            raise FacetsNotMirrored()
+        return data
+
+
+class RestaurantAPIView(ETagMixin, APIView):
+    def get(self, request: Request, id: int) -> Response:
+        try:
+            details = ZomatoHandler().get_restaurant_details(id)
+        except ZomatoAPIException:
+            raise UpstreamUnavailable()
+
+        stats = RestaurantReviewStats.objects.filter(restaurant_id=id).first()
+        restaurant = dict(details, id=id, review_count=stats.count if stats else 0,
+                          review_average=stats.average if stats else None)
+        serializer = RestaurantDetailsSerializer(restaurant, context={'request': request, 'view': self})
+        return Response(serializer.data)
+
+
+class RestaurantReviewsAPIView(ETagMixin, ListAPIView):
+    serializer_class = ReviewSerializer
+    pagination_class = ReviewCursorPagination
+
+    def get_queryset(self):
+        return Review.objects.filter(restaurant_id=self.kwargs['id']).select_related('user') \
+            .only('id', 'text', 'rating', 'user__username')
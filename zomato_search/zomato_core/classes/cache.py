@@ -0,0 +1,219 @@
+import logging
+import threading
+import time
+from collections import OrderedDict
+from functools import partial
+from typing import Any, Callable, Dict, Hashable, Iterable, Set
+
+from django.conf import settings
+from django.core.cache import cache
+
+from zomato_search.zomato_core.classes.concurrency import get_executor
+
+logger = logging.getLogger(__name__)
+
+
+class CacheStats:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def hit(self) -> None:
+        with self._lock:
+            self.hits += 1
+
+    def miss(self) -> None:
+        with self._lock:
+            self.misses += 1
+
+    def reset(self) -> None:
+        with self._lock:
+            self.hits = 0
+            self.misses = 0
+
+    def as_dict(self) -> Dict:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / total if total else 0.0,
+            }
+
+
+class ZomatoCache:
+    """
+    Upstream payloads stored in the Django cache under
+    ``zomato:<namespace>:<key>``, versioned with ``ZOMATO_CACHE_VERSION``.
+    """
+    PREFIX = 'zomato'
+
+    def __init__(self, namespace: str, timeout: int):
+        self.namespace = namespace
+        self.timeout = timeout
+        self.stats = CacheStats()
+
+    @property
+    def version(self) -> int:
+        return settings.ZOMATO_CACHE_VERSION
+
+    def make_key(self, key: Any) -> str:
+        return f'{self.PREFIX}:{self.namespace}:{key}'
+
+    def get(self, key: Any) -> Any:
+        return cache.get(self.make_key(key), version=self.version)
+
+    def get_many(self, keys: Iterable) -> Dict:
+        cache_keys = {self.make_key(key): key for key in keys}
+        values = cache.get_many(cache_keys, version=self.version)
+        return {cache_keys[cache_key]: value for cache_key, value in values.items()}
+
+    def set(self, key: Any, value: Any) -> None:
+        cache.set(self.make_key(key), value, timeout=self.timeout, version=self.version)
+
+    def get_or_set(self, key: Any, fetch: Callable[[], Any]) -> Any:
+        value = self.get(key)
+        if value is not None:
+            self.stats.hit()
+            return value
+
+        self.stats.miss()
+        value = fetch()
+        self.set(key, value)
+        return value
+
+    def invalidate(self, key: Any) -> None:
+        cache.delete(self.make_key(key), version=self.version)
+
+
+class LRUCache:
+    """
+    Size-bounded in-process cache with a per-entry TTL, shared by every
+    thread of a worker.
+    """
+
+    def __init__(self, max_entries: int, timeout: float):
+        self.max_entries = max_entries
+        self.timeout = timeout
+        self.stats = CacheStats()
+        self._entries = OrderedDict()  # type: OrderedDict
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: Hashable) -> Any:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: Hashable, value: Any, timeout: float = None) -> None:
+        expires_at = time.monotonic() + (self.timeout if timeout is None else timeout)
+        with self._lock:
+            self._entries[key] = (expires_at, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def get_or_set(self, key: Hashable, fetch: Callable[[], Any]) -> Any:
+        value = self.get(key)
+        if value is not None:
+            self.stats.hit()
+            return value
+
+        self.stats.miss()
+        value = fetch()
+        self.set(key, value)
+        return value
+
+    def invalidate(self, key: Hashable) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+class StaleWhileRevalidateCache(ZomatoCache):
+    """
+    Entries older than ``soft_timeout`` are still served, while a background
+    thread fetches a fresh copy. The Django cache drops them for good after
+    ``hard_timeout``.
+    """
+
+    def __init__(self, namespace: str, soft_timeout: int, hard_timeout: int):
+        super().__init__(namespace, hard_timeout)
+        self.soft_timeout = soft_timeout
+        self.refreshes = 0
+        self._refreshing = set()  # type: Set[Hashable]
+        self._lock = threading.Lock()
+
+    def get_or_set(self, key: Any, fetch: Callable[[], Any]) -> Any:
+        value = self.lookup(key, fetch)
+        if value is None:
+            value = fetch()
+            self.store(key, value)
+        return value
+
+    def lookup(self, key: Any, fetch: Callable[[], Any]) -> Any:
+        """
+        Cached value or None, scheduling ``fetch`` in the background when
+        the entry is past its soft timeout.
+        """
+        entry = self.get(key)
+        if entry is None:
+            self.stats.miss()
+            return None
+
+        self.stats.hit()
+        fetched_at, value = entry
+        if time.time() - fetched_at > self.soft_timeout:
+            self._schedule_refresh(key, fetch)
+        return value
+
+    def lookup_many(self, keys: Iterable, fetch: Callable[[Any], Any]) -> Dict:
+        """
+        ``lookup`` for several keys in one cache round trip. ``fetch`` takes
+        the key to refresh. Missing keys are left out of the result.
+        """
+        keys = list(keys)
+        values = {}
+        for key, (fetched_at, value) in self.get_many(keys).items():
+            if time.time() - fetched_at > self.soft_timeout:
+                self._schedule_refresh(key, partial(fetch, key))
+            values[key] = value
+        for key in keys:
+            if key in values:
+                self.stats.hit()
+            else:
+                self.stats.miss()
+        return values
+
+    def store(self, key: Any, value: Any) -> None:
+        self.set(key, (time.time(), value))
+
+    def _schedule_refresh(self, key: Any, fetch: Callable[[], Any]) -> None:
+        with self._lock:
+            if key in self._refreshing:
+                return
+            self._refreshing.add(key)
+            self.refreshes += 1
+        get_executor('refresh').submit(self._refresh, key, fetch)
+
+    def _refresh(self, key: Any, fetch: Callable[[], Any]) -> None:
+        try:
+            self.store(key, fetch())
+        except Exception:
+            logger.exception('Refreshing %s failed, serving the stale entry', self.make_key(key))
+        finally:
+            with self._lock:
+                self._refreshing.discard(key)
@@ -0,0 +1,225 @@
+import hashlib
+import json
+from datetime import timedelta
+from typing import Dict, Iterable, Iterator, List, Optional, Type
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from zomato_search.zomato_core.classes.facets import FacetIndex, count_bits
+from zomato_search.zomato_core.classes.text_index import TEXT_INDEX
+from zomato_search.zomato_core.models import Restaurant, Cuisine, Category, Establishment, Facet
+
+FACET_MODELS = {'cuisines': Cuisine, 'categories': Category, 'types': Establishment}  # type: Dict[str, Type[Facet]]
+# Search dimension to Restaurant many-to-many field.
+FACET_FIELDS = {'cuisines': 'cuisines', 'categories': 'categories', 'types': 'establishments'}
+# Reference data payload: (list key, item key, id key, name key) per dimension.
+REFERENCE_KEYS = {
+    'cuisines': ('cuisines', 'cuisine', 'cuisine_id', 'cuisine_name'),
+    'categories': ('categories', 'categories', 'id', 'name'),
+    'types': ('establishments', 'establishment', 'id', 'name'),
+}
+RESTAURANT_FIELDS = ['name', 'url', 'thumb', 'cuisine_names', 'has_online_delivery', 'average_cost_for_two',
+                     'phone_numbers', 'locality', 'address', 'aggregate_rating', 'payload_hash', 'synced_at']
+
+
+def chunks(items: List, size: int) -> Iterable[List]:
+    for index in range(0, len(items), size):
+        yield items[index:index + size]
+
+
+class Catalog:
+    """
+    Local mirror of the city's restaurants and the facets they are searched
+    by, filled by the sync_restaurants command. Searches on facets that are
+    fully mirrored are answered from the database.
+    """
+    CHUNK_SIZE = 500
+    PAGE_SIZE = 20
+
+    def upsert_facets(self, dimension: str, reference_data: Dict) -> Dict[int, str]:
+        list_key, item_key, id_key, name_key = REFERENCE_KEYS[dimension]
+        names = {int(item[item_key][id_key]): item[item_key][name_key] for item in reference_data[list_key]}
+
+        model = FACET_MODELS[dimension]
+        existing = model.objects.in_bulk(list(names))
+        model.objects.bulk_create([model(id=id, name=name) for id, name in names.items() if id not in existing],
+                                  batch_size=self.CHUNK_SIZE, ignore_conflicts=True)
+        renamed = [facet for facet in existing.values() if facet.name != names[facet.id]]
+        for facet in renamed:
+            facet.name = names[facet.id]
+        model.objects.bulk_update(renamed, ['name'], batch_size=self.CHUNK_SIZE)
+        return names
+
+    def stale_facets(self, dimension: str, max_age: timedelta) -> List[int]:
+        return list(FACET_MODELS[dimension].objects.exclude(synced_at__gte=timezone.now() - max_age)
+                    .order_by('id').values_list('id', flat=True))
+
+    def mark_synced(self, dimension: str, facet_ids: Iterable[int]) -> None:
+        FACET_MODELS[dimension].objects.filter(id__in=list(facet_ids)).update(synced_at=timezone.now())
+
+    def ingest(self, payload: Dict, dimension: str = None, facet_ids: Iterable = ()) -> List[int]:
+        """
+        Upserts the restaurants of a search response, only writing rows
+        whose fields changed, and records them as members of ``facet_ids``.
+        Returns the restaurant ids.
+        """
+        now = timezone.now()
+        restaurants = {}
+        for item in payload.get('restaurants', []):
+            restaurant = self._build(item['restaurant'], now)
+            restaurants[restaurant.id] = restaurant
+        ids = list(restaurants)
+
+        written = []  # type: List[Restaurant]
+        with transaction.atomic():
+            for chunk in chunks(ids, self.CHUNK_SIZE):
+                existing = Restaurant.objects.only('id', 'payload_hash').in_bulk(chunk)
+                created = [restaurants[id] for id in chunk if id not in existing]
+                changed = [restaurants[id] for id in chunk
+                           if id in existing and existing[id].payload_hash != restaurants[id].payload_hash]
+                Restaurant.objects.bulk_create(created, ignore_conflicts=True)
+                Restaurant.objects.bulk_update(changed, RESTAURANT_FIELDS)
+                written += created + changed
+            if dimension and facet_ids:
+                self._add_members(dimension, [int(id) for id in facet_ids], ids)
+        TEXT_INDEX.add(written)
+        return ids
+
+    def prune_members(self, dimension: str, facet_id: int, restaurant_ids: Iterable[int]) -> int:
+        """
+        Drops the restaurants of a fully walked facet that are no longer
+        in ``restaurant_ids``. Returns how many were dropped.
+        """
+        through = getattr(Restaurant, FACET_FIELDS[dimension]).through
+        facet_column = f'{FACET_MODELS[dimension]._meta.model_name}_id'
+        with transaction.atomic():
+            stale = list(through.objects.filter(**{facet_column: facet_id})
+                         .exclude(restaurant_id__in=list(restaurant_ids))
+                         .values_list('restaurant_id', flat=True))
+            for chunk in chunks(stale, self.CHUNK_SIZE):
+                through.objects.filter(restaurant_id__in=chunk, **{facet_column: facet_id}).delete()
+            transaction.on_commit(lambda: FACET_INDEX.remove(dimension, facet_id, stale))
+        return len(stale)
+
+    def covers(self, dimension: str, facet_ids: Iterable) -> bool:
+        """
+        Whether every facet was fully mirrored within ZOMATO_CATALOG_MAX_AGE.
+        Facets with more results than the search API pages through are
+        never marked mirrored, see sync_restaurants.
+        """
+        try:
+            facet_ids = {int(id) for id in facet_ids}
+        except ValueError:
+            return False
+        since = timezone.now() - timedelta(seconds=settings.ZOMATO_CATALOG_MAX_AGE)
+        synced = FACET_MODELS[dimension].objects.filter(id__in=facet_ids, synced_at__gte=since).count()
+        return bool(facet_ids) and synced == len(facet_ids)
+
+    def answers(self, dimension: str, facet_ids: Iterable) -> bool:
+        """Whether searches on ``facet_ids`` are served from the mirror."""
+        return settings.ZOMATO_LOCAL_SEARCH and self.covers(dimension, facet_ids)
+
+    def search(self, q: str, dimension: str, facet_ids: Iterable, start: int, city_id: int) -> Optional[Dict]:
+        """
+        A search API response built from the mirror, or None when the
+        mirror does not answer for the facets searched or has no match for
+        ``q``, the API may still find one.
+        """
+        if not self.answers(dimension, facet_ids):
+            return None
+
+        restaurants = Restaurant.objects.filter(**{f'{FACET_FIELDS[dimension]}__in': list(facet_ids)}).distinct()
+        if q:
+            # Ranked by relevance within the facet, before the match limit.
+            ranked = TEXT_INDEX.search(q, candidates=restaurants.values_list('id', flat=True))
+            if not ranked:
+                return None
+            page_ids = ranked[start:start + self.PAGE_SIZE]
+            rows = Restaurant.objects.in_bulk(page_ids)
+            page = [rows[id] for id in page_ids if id in rows]
+            results_found = len(ranked)
+        else:
+            page = list(restaurants.order_by('-aggregate_rating', 'id')[start:start + self.PAGE_SIZE])
+            results_found = restaurants.count()
+        return {
+            'results_found': results_found,
+            'results_start': start,
+            'results_shown': len(page),
+            'restaurants': [{'restaurant': restaurant.as_payload()} for restaurant in page],
+        }
+
+    def iter_search(self, q: str, dimension: str, facet_ids: Iterable) -> Iterator[Dict]:
+        """Every mirrored restaurant ``search`` would page through, as search API results."""
+        restaurants = Restaurant.objects.filter(**{f'{FACET_FIELDS[dimension]}__in': list(facet_ids)}).distinct()
+        if not q:
+            for restaurant in restaurants.order_by('-aggregate_rating', 'id').iterator(chunk_size=self.CHUNK_SIZE):
+                yield restaurant.as_payload()
+            return
+
+        for chunk in chunks(TEXT_INDEX.search(q, candidates=restaurants.values_list('id', flat=True)),
+                            self.CHUNK_SIZE):
+            rows = restaurants.in_bulk(chunk)
+            for id in chunk:
+                if id in rows:
+                    yield rows[id].as_payload()
+
+    def facet_search(self, filters: Dict[str, Iterable], match_all: bool = False, start: int = 0) -> Optional[Dict]:
+        """
+        A search API response for restaurants in several facets, with the
+        number of matches per facet under 'facets'. Facets of a dimension
+        are ORed, or ANDed with ``match_all``, dimensions are ANDed. None
+        unless the mirror covers every facet filtered on.
+        """
+        filters = {dimension: facet_ids for dimension, facet_ids in filters.items() if facet_ids}
+        if not filters or not all(self.answers(dimension, facet_ids) for dimension, facet_ids in filters.items()):
+            return None
+
+        index = FACET_INDEX.get()
+        matched = index.match({dimension: [int(id) for id in facet_ids] for dimension, facet_ids in filters.items()},
+                              match_all)
+        page_ids = index.restaurant_ids(matched, start, self.PAGE_SIZE)
+        rows = Restaurant.objects.in_bulk(page_ids)
+        page = [rows[id] for id in page_ids if id in rows]
+        return {
+            'results_found': count_bits(matched),
+            'results_start': start,
+            'results_shown': len(page),
+            'restaurants': [{'restaurant': restaurant.as_payload()} for restaurant in page],
+            'facets': {dimension: index.counts(dimension, matched) for dimension in FACET_FIELDS},
+        }
+
+    def _add_members(self, dimension: str, facet_ids: List[int], restaurant_ids: List[int]) -> None:
+        model = FACET_MODELS[dimension]
+        model.objects.bulk_create([model(id=id, name='') for id in facet_ids], ignore_conflicts=True)
+
+        through = getattr(Restaurant, FACET_FIELDS[dimension]).through
+        facet_column = f'{model._meta.model_name}_id'
+        members = [through(restaurant_id=restaurant_id, **{facet_column: facet_id})
+                   for facet_id in facet_ids for restaurant_id in restaurant_ids]
+        through.objects.bulk_create(members, batch_size=self.CHUNK_SIZE, ignore_conflicts=True)
+        # Rolled back ingests must not leave bits behind.
+        transaction.on_commit(lambda: FACET_INDEX.add(dimension, facet_ids, restaurant_ids))
+
+    @staticmethod
+    def _build(item: Dict, now) -> Restaurant:
+        location = item.get('location') or {}
+        fields = {
+            'name': item['name'],
+            'url': item.get('url') or '',
+            'thumb': item.get('thumb') or '',
+            'cuisine_names': item.get('cuisines') or '',
+            'has_online_delivery': bool(item.get('has_online_delivery')),
+            'average_cost_for_two': int(item.get('average_cost_for_two') or 0),
+            'phone_numbers': item.get('phone_numbers') or '',
+            'locality': location.get('locality') or '',
+            'address': location.get('address') or '',
+            'aggregate_rating': float((item.get('user_rating') or {}).get('aggregate_rating') or 0),
+        }
+        payload_hash = hashlib.md5(json.dumps(fields, sort_keys=True).encode()).hexdigest()
+        return Restaurant(id=int(item['id']), payload_hash=payload_hash, synced_at=now, **fields)
+
+
+FACET_INDEX = FacetIndex(FACET_FIELDS)
+CATALOG = Catalog()
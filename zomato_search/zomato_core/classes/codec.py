@@ -0,0 +1,95 @@
+import pickle
+import zlib
+from typing import Any, Dict, Iterable, Optional
+
+from django.conf import settings
+from django_redis.serializers.base import BaseSerializer
+
+from zomato_search.zomato_core.classes.mapping import SEARCH_RESTAURANT, RESTAURANT_DETAILS
+
+# Fields of a search result restaurant read by the views, the API and
+# Catalog.ingest. Anything else in the upstream payload is dropped.
+SEARCH_RESTAURANT_PATHS = SEARCH_RESTAURANT.paths() | {
+    'location.address', 'user_rating.aggregate_rating',
+}
+SEARCH_PAGE_PATHS = {'results_found', 'results_start', 'results_shown'}
+# RESTAURANT_DETAILS leaves the id to its callers, batch lookups still key on it.
+RESTAURANT_PATHS = RESTAURANT_DETAILS.paths() | {'id', 'thumb', 'location.locality'}
+
+PICKLED = b'p'
+COMPRESSED = b'z'
+
+
+def project(item: Dict, paths: Iterable[str]) -> Dict:
+    """
+    Copy of ``item`` with only the dotted ``paths`` it has, e.g.
+    ``project(item, {'name', 'location.locality'})``.
+    """
+    projected = {}  # type: Dict[str, Any]
+    for path in paths:
+        source, target = item, projected  # type: Optional[Dict], Dict[str, Any]
+        *parents, leaf = path.split('.')
+        for key in parents:
+            source = source.get(key) if isinstance(source, dict) else None
+            if source is None:
+                break
+            target = target.setdefault(key, {})
+        else:
+            if isinstance(source, dict) and leaf in source:
+                target[leaf] = source[leaf]
+    return projected
+
+
+def project_search(payload: Dict) -> Dict:
+    """A search API response with only the fields this project reads."""
+    page = project(payload, SEARCH_PAGE_PATHS)
+    page['restaurants'] = [{'restaurant': project(item['restaurant'], SEARCH_RESTAURANT_PATHS)}
+                           for item in payload.get('restaurants', [])]
+    return page
+
+
+def project_restaurant(payload: Dict) -> Dict:
+    """A restaurant API response with only the fields this project reads."""
+    return project(payload, RESTAURANT_PATHS)
+
+
+def dumps(value: Any, compress_min_bytes: int = None) -> bytes:
+    """
+    Pickles ``value`` with the highest protocol, zlib compressed once it
+    is ZOMATO_CODEC_COMPRESS_MIN_BYTES or more. A leading byte records
+    which.
+    """
+    data = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+    if compress_min_bytes is None:
+        compress_min_bytes = settings.ZOMATO_CODEC_COMPRESS_MIN_BYTES
+    if len(data) >= compress_min_bytes:
+        return COMPRESSED + zlib.compress(data, settings.ZOMATO_CODEC_COMPRESS_LEVEL)
+    return PICKLED + data
+
+
+def loads(data: bytes) -> Any:
+    marker, body = data[:1], data[1:]
+    if marker == COMPRESSED:
+        return pickle.loads(zlib.decompress(body))
+    if marker == PICKLED:
+        return pickle.loads(body)
+    # Written by django-redis' own pickle serializer, before this one.
+    return pickle.loads(data)
+
+
+class CompactSerializer(BaseSerializer):
+    """
+    django-redis serializer using ``dumps``/``loads``. Set it as the cache's
+    ``OPTIONS["SERIALIZER"]``; ``OPTIONS["COMPRESS_MIN_BYTES"]`` overrides
+    ZOMATO_CODEC_COMPRESS_MIN_BYTES.
+    """
+
+    def __init__(self, options: Dict):
+        super().__init__(options=options)
+        self.compress_min_bytes = options.get('COMPRESS_MIN_BYTES')  # type: Optional[int]
+
+    def dumps(self, value: Any) -> bytes:
+        return dumps(value, self.compress_min_bytes)
+
+    def loads(self, value: bytes) -> Any:
+        return loads(value)
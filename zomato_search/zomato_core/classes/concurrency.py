@@ -0,0 +1,60 @@
+import contextvars
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Hashable, Iterable, Tuple, TypeVar
+
+from django.conf import settings
+
+K = TypeVar('K', bound=Hashable)
+
+_executors = {}  # type: Dict[str, ThreadPoolExecutor]
+_executors_pid = None
+_lock = threading.Lock()
+
+
+def get_executor(name: str) -> ThreadPoolExecutor:
+    """
+    Bounded thread pool shared by the worker process, sized from
+    ``ZOMATO_EXECUTOR_WORKERS[name]``. Pools are created lazily and again
+    after a fork, since threads do not survive into the child.
+    """
+    global _executors_pid
+    with _lock:
+        if _executors_pid != os.getpid():
+            _executors.clear()
+            _executors_pid = os.getpid()
+        executor = _executors.get(name)
+        if executor is None:
+            executor = ThreadPoolExecutor(max_workers=settings.ZOMATO_EXECUTOR_WORKERS[name],
+                                          thread_name_prefix=f'zomato-{name}')
+            _executors[name] = executor
+        return executor
+
+
+def fan_out(producers: Dict[K, Callable[[], Any]], inline: Iterable[K] = ()) -> Tuple[Dict[K, Any], Dict[K, float]]:
+    """
+    Runs independent producers concurrently on the 'fanout' pool and returns
+    ``(results, timings)``, timings being milliseconds per producer.
+    Producers named in ``inline`` run on the calling thread instead: database
+    work has to stay on the request's connection and transaction. Pooled
+    producers run in a copy of the caller's context, so they record into
+    its request timings.
+    """
+    timings = {}  # type: Dict[K, float]
+
+    def timed(name):
+        started = time.perf_counter()
+        try:
+            return producers[name]()
+        finally:
+            timings[name] = (time.perf_counter() - started) * 1000
+
+    inline = set(inline)
+    executor = get_executor('fanout')
+    futures = {name: executor.submit(contextvars.copy_context().run, timed, name)
+               for name in producers if name not in inline}
+    results = {name: timed(name) for name in producers if name in inline}
+    results.update({name: future.result() for name, future in futures.items()})
+    return results, timings
@@ -1,32 +1,65 @@
-class Restaurant:
-    def __init__(self):
-        self.id = None
-        self.name = None
-        self.url = None
-        self.rating = None
-        self.average_cost_for_two = None
-        self.thumbnail_url = None
-        self.has_online_delivery = None
-        self.cuisines = None
-        self.phone_numbers = None
-        self.address = None
-        self.location = None
-        self.photos_url = None
-        self.menu_url = None
-
-
-class Cuisine:
-    def __init__(self):
-        self.id = None
-        self.name = None
-
-
-class Category:
-    def __init__(self):
-        self.id = None
-        self.name = None
-
-class Type:
-    def __init__(self):
-        self.id = None
-        self.name = None
+from typing import Any, Dict, Optional, Tuple, Union
+
+
+class Entity:
+    """
+    What the views render: a fixed set of fields in ``__slots__``, so
+    instances carry no ``__dict__``. Fields not given are None.
+    """
+    __slots__ = ()  # type: Tuple[str, ...]
+
+    def __init__(self, **values: Any):
+        unknown = set(values) - set(self.__slots__)
+        if unknown:
+            raise TypeError(f'{type(self).__name__} has no fields {", ".join(sorted(unknown))}')
+        for name in self.__slots__:
+            setattr(self, name, values.get(name))
+
+    def __eq__(self, other: Any) -> bool:
+        return type(other) is type(self) and self.as_dict() == other.as_dict()
+
+    def __repr__(self) -> str:
+        return f'{type(self).__name__}(id={getattr(self, "id", None)!r}, name={getattr(self, "name", None)!r})'
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {name: getattr(self, name) for name in self.__slots__}
+
+
+class Restaurant(Entity):
+    __slots__ = ('id', 'name', 'url', 'rating', 'average_cost_for_two', 'thumbnail_url', 'has_online_delivery',
+                 'cuisines', 'phone_numbers', 'address', 'location', 'photos_url', 'menu_url', 'review_count',
+                 'review_average')
+    # Upstream sends ids as strings, the catalog and the views use ints.
+    id: Union[int, str]
+    name: str
+    url: Optional[str]
+    rating: Optional[str]
+    average_cost_for_two: Optional[int]
+    thumbnail_url: Optional[str]
+    has_online_delivery: Optional[int]
+    cuisines: Optional[str]
+    phone_numbers: Optional[str]
+    address: Optional[str]
+    location: Optional[str]
+    photos_url: Optional[str]
+    menu_url: Optional[str]
+    review_count: Optional[int]
+    review_average: Optional[float]
+
+
+class Cuisine(Entity):
+    __slots__ = ('id', 'name')
+    id: int
+    name: str
+
+
+class Category(Entity):
+    __slots__ = ('id', 'name')
+    id: int
+    name: str
+
+
+class Type(Entity):
+    __slots__ = ('id', 'name')
+    id: int
+    name: str
@@ -0,0 +1,153 @@
+import threading
+import time
+from itertools import islice
+from typing import Dict, Iterable, Iterator, List, Optional
+
+from django.conf import settings
+
+from zomato_search.zomato_core.models import Restaurant
+
+
+def iter_bits(bitmap: int) -> Iterator[int]:
+    """Positions of the set bits of ``bitmap``, lowest first."""
+    while bitmap:
+        lowest = bitmap & -bitmap
+        yield lowest.bit_length() - 1
+        bitmap ^= lowest
+
+
+def count_bits(bitmap: int) -> int:
+    return bin(bitmap).count('1')
+
+
+class BitsetIndex:
+    """
+    Facet id -> bitmap of restaurants per dimension, using Python ints as
+    bitsets. Restaurants get one bit position each, assigned in the order
+    they are added, so results come back in that order.
+    """
+
+    def __init__(self, dimensions: Iterable[str]):
+        self._ids = []  # type: List[int]
+        self._positions = {}  # type: Dict[int, int]
+        self._bitmaps = {dimension: {} for dimension in dimensions}  # type: Dict[str, Dict[int, int]]
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def register(self, restaurant_ids: Iterable[int]) -> None:
+        """Assigns positions to restaurants not in the index yet."""
+        with self._lock:
+            for restaurant_id in restaurant_ids:
+                self._position(restaurant_id)
+
+    def add(self, dimension: str, facet_id: int, restaurant_ids: Iterable[int]) -> None:
+        bitmap = 0
+        with self._lock:
+            for restaurant_id in restaurant_ids:
+                bitmap |= 1 << self._position(restaurant_id)
+            bitmaps = self._bitmaps[dimension]
+            bitmaps[facet_id] = bitmaps.get(facet_id, 0) | bitmap
+
+    def remove(self, dimension: str, facet_id: int, restaurant_ids: Iterable[int]) -> None:
+        bitmap = 0
+        with self._lock:
+            for restaurant_id in restaurant_ids:
+                position = self._positions.get(restaurant_id)
+                if position is not None:
+                    bitmap |= 1 << position
+            bitmaps = self._bitmaps[dimension]
+            if facet_id in bitmaps:
+                bitmaps[facet_id] &= ~bitmap
+
+    def match(self, filters: Dict[str, Iterable[int]], match_all: bool = False) -> int:
+        """
+        Restaurants in any (or, with ``match_all``, every) facet of each
+        dimension filtered on. Dimensions are always combined with AND.
+        """
+        result = None  # type: Optional[int]
+        with self._lock:
+            for dimension, facet_ids in filters.items():
+                bitmaps = [self._bitmaps[dimension].get(facet_id, 0) for facet_id in facet_ids]
+                if not bitmaps:
+                    continue
+                matched = bitmaps[0]
+                for bitmap in bitmaps[1:]:
+                    matched = matched & bitmap if match_all else matched | bitmap
+                result = matched if result is None else result & matched
+        return result or 0
+
+    def counts(self, dimension: str, bitmap: int = None) -> Dict[int, int]:
+        """Restaurants per facet of ``dimension``, within ``bitmap`` when given."""
+        with self._lock:
+            bitmaps = list(self._bitmaps[dimension].items())
+        counts = {}
+        for facet_id, facet_bitmap in bitmaps:
+            count = count_bits(facet_bitmap if bitmap is None else facet_bitmap & bitmap)
+            if count:
+                counts[facet_id] = count
+        return counts
+
+    def restaurant_ids(self, bitmap: int, start: int = 0, limit: int = None) -> List[int]:
+        positions = islice(iter_bits(bitmap), start, None if limit is None else start + limit)
+        with self._lock:
+            return [self._ids[position] for position in positions]
+
+    def _position(self, restaurant_id: int) -> int:
+        position = self._positions.get(restaurant_id)
+        if position is None:
+            position = self._positions[restaurant_id] = len(self._ids)
+            self._ids.append(restaurant_id)
+        return position
+
+
+class FacetIndex:
+    """
+    ``BitsetIndex`` over the catalog's restaurant facets. Built from the
+    database, best rated restaurants first, and rebuilt every
+    ZOMATO_FACET_INDEX_MAX_AGE seconds to pick up other workers' writes;
+    restaurants added in between are ordered after it.
+    """
+
+    def __init__(self, fields: Dict[str, str]):
+        self.fields = fields
+        self._index = BitsetIndex(fields)
+        self._built_at = None  # type: Optional[float]
+        self._lock = threading.Lock()
+
+    def add(self, dimension: str, facet_ids: Iterable[int], restaurant_ids: Iterable[int]) -> None:
+        if self._built_at is not None:
+            restaurant_ids = list(restaurant_ids)
+            for facet_id in facet_ids:
+                self._index.add(dimension, facet_id, restaurant_ids)
+
+    def remove(self, dimension: str, facet_id: int, restaurant_ids: Iterable[int]) -> None:
+        if self._built_at is not None:
+            self._index.remove(dimension, facet_id, restaurant_ids)
+
+    def get(self) -> BitsetIndex:
+        self._ensure_built()
+        return self._index
+
+    def clear(self) -> None:
+        with self._lock:
+            self._index = BitsetIndex(self.fields)
+            self._built_at = None
+
+    def _ensure_built(self) -> None:
+        with self._lock:
+            if self._built_at is not None and time.monotonic() - self._built_at < settings.ZOMATO_FACET_INDEX_MAX_AGE:
+                return
+            index = BitsetIndex(self.fields)
+            index.register(Restaurant.objects.order_by('-aggregate_rating', 'id').values_list('id', flat=True))
+            for dimension, name in self.fields.items():
+                field = Restaurant._meta.get_field(name)
+                members = {}  # type: Dict[int, List[int]]
+                for restaurant_id, facet_id in field.remote_field.through.objects.values_list(
+                        field.m2m_column_name(), field.m2m_reverse_name()).iterator():
+                    members.setdefault(facet_id, []).append(restaurant_id)
+                for facet_id, restaurant_ids in members.items():
+                    index.add(dimension, facet_id, restaurant_ids)
+            self._index = index
+            self._built_at = time.monotonic()
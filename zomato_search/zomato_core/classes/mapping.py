@@ -0,0 +1,113 @@
+from typing import Any, Callable, Dict, Generic, Iterable, List, Optional, Set, Type, TypeVar, Union
+
+from zomato_search.zomato_core.classes.entities import Entity, Restaurant, Cuisine, Category, Type as EstablishmentType
+
+E = TypeVar('E', bound=Entity)
+
+
+def strip_query(url: Optional[str]) -> Optional[str]:
+    """Upstream URLs without their tracking query string."""
+    return url.split('?')[0] if url else url
+
+
+class Field:
+    """
+    A dotted path into an upstream item, e.g. ``'location.locality'``,
+    with an optional conversion applied to the value found. A missing key
+    raises KeyError, or maps to None when the field is not ``required``.
+    """
+    __slots__ = ('keys', 'convert', 'required')
+
+    def __init__(self, path: str, convert: Callable[[Any], Any] = None, required: bool = True):
+        self.keys = tuple(path.split('.'))
+        self.convert = convert
+        self.required = required
+
+
+class Mapping(Generic[E]):
+    """
+    Declarative upstream payload -> entity mapping. Only the fields
+    listed are read, everything else in the payload is ignored. Items of
+    reference data lists wrap the object in ``item_key``, e.g.
+    ``{'cuisine': {...}}``.
+
+    Like dataclasses, the mapping is compiled into one plain function, so
+    mapping an item costs no more than assigning its fields by hand.
+    """
+
+    def __init__(self, entity: Type[E], fields: Dict[str, Union[str, Field]], item_key: str = None):
+        unknown = set(fields) - set(entity.__slots__)
+        if unknown:
+            raise TypeError(f'{entity.__name__} has no fields {", ".join(sorted(unknown))}')
+        self.entity = entity
+        self.item_key = item_key
+        self.fields = {name: field if isinstance(field, Field) else Field(field) for name, field in fields.items()}
+        self.map = self._compile()  # type: Callable[[Dict], E]
+
+    def map_many(self, items: Iterable[Dict]) -> List[E]:
+        map = self.map
+        return [map(item) for item in items]
+
+    def paths(self) -> Set[str]:
+        """Dotted paths of the payload fields read, relative to ``item_key``."""
+        return {'.'.join(field.keys) for field in self.fields.values()}
+
+    def _compile(self) -> Callable[[Dict], E]:
+        namespace = {'entity_class': self.entity, 'new': object.__new__, 'empty': {}}  # type: Dict[str, Any]
+        lines = []  # type: List[str]
+        if self.item_key is not None:
+            lines.append(f'    item = item[{self.item_key!r}]')
+        lines.append('    entity = new(entity_class)')
+        for name in self.entity.__slots__:
+            field = self.fields.get(name)
+            if field is None:
+                # Unmapped fields are still read by templates.
+                lines.append(f'    entity.{name} = None')
+                continue
+            value = 'item'
+            for key in field.keys:
+                value = f'{value}[{key!r}]' if field.required else f'({value} or empty).get({key!r})'
+            if field.convert is None:
+                lines.append(f'    entity.{name} = {value}')
+            else:
+                namespace[f'convert_{name}'] = field.convert
+                lines.append(f'    value = {value}')
+                lines.append(f'    entity.{name} = None if value is None else convert_{name}(value)')
+        lines.append('    return entity')
+        # Globals are bound as defaults, local lookups are cheaper.
+        signature = ', '.join(f'{name}={name}' for name in namespace)
+        exec(f'def map(item, *, {signature}):\n' + '\n'.join(lines), namespace)
+        return namespace['map']
+
+
+CUISINE = Mapping(Cuisine, {'id': 'cuisine_id', 'name': 'cuisine_name'}, item_key='cuisine')
+CATEGORY = Mapping(Category, {'id': 'id', 'name': 'name'}, item_key='categories')
+TYPE = Mapping(EstablishmentType, {'id': 'id', 'name': 'name'}, item_key='establishment')
+
+# A restaurant of a search API page, ``{'restaurant': {...}}``.
+SEARCH_RESTAURANT = Mapping(Restaurant, {
+    'id': 'id',
+    'name': 'name',
+    'url': Field('url', strip_query),
+    'has_online_delivery': 'has_online_delivery',
+    'cuisines': 'cuisines',
+    'average_cost_for_two': 'average_cost_for_two',
+    'phone_numbers': 'phone_numbers',
+    'thumbnail_url': 'thumb',
+    'location': 'location.locality',
+}, item_key='restaurant')
+
+# A restaurant API response. Callers set ``id`` from the request.
+RESTAURANT_DETAILS = Mapping(Restaurant, {
+    'name': 'name',
+    'url': Field('url', strip_query),
+    'has_online_delivery': 'has_online_delivery',
+    'cuisines': 'cuisines',
+    'average_cost_for_two': 'average_cost_for_two',
+    'phone_numbers': 'phone_numbers',
+    'thumbnail_url': 'featured_image',
+    'address': 'location.address',
+    'rating': 'user_rating.aggregate_rating',
+    'photos_url': 'photos_url',
+    'menu_url': 'menu_url',
+})
@@ -0,0 +1,170 @@
+import asyncio
+import os
+import time
+from functools import wraps
+from typing import Callable, Dict, Iterator, List
+
+from prometheus_client import CollectorRegistry, Counter, Gauge, Histogram, REGISTRY, generate_latest
+from prometheus_client import multiprocess
+from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily, Metric
+
+# Cache hits take microseconds, upstream calls up to the API timeout.
+LATENCY_BUCKETS = (.001, .005, .01, .025, .05, .1, .25, .5, 1, 2.5, 5, 10, 15)
+
+HANDLER_LATENCY = Histogram('zomato_handler_seconds', 'Time spent in Zomato handler methods, cache hits included',
+                            ['method'], buckets=LATENCY_BUCKETS)
+HANDLER_ERRORS = Counter('zomato_handler_errors_total', 'Zomato handler calls that raised', ['method', 'exception'])
+HANDLER_IN_FLIGHT = Gauge('zomato_handler_in_flight', 'Zomato handler calls in progress', ['method'],
+                          multiprocess_mode='livesum')
+UPSTREAM_LATENCY = Histogram('zomato_upstream_seconds', 'Time spent in Zomato API requests', ['endpoint'],
+                             buckets=LATENCY_BUCKETS)
+UPSTREAM_ERRORS = Counter('zomato_upstream_errors_total', 'Zomato API requests that failed', ['endpoint'])
+VIEW_LATENCY = Histogram('zomato_view_seconds', 'Time to respond, by view', ['view', 'method', 'status'],
+                         buckets=LATENCY_BUCKETS)
+
+MULTIPROCESS_DIR_VARIABLES = ('prometheus_multiproc_dir', 'PROMETHEUS_MULTIPROC_DIR')
+
+# Collectors reading state a process keeps in memory, see register_process_collector.
+PROCESS_COLLECTORS = []  # type: List
+
+# Connection pool fields of ZomatoClient.stats. Requests and errors are
+# already counted by zomato_upstream_seconds and zomato_upstream_errors.
+POOL_GAUGES = (
+    ('pool_size', 'zomato_upstream_pool_size', 'Keep-alive connections the Zomato API pool holds'),
+    ('in_flight', 'zomato_upstream_in_flight', 'Zomato API requests in progress'),
+    ('max_in_flight', 'zomato_upstream_max_in_flight', 'Most Zomato API requests in progress at once'),
+    ('connections_opened', 'zomato_upstream_connections_opened', 'Connections the Zomato API pool has opened'),
+    ('idle_connections', 'zomato_upstream_idle_connections', 'Idle connections in the Zomato API pool'),
+)
+
+
+def instrumented(method: str) -> Callable:
+    """
+    Records latency, errors and calls in flight of the decorated function
+    or coroutine function as ``method``.
+    """
+    latency = HANDLER_LATENCY.labels(method)
+    in_flight = HANDLER_IN_FLIGHT.labels(method)
+
+    def decorator(function: Callable) -> Callable:
+        if asyncio.iscoroutinefunction(function):
+            @wraps(function)
+            async def wrapper(*args, **kwargs):
+                started = time.perf_counter()
+                in_flight.inc()
+                try:
+                    return await function(*args, **kwargs)
+                except Exception as e:
+                    HANDLER_ERRORS.labels(method, type(e).__name__).inc()
+                    raise
+                finally:
+                    in_flight.dec()
+                    latency.observe(time.perf_counter() - started)
+        else:
+            @wraps(function)
+            def wrapper(*args, **kwargs):
+                started = time.perf_counter()
+                in_flight.inc()
+                try:
+                    return function(*args, **kwargs)
+                except Exception as e:
+                    HANDLER_ERRORS.labels(method, type(e).__name__).inc()
+                    raise
+                finally:
+                    in_flight.dec()
+                    latency.observe(time.perf_counter() - started)
+        return wrapper
+
+    return decorator
+
+
+class HandlerStatsCollector:
+    """
+    ``ZomatoHandler.cache_stats`` and ``pool_stats`` as metrics. Both count
+    from the start of the process serving the scrape, in multiprocess mode
+    its samples are labelled with its pid.
+    """
+
+    def __init__(self, cache_stats: Callable[[], Dict], pool_stats: Callable[[], Dict]):
+        self.cache_stats = cache_stats
+        self.pool_stats = pool_stats
+
+    def describe(self) -> List[Metric]:
+        # The stats are only read on scrape, not when registering.
+        return []
+
+    def collect(self) -> Iterator[Metric]:
+        pid = [str(os.getpid())] if multiprocess_dir() else []
+        pid_label = ['pid'] if pid else []
+
+        caches = self.cache_stats()
+        flights = caches.pop('flights', {})
+        tiers = caches.pop('tiers', {})
+        hits = CounterMetricFamily('zomato_cache_hits', 'Zomato cache lookups that hit', labels=['cache'] + pid_label)
+        misses = CounterMetricFamily('zomato_cache_misses', 'Zomato cache lookups that missed',
+                                     labels=['cache'] + pid_label)
+        refreshes = CounterMetricFamily('zomato_cache_refreshes', 'Stale Zomato cache entries refreshed',
+                                        labels=['cache'] + pid_label)
+        for name, stats in caches.items():
+            hits.add_metric([name] + pid, stats['hits'])
+            misses.add_metric([name] + pid, stats['misses'])
+            if 'refreshes' in stats:
+                refreshes.add_metric([name] + pid, stats['refreshes'])
+        yield from (hits, misses, refreshes)
+
+        if tiers:
+            tier_hits = CounterMetricFamily('zomato_cache_tier_hits', 'Django cache lookups that hit, by tier',
+                                            labels=['tier'] + pid_label)
+            tier_misses = CounterMetricFamily('zomato_cache_tier_misses', 'Django cache lookups that missed, by tier',
+                                              labels=['tier'] + pid_label)
+            for tier, stats in tiers.items():
+                tier_hits.add_metric([tier] + pid, stats['hits'])
+                tier_misses.add_metric([tier] + pid, stats['misses'])
+            yield from (tier_hits, tier_misses)
+
+        calls = CounterMetricFamily('zomato_flight_calls', 'Coalesced upstream calls by role',
+                                    labels=['role'] + pid_label)
+        for role, count in flights.items():
+            calls.add_metric([role] + pid, count)
+        yield calls
+
+        pool = self.pool_stats()
+        for field, name, documentation in POOL_GAUGES:
+            gauge = GaugeMetricFamily(name, documentation, labels=pid_label)
+            gauge.add_metric(pid, pool[field])
+            yield gauge
+
+
+def register_process_collector(collector) -> None:
+    """
+    Exposes ``collector`` on every scrape, in multiprocess mode as well.
+    Its samples come from the process serving the scrape only.
+    """
+    PROCESS_COLLECTORS.append(collector)
+    REGISTRY.register(collector)
+
+
+def multiprocess_dir() -> str:
+    """
+    Directory worker processes write their samples to, if any.
+    prometheus_client reads the lowercase variable before 0.10, the
+    uppercase one after.
+    """
+    for variable in MULTIPROCESS_DIR_VARIABLES:
+        if os.environ.get(variable):
+            return os.environ[variable]
+    return ''
+
+
+def render() -> bytes:
+    """
+    Every metric in Prometheus text format. In multiprocess mode, samples
+    are aggregated over all worker processes, not just this one.
+    """
+    if multiprocess_dir():
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        for collector in PROCESS_COLLECTORS:
+            registry.register(collector)
+        return generate_latest(registry)
+    return generate_latest(REGISTRY)
@@ -0,0 +1,40 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.utils import timezone
+
+
+class UpstreamQuota:
+    """
+    Zomato API calls made today by every worker, counted in the shared
+    cache against ``ZOMATO_DAILY_QUOTA``.
+    """
+    PREFIX = 'zomato:quota'
+
+    def __init__(self, daily_limit: int = None):
+        self.daily_limit = daily_limit or settings.ZOMATO_DAILY_QUOTA
+
+    def _key(self) -> str:
+        return f'{self.PREFIX}:{timezone.now().date().isoformat()}'
+
+    def record(self, calls: int = 1) -> None:
+        key = self._key()
+        if cache.add(key, calls, timeout=60 * 60 * 48):
+            return
+        try:
+            cache.incr(key, calls)
+        except ValueError:
+            # Expired between add and incr.
+            cache.add(key, calls, timeout=60 * 60 * 48)
+
+    def used(self) -> int:
+        return cache.get(self._key()) or 0
+
+    def remaining(self) -> int:
+        return max(self.daily_limit - self.used(), 0)
+
+    def allows(self, share: float) -> bool:
+        """Whether less than ``share`` of today's quota has been used."""
+        return self.used() < self.daily_limit * share
+
+
+QUOTA = UpstreamQuota()
@@ -0,0 +1,176 @@
+import asyncio
+import hashlib
+import os
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Awaitable, Callable, Dict, Hashable, Tuple
+
+from django.conf import settings
+from django.core.cache import cache
+
+
+class Flights:
+    """
+    What ``SingleFlight`` and ``AsyncSingleFlight`` share: the cache lock
+    and result keys processes coalesce on, and the call counts.
+    """
+    PREFIX = 'zomato:flight'
+
+    def __init__(self, timeout: float = None, poll_interval: float = None):
+        self.timeout = timeout or settings.ZOMATO_FLIGHT_TIMEOUT
+        self.poll_interval = poll_interval or settings.ZOMATO_FLIGHT_POLL_INTERVAL
+        self._lock = threading.Lock()
+        self._counts = {'leaders': 0, 'local_waits': 0, 'remote_waits': 0}
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return dict(self._counts)
+
+    def _cache_keys(self, key: Hashable) -> Tuple[str, str]:
+        digest = hashlib.md5(repr(key).encode()).hexdigest()
+        return f'{self.PREFIX}:{digest}:lock', f'{self.PREFIX}:{digest}:result'
+
+    @staticmethod
+    def _poll(lock_key: str, result_key: str) -> Tuple[bool, Any]:
+        """
+        Whether another process's flight ended, with its result or None
+        if it went away without one.
+        """
+        result = cache.get(result_key)
+        if result is not None:
+            return True, result
+        if cache.get(lock_key) is None:
+            # The holder may have published between the two reads.
+            return True, cache.get(result_key)
+        return False, None
+
+    def _count(self, name: str) -> None:
+        self._counts[name] += 1
+
+
+class SingleFlight(Flights):
+    """
+    Coalesces concurrent calls for the same key so only one caller runs
+    ``fetch`` and the others get its result.
+
+    Threads of a process wait on the leader's Future. Across processes a
+    short-lived cache lock (``SET NX`` on Redis) elects the fetcher and the
+    other processes poll for the result it publishes, falling back to their
+    own fetch if the lock holder goes away without one.
+    """
+
+    def __init__(self, timeout: float = None, poll_interval: float = None):
+        super().__init__(timeout, poll_interval)
+        self._futures = {}  # type: Dict[Hashable, Future]
+
+    def do(self, key: Hashable, fetch: Callable[[], Any]) -> Any:
+        with self._lock:
+            future = self._futures.get(key)
+            leader = future is None
+            if future is None:
+                future = self._futures[key] = Future()
+            self._count('leaders' if leader else 'local_waits')
+
+        if not leader:
+            return future.result()
+
+        try:
+            result = self._fetch_across_processes(key, fetch)
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                del self._futures[key]
+
+    def _fetch_across_processes(self, key: Hashable, fetch: Callable[[], Any]) -> Any:
+        lock_key, result_key = self._cache_keys(key)
+        if cache.add(lock_key, os.getpid(), timeout=self.timeout):
+            try:
+                result = fetch()
+                cache.set(result_key, result, timeout=self.timeout)
+                return result
+            finally:
+                cache.delete(lock_key)
+
+        with self._lock:
+            self._count('remote_waits')
+        deadline = time.monotonic() + self.timeout
+        while time.monotonic() < deadline:
+            finished, result = self._poll(lock_key, result_key)
+            if result is not None:
+                return result
+            if finished:
+                break
+            time.sleep(self.poll_interval)
+        return fetch()
+
+
+class AsyncSingleFlight(Flights):
+    """
+    asyncio counterpart of ``SingleFlight`` for coroutine ``fetch``
+    functions. Callers on one event loop await the leader's result, and
+    processes coalesce through the same cache lock as ``SingleFlight``, so
+    sync and async callers share one upstream call. The cache is polled
+    between ``asyncio.sleep`` calls.
+    """
+
+    def __init__(self, timeout: float = None, poll_interval: float = None):
+        super().__init__(timeout, poll_interval)
+        self._flights = {}  # type: Dict[Tuple[asyncio.AbstractEventLoop, Hashable], asyncio.Future]
+
+    async def do(self, key: Hashable, fetch: Callable[[], Awaitable]) -> Any:
+        loop = asyncio.get_event_loop()
+        with self._lock:
+            flight = self._flights.get((loop, key))
+            leader = flight is None
+            if flight is None:
+                flight = self._flights[loop, key] = loop.create_future()
+            self._count('leaders' if leader else 'local_waits')
+
+        if not leader:
+            # A waiter being cancelled must not cancel the leader's flight.
+            return await asyncio.shield(flight)
+
+        try:
+            result = await self._fetch_across_processes(key, fetch)
+        except asyncio.CancelledError:
+            flight.cancel()
+            raise
+        except Exception as e:
+            flight.set_exception(e)
+            # Retrieved here, so asyncio does not log it when nobody waited.
+            flight.exception()
+            raise
+        else:
+            flight.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                del self._flights[loop, key]
+
+    async def _fetch_across_processes(self, key: Hashable, fetch: Callable[[], Awaitable]) -> Any:
+        lock_key, result_key = self._cache_keys(key)
+        if cache.add(lock_key, os.getpid(), timeout=self.timeout):
+            try:
+                result = await fetch()
+                cache.set(result_key, result, timeout=self.timeout)
+                return result
+            finally:
+                cache.delete(lock_key)
+
+        with self._lock:
+            self._count('remote_waits')
+        deadline = time.monotonic() + self.timeout
+        while time.monotonic() < deadline:
+            finished, result = self._poll(lock_key, result_key)
+            if result is not None:
+                return result
+            if finished:
+                break
+            await asyncio.sleep(self.poll_interval)
+        return await fetch()
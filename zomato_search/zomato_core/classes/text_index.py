@@ -0,0 +1,173 @@
+import math
+import re
+import threading
+import time
+from bisect import bisect_left
+from collections import defaultdict
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from django.conf import settings
+from django.db import connection
+
+from zomato_search.zomato_core.models import Restaurant
+
+TOKEN_RE = re.compile(r'\w+')
+# Restaurant fields searched, with the weight of a match in each.
+FIELD_WEIGHTS = (('name', 3.0), ('cuisine_names', 2.0), ('locality', 1.0))
+# Must stay identical to the expression of the GIN index created by
+# migration 0008_restaurant_search_idx, or PostgreSQL will not use it.
+SEARCH_VECTOR_SQL = (
+    "setweight(to_tsvector('simple', name), 'A') || "
+    "setweight(to_tsvector('simple', cuisine_names), 'B') || "
+    "setweight(to_tsvector('simple', locality), 'C')"
+)
+
+Document = Tuple[int, str, str, str]
+
+
+def tokenize(text: str) -> List[str]:
+    return TOKEN_RE.findall(text.lower())
+
+
+class InvertedIndex:
+    """
+    In-process token -> {restaurant id: weight} index. All query tokens must
+    match, the last one as a prefix so partly typed words already match.
+    Results are ranked by field weight times inverse document frequency.
+    """
+
+    def __init__(self):
+        self._postings = defaultdict(dict)  # type: Dict[str, Dict[int, float]]
+        self._documents = {}  # type: Dict[int, List[str]]
+        self._sorted_tokens = []  # type: List[str]
+        self._lock = threading.RLock()
+
+    def __len__(self) -> int:
+        return len(self._documents)
+
+    def build(self, documents: Iterable[Document]) -> None:
+        index = InvertedIndex()
+        index.add(documents)
+        with self._lock:
+            self._postings, self._documents = index._postings, index._documents
+            self._sorted_tokens = sorted(self._postings)
+
+    def add(self, documents: Iterable[Document]) -> None:
+        with self._lock:
+            for document in documents:
+                id = document[0]
+                self._remove(id)
+                weights = defaultdict(float)  # type: Dict[str, float]
+                for (field, weight), text in zip(FIELD_WEIGHTS, document[1:]):
+                    for token in tokenize(text or ''):
+                        weights[token] += weight
+                for token, weight in weights.items():
+                    self._postings[token][id] = weight
+                self._documents[id] = list(weights)
+            self._sorted_tokens = sorted(self._postings)
+
+    def search(self, q: str, limit: Optional[int] = None, candidates: Set[int] = None) -> List[int]:
+        tokens = tokenize(q)
+        if not tokens:
+            return []
+
+        with self._lock:
+            scores = {}  # type: Dict[int, float]
+            for position, token in enumerate(tokens):
+                matches = self._prefixed(token) if position == len(tokens) - 1 else [token]
+                token_scores = {}  # type: Dict[int, float]
+                for match in matches:
+                    postings = self._postings.get(match, {})
+                    idf = math.log(1 + len(self._documents) / len(postings)) if postings else 0
+                    for id, weight in postings.items():
+                        if candidates is None or id in candidates:
+                            token_scores[id] = max(token_scores.get(id, 0), weight * idf)
+                if position == 0:
+                    scores = token_scores
+                else:
+                    scores = {id: score + token_scores[id] for id, score in scores.items() if id in token_scores}
+                if not scores:
+                    return []
+
+        return sorted(scores, key=lambda id: (-scores[id], id))[:limit]
+
+    def _prefixed(self, prefix: str) -> List[str]:
+        matches = []
+        for token in self._sorted_tokens[bisect_left(self._sorted_tokens, prefix):]:
+            if not token.startswith(prefix):
+                break
+            matches.append(token)
+        return matches
+
+    def _remove(self, id: int) -> None:
+        for token in self._documents.pop(id, []):
+            postings = self._postings[token]
+            postings.pop(id, None)
+            if not postings:
+                del self._postings[token]
+
+
+class TextIndex:
+    """
+    Full-text search over mirrored restaurant names, cuisines and
+    localities. Uses the tsvector GIN index on PostgreSQL and an
+    ``InvertedIndex`` rebuilt every ZOMATO_TEXT_INDEX_MAX_AGE seconds
+    elsewhere.
+    """
+
+    def __init__(self):
+        self._local = InvertedIndex()
+        self._built_at = None  # type: Optional[float]
+        self._lock = threading.Lock()
+
+    def search(self, q: str, limit: int = None, candidates: Iterable[int] = None) -> List[int]:
+        """
+        Restaurant ids matching ``q``, most relevant first. ``candidates``
+        restricts the matches before ``limit`` applies.
+        """
+        limit = limit or settings.ZOMATO_TEXT_SEARCH_LIMIT
+        candidates = None if candidates is None else set(candidates)
+        if connection.vendor == 'postgresql':
+            return self._search_postgres(q, limit, candidates)
+        self._ensure_built()
+        return self._local.search(q, limit, candidates)
+
+    def add(self, restaurants: Iterable[Restaurant]) -> None:
+        if connection.vendor != 'postgresql' and self._built_at is not None:
+            self._local.add((restaurant.id, restaurant.name, restaurant.cuisine_names, restaurant.locality)
+                            for restaurant in restaurants)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._local = InvertedIndex()
+            self._built_at = None
+
+    def _ensure_built(self) -> None:
+        with self._lock:
+            if self._built_at is not None and time.monotonic() - self._built_at < settings.ZOMATO_TEXT_INDEX_MAX_AGE:
+                return
+            self._local.build(Restaurant.objects.values_list('id', 'name', 'cuisine_names', 'locality').iterator())
+            self._built_at = time.monotonic()
+
+    @staticmethod
+    def _search_postgres(q: str, limit: int, candidates: Optional[Set[int]]) -> List[int]:
+        tokens = tokenize(q)
+        if not tokens:
+            return []
+        query = ' & '.join(tokens[:-1] + [f'{tokens[-1]}:*'])
+        params = ['simple', query]  # type: List[Any]
+        restrict = ''
+        if candidates is not None:
+            restrict = 'AND id = ANY(%s) '
+            params.append(list(candidates))
+        sql = (
+            f'SELECT id FROM {Restaurant._meta.db_table}, to_tsquery(%s, %s) query '
+            f'WHERE ({SEARCH_VECTOR_SQL}) @@ query {restrict}'
+            f'ORDER BY ts_rank({SEARCH_VECTOR_SQL}, query) DESC, id LIMIT %s'
+        )
+        with connection.cursor() as cursor:
+            cursor.execute(sql, params + [limit])
+            return [row[0] for row in cursor.fetchall()]
+
+
+TEXT_INDEX = TextIndex()
@@ -0,0 +1,83 @@
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, FrozenSet, Iterator, List, Optional
+
+
+class RequestTimings:
+    """
+    Time spent per phase of one request, e.g. 'upstream', 'db' or
+    'template', with the number of times each phase was entered.
+    Phases may be recorded from several threads, see ``fan_out``.
+    """
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self._phases = {}  # type: Dict[str, List]
+        self._lock = threading.Lock()
+
+    def add(self, phase: str, seconds: float, count: int = 1) -> None:
+        with self._lock:
+            totals = self._phases.setdefault(phase, [0.0, 0])
+            totals[0] += seconds
+            totals[1] += count
+
+    def elapsed(self) -> float:
+        return time.perf_counter() - self.started
+
+    def as_dict(self) -> Dict[str, Dict]:
+        """Milliseconds and count per phase, plus the total so far."""
+        with self._lock:
+            phases = {phase: {'ms': round(seconds * 1000, 1), 'count': count}
+                      for phase, (seconds, count) in self._phases.items()}
+        phases['total'] = {'ms': round(self.elapsed() * 1000, 1), 'count': 1}
+        return phases
+
+    def header(self) -> str:
+        """The phases as a Server-Timing header value."""
+        metrics = []
+        for phase, timing in self.as_dict().items():
+            metric = f'{phase};dur={timing["ms"]}'
+            if timing['count'] > 1:
+                metric += f';desc="{timing["count"]}x"'
+            metrics.append(metric)
+        return ', '.join(metrics)
+
+
+CURRENT = ContextVar('request_timings', default=None)  # type: ContextVar[Optional[RequestTimings]]
+# Phases being timed by the current context, so nested renders count once.
+_OPEN = ContextVar('open_phases', default=frozenset())  # type: ContextVar[FrozenSet[str]]
+
+
+def record(phase: str, seconds: float, count: int = 1) -> None:
+    """Adds to the current request's timings, if any."""
+    timings = CURRENT.get()
+    if timings is not None:
+        timings.add(phase, seconds, count)
+
+
+@contextmanager
+def timed(phase: str) -> Iterator[None]:
+    """Times the block as ``phase`` of the current request, unless nested in it."""
+    open_phases = _OPEN.get()
+    if CURRENT.get() is None or phase in open_phases:
+        yield
+        return
+
+    token = _OPEN.set(open_phases | {phase})
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        record(phase, time.perf_counter() - started)
+        _OPEN.reset(token)
+
+
+def time_query(execute, sql, params, many, context):
+    """``connection.execute_wrapper`` recording queries as the 'db' phase."""
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        record('db', time.perf_counter() - started)
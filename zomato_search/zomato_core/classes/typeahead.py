@@ -0,0 +1,135 @@
+import heapq
+import logging
+import threading
+import time
+from bisect import bisect_left
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from django.conf import settings
+from django.db import connections
+from django.db.models import Count
+
+from zomato_search.zomato_core.classes.concurrency import get_executor
+from zomato_search.zomato_core.classes.text_index import tokenize
+from zomato_search.zomato_core.models import Cuisine, Restaurant, SearchQuery
+
+logger = logging.getLogger(__name__)
+
+# (text, kind, weight)
+Suggestion = Tuple[str, str, float]
+
+
+class PrefixIndex:
+    """
+    Sorted array of suggestion keys searched with bisect. Every word of a
+    suggestion starts a key, so 'hut' completes to 'Pizza Hut'. Weights are
+    scaled per kind, so the most popular query, cuisine and restaurant rank
+    alike.
+    """
+
+    def __init__(self, suggestions: Iterable[Suggestion]):
+        suggestions = list(suggestions)
+        top = defaultdict(float)  # type: Dict[str, float]
+        for text, kind, weight in suggestions:
+            top[kind] = max(top[kind], weight)
+
+        rows = []  # type: List[Tuple[str, float, str, str]]
+        for text, kind, weight in suggestions:
+            words = tokenize(text)
+            score = weight / top[kind] if top[kind] else 0.0
+            rows.extend((' '.join(words[position:]), -score, text, kind) for position in range(len(words)))
+        rows.sort()
+        self._keys = [row[0] for row in rows]
+        self._rows = rows
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def complete(self, prefix: str, limit: int) -> List[Dict]:
+        prefix = ' '.join(tokenize(prefix))
+        if not prefix:
+            return []
+
+        low = bisect_left(self._keys, prefix)
+        high = bisect_left(self._keys, prefix + '\uffff', low)
+        best = {}  # type: Dict[Tuple[str, str], float]
+        for key, score, text, kind in self._rows[low:high]:
+            best[text, kind] = min(score, best.get((text, kind), 0.0))
+        top = heapq.nsmallest(limit, best.items(), key=lambda item: (item[1], item[0]))
+        return [{'text': text, 'kind': kind} for (text, kind), score in top]
+
+
+class Typeahead:
+    """
+    ``PrefixIndex`` over cuisine names, restaurant names and popular past
+    queries. Once ZOMATO_TYPEAHEAD_MAX_AGE seconds old it keeps answering
+    while a background thread rebuilds it.
+    """
+
+    def __init__(self):
+        self._index = None  # type: Optional[PrefixIndex]
+        self._built_at = None  # type: Optional[float]
+        self._rebuilding = False
+        self._lock = threading.Lock()
+        self._build_lock = threading.Lock()
+
+    def complete(self, prefix: str, limit: int = None) -> List[Dict]:
+        limit = limit or settings.ZOMATO_TYPEAHEAD_LIMIT
+        index, built_at = self._index, self._built_at
+        if index is None:
+            index = self._build_once()
+        elif built_at is None or time.monotonic() - built_at > settings.ZOMATO_TYPEAHEAD_MAX_AGE:
+            self._schedule_rebuild()
+        return index.complete(prefix, limit)
+
+    def rebuild(self) -> PrefixIndex:
+        index = PrefixIndex(self._suggestions())
+        with self._lock:
+            self._index, self._built_at = index, time.monotonic()
+        return index
+
+    def _build_once(self) -> PrefixIndex:
+        # Concurrent first requests wait for one build instead of each
+        # running their own.
+        with self._build_lock:
+            index = self._index
+            if index is None:
+                index = self.rebuild()
+            return index
+
+    def clear(self) -> None:
+        with self._lock:
+            self._index = self._built_at = None
+
+    def _schedule_rebuild(self) -> None:
+        with self._lock:
+            if self._rebuilding:
+                return
+            self._rebuilding = True
+        get_executor('refresh').submit(self._rebuild_in_background)
+
+    def _rebuild_in_background(self) -> None:
+        try:
+            self.rebuild()
+        except Exception:
+            logger.exception('Rebuilding typeahead suggestions failed, serving the previous ones')
+        finally:
+            with self._lock:
+                self._rebuilding = False
+            connections.close_all()
+
+    @staticmethod
+    def _suggestions() -> Iterable[Suggestion]:
+        queries = (SearchQuery.objects.filter(count__gte=settings.ZOMATO_TYPEAHEAD_MIN_QUERY_COUNT)
+                   .order_by('-count').values_list('query', 'count')[:settings.ZOMATO_TYPEAHEAD_MAX_QUERIES])
+        for query, count in queries:
+            yield query, 'query', count
+        for name, restaurants in Cuisine.objects.exclude(name='').annotate(
+                restaurant_count=Count('restaurants')).values_list('name', 'restaurant_count'):
+            yield name, 'cuisine', restaurants
+        for name, rating in Restaurant.objects.values_list('name', 'aggregate_rating').iterator():
+            yield name, 'restaurant', rating
+
+
+TYPEAHEAD = Typeahead()
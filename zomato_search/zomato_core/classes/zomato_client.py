@@ -0,0 +1,195 @@
+import asyncio
+import os
+import threading
+import time
+from typing import Dict, Optional, Tuple, Union
+
+import aiohttp
+import requests
+from django.conf import settings
+from requests.adapters import HTTPAdapter
+
+from zomato_search.zomato_core.classes.metrics import UPSTREAM_ERRORS, UPSTREAM_LATENCY
+from zomato_search.zomato_core.classes.quota import QUOTA
+from zomato_search.zomato_core.classes.timing import record
+
+Timeout = Union[float, Tuple[float, float]]
+
+
+class ZomatoAPIException(Exception):
+    pass
+
+
+class ZomatoClient:
+    """
+    Zomato v2.1 client over a keep-alive connection pool. One instance is
+    shared by every thread of a worker process, see ``get_client``.
+    """
+
+    def __init__(self, key: str, host: str = None, pool_size: int = None, timeout: Timeout = None):
+        self.host = (host or settings.ZOMATO_API_HOST).rstrip('/')
+        self.pool_size = pool_size or settings.ZOMATO_API_POOL_SIZE
+        self.timeout = timeout or settings.ZOMATO_API_TIMEOUT
+
+        self.adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.pool_size)
+        self.session = requests.Session()
+        self.session.mount(self.host, self.adapter)
+        self.session.headers.update({
+            'Accept': 'application/json',
+            'user-key': key,
+        })
+
+        self._lock = threading.Lock()
+        self._requests = 0
+        self._errors = 0
+        self._in_flight = 0
+        self._max_in_flight = 0
+
+    def get(self, endpoint: str, params: Dict = None, timeout: Timeout = None) -> Dict:
+        self._started()
+        QUOTA.record()
+        started = time.perf_counter()
+        try:
+            response = self.session.get(f'{self.host}{endpoint}', params=params, timeout=timeout or self.timeout)
+            response.raise_for_status()
+            return response.json()
+        except (requests.RequestException, ValueError) as e:
+            with self._lock:
+                self._errors += 1
+            UPSTREAM_ERRORS.labels(endpoint).inc()
+            raise ZomatoAPIException(f'{endpoint} failed: {e}') from e
+        finally:
+            with self._lock:
+                self._in_flight -= 1
+            elapsed = time.perf_counter() - started
+            UPSTREAM_LATENCY.labels(endpoint).observe(elapsed)
+            record('upstream', elapsed)
+
+    def search(self, timeout: Timeout = None, **params) -> Dict:
+        return self.get('/search', params, timeout=timeout)
+
+    def cuisines(self, city_id: int, timeout: Timeout = None) -> Dict:
+        return self.get('/cuisines', {'city_id': city_id}, timeout=timeout)
+
+    def restaurant(self, res_id: int, timeout: Timeout = None) -> Dict:
+        return self.get('/restaurant', {'res_id': res_id}, timeout=timeout)
+
+    def category(self, timeout: Timeout = None) -> Dict:
+        return self.get('/categories', timeout=timeout)
+
+    def establishments(self, city_id: int, timeout: Timeout = None) -> Dict:
+        return self.get('/establishments', {'city_id': city_id}, timeout=timeout)
+
+    def stats(self) -> Dict:
+        pools = self.adapter.poolmanager.pools
+        connection_pools = [pools[key] for key in pools.keys()]
+        with self._lock:
+            return {
+                'pool_size': self.pool_size,
+                'requests': self._requests,
+                'errors': self._errors,
+                'in_flight': self._in_flight,
+                'max_in_flight': self._max_in_flight,
+                'connections_opened': sum(pool.num_connections for pool in connection_pools),
+                'idle_connections': sum(pool.pool.qsize() for pool in connection_pools if pool.pool),
+            }
+
+    def close(self) -> None:
+        self.session.close()
+
+    def _started(self) -> None:
+        with self._lock:
+            self._requests += 1
+            self._in_flight += 1
+            self._max_in_flight = max(self._max_in_flight, self._in_flight)
+
+
+class AsyncZomatoClient:
+    """
+    asyncio counterpart of ``ZomatoClient``. The aiohttp session is bound to
+    the event loop it is first used on, so use one instance per loop and
+    ``close`` it (or use it as an async context manager).
+    """
+
+    def __init__(self, key: str, host: str = None, pool_size: int = None, timeout: Timeout = None):
+        self.key = key
+        self.host = (host or settings.ZOMATO_API_HOST).rstrip('/')
+        self.pool_size = pool_size or settings.ZOMATO_ASYNC_API_POOL_SIZE
+        self.timeout = timeout or settings.ZOMATO_API_TIMEOUT
+        self._session = None  # type: Optional[aiohttp.ClientSession]
+
+    async def __aenter__(self) -> 'AsyncZomatoClient':
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.close()
+
+    async def get(self, endpoint: str, params: Dict = None, timeout: Timeout = None) -> Dict:
+        params = {name: str(value) for name, value in (params or {}).items()}
+        QUOTA.record()
+        started = time.perf_counter()
+        try:
+            async with self._get_session().get(f'{self.host}{endpoint}', params=params,
+                                               timeout=self._client_timeout(timeout or self.timeout)) as response:
+                response.raise_for_status()
+                return await response.json(content_type=None)
+        except (aiohttp.ClientError, asyncio.TimeoutError, ValueError) as e:
+            UPSTREAM_ERRORS.labels(endpoint).inc()
+            raise ZomatoAPIException(f'{endpoint} failed: {e}') from e
+        finally:
+            elapsed = time.perf_counter() - started
+            UPSTREAM_LATENCY.labels(endpoint).observe(elapsed)
+            record('upstream', elapsed)
+
+    async def search(self, timeout: Timeout = None, **params) -> Dict:
+        return await self.get('/search', params, timeout=timeout)
+
+    async def cuisines(self, city_id: int, timeout: Timeout = None) -> Dict:
+        return await self.get('/cuisines', {'city_id': city_id}, timeout=timeout)
+
+    async def restaurant(self, res_id: int, timeout: Timeout = None) -> Dict:
+        return await self.get('/restaurant', {'res_id': res_id}, timeout=timeout)
+
+    async def category(self, timeout: Timeout = None) -> Dict:
+        return await self.get('/categories', timeout=timeout)
+
+    async def establishments(self, city_id: int, timeout: Timeout = None) -> Dict:
+        return await self.get('/establishments', {'city_id': city_id}, timeout=timeout)
+
+    async def close(self) -> None:
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        if self._session is None:
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=self.pool_size),
+                headers={'Accept': 'application/json', 'user-key': self.key},
+            )
+        return self._session
+
+    @staticmethod
+    def _client_timeout(timeout: Timeout) -> aiohttp.ClientTimeout:
+        if isinstance(timeout, tuple):
+            connect, read = timeout
+            return aiohttp.ClientTimeout(sock_connect=connect, sock_read=read)
+        return aiohttp.ClientTimeout(total=timeout)
+
+
+_client = None  # type: Optional[ZomatoClient]
+_client_pid = None
+_client_lock = threading.Lock()
+
+
+def get_client() -> ZomatoClient:
+    """
+    The worker's shared client. A forked child builds its own, pooled
+    sockets must not be shared between processes.
+    """
+    global _client, _client_pid
+    with _client_lock:
+        if _client is None or _client_pid != os.getpid():
+            _client = ZomatoClient(key=settings.ZOMATO_KEY)
+            _client_pid = os.getpid()
+        return _client
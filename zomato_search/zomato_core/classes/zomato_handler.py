@@ -1,5 +1,21 @@
+import logging
+from collections import deque
+from functools import partial
+from itertools import chain, islice
+from typing import Any, Awaitable, Callable, Dict, Hashable, Iterable, Iterator, Optional, Tuple, Union
+
 from django.conf import settings
-from zomathon import ZomatoAPI
+from django.core.cache import cache
+from django.db import connections
+
+from zomato_search.zomato_core.classes.cache import ZomatoCache, LRUCache, StaleWhileRevalidateCache
+from zomato_search.zomato_core.classes.catalog import CATALOG
+from zomato_search.zomato_core.classes.codec import project_search, project_restaurant
+from zomato_search.zomato_core.classes.concurrency import get_executor, fan_out
+from zomato_search.zomato_core.classes.metrics import HandlerStatsCollector, instrumented, register_process_collector
+from zomato_search.zomato_core.classes.quota import QUOTA
+from zomato_search.zomato_core.classes.singleflight import AsyncSingleFlight, SingleFlight
+from zomato_search.zomato_core.classes.zomato_client import get_client, AsyncZomatoClient, ZomatoAPIException
 
 
 class NoSearchCriteriaException(Exception):
@@ -10,39 +26,356 @@ class NoMoreResultsException(Exception):
     pass
 
 
+logger = logging.getLogger(__name__)
+
+SEARCH_PARAMETERS = {'categories': 'category', 'cuisines': 'cuisines', 'types': 'establishment_type'}
+
+REFERENCE_CACHES = {name: ZomatoCache(name, timeout) for name, timeout in settings.ZOMATO_CACHE_TIMEOUTS.items()}
+SEARCH_CACHE = LRUCache(settings.ZOMATO_SEARCH_CACHE_MAX_ENTRIES, settings.ZOMATO_SEARCH_CACHE_TIMEOUT)
+DETAILS_CACHE = StaleWhileRevalidateCache('restaurant', settings.ZOMATO_DETAILS_CACHE_SOFT_TIMEOUT,
+                                          settings.ZOMATO_DETAILS_CACHE_HARD_TIMEOUT)
+PREFETCH_CACHE = LRUCache(settings.ZOMATO_PREFETCH_MAX_ENTRIES, settings.ZOMATO_PREFETCH_TIMEOUT)
+FLIGHTS = SingleFlight()
+ASYNC_FLIGHTS = AsyncSingleFlight()
+
+
 class ZomatoHandler:
     CITY_ID = 4
-    KEY = settings.ZOMATO_KEY
+    PAGE_SIZE = 20
+    # The search API does not page past its first 100 results.
+    MAX_RESULTS = 100
 
     def __init__(self):
-        self.api = ZomatoAPI(key=self.KEY)
+        self.api = get_client()
 
+    @instrumented('search')
     def search(self, q='', categories=None, cuisines=None, types=None, start=0):
-        if categories:
-            categories = ','.join(categories)
-            response = self.api.search(q=q, category=categories, entity_type='city', entity_id=self.CITY_ID, start=start)
-        elif cuisines:
-            cuisines = ','.join(cuisines)
-            response = self.api.search(q=q, cuisines=cuisines, entity_type='city', entity_id=self.CITY_ID, start=start)
-        elif types:
-            types = ','.join(types)
-            response = self.api.search(q=q, establishment_type=types, entity_type='city', entity_id=self.CITY_ID, start=start)
-        else:
+        key = self.search_key(q, categories=categories, cuisines=cuisines, types=types, start=start)
+        response = SEARCH_CACHE.get_or_set(key, lambda: self._fetch_search(key))
+        return response
+
+    def iter_search(self, q='', categories=None, cuisines=None, types=None) -> Iterator[Dict]:
+        """
+        Every restaurant matching a search, in result order. Facets the
+        catalog answers for are read from it. Otherwise the search API is
+        paged through, with up to ZOMATO_EXPORT_FETCH_AHEAD pages fetched
+        ahead on the 'fanout' pool, so only that many pages are held at a
+        time. The first page is fetched before returning, so an unreachable
+        API raises here rather than once iteration started.
+        """
+        key = self.search_key(q, categories=categories, cuisines=cuisines, types=types)
+        q, dimension, ids, start, city_id = key
+        if CATALOG.answers(dimension, ids):
+            restaurants = CATALOG.iter_search(q, dimension, ids)
+            first = next(restaurants, None)
+            # Like Catalog.search, a query the mirror has no match for is
+            # left to the API.
+            if first is not None or not q:
+                return chain([first] if first is not None else [], restaurants)
+        return self._iter_pages(key, self._fetch_page(key))
+
+    def _iter_pages(self, key: Tuple, first: Dict) -> Iterator[Dict]:
+        q, dimension, ids, start, city_id = key
+        starts = iter(range(self.PAGE_SIZE, min(int(first.get('results_found') or 0), self.MAX_RESULTS),
+                            self.PAGE_SIZE))
+        executor = get_executor('fanout')
+        pending = deque(executor.submit(self._fetch_page, (q, dimension, ids, next_start, city_id))
+                        for next_start in islice(starts, settings.ZOMATO_EXPORT_FETCH_AHEAD))
+        try:
+            page = first
+            while True:
+                for item in page['restaurants']:
+                    yield item['restaurant']
+                if not pending:
+                    break
+                page = pending.popleft().result()
+                for next_start in islice(starts, 1):
+                    pending.append(executor.submit(self._fetch_page, (q, dimension, ids, next_start, city_id)))
+        finally:
+            for future in pending:
+                future.cancel()
+
+    def _fetch_page(self, key: Tuple) -> Dict:
+        # Upstream only, safe to run off the request thread.
+        return SEARCH_CACHE.get_or_set(key, lambda: FLIGHTS.do(('search',) + key, lambda: self._search(*key)))
+
+    @staticmethod
+    @instrumented('facet_search')
+    def facet_search(categories=None, cuisines=None, types=None, match_all=False, start=0) -> Optional[Dict]:
+        """
+        Search on several facets at once, see ``Catalog.facet_search``. None
+        when the facets are not mirrored, the search API filters on one
+        dimension only.
+        """
+        filters = {'categories': categories, 'cuisines': cuisines, 'types': types}
+        filters = {dimension: [id.strip() for value in ids or () for id in str(value).split(',') if id.strip()]
+                   for dimension, ids in filters.items()}
+        if not any(filters.values()):
             raise NoSearchCriteriaException('Invalid search criteria')
+        return CATALOG.facet_search(filters, match_all=match_all, start=int(start or 0))
+
+    def prefetch(self, q='', categories=None, cuisines=None, types=None, start=0, results_found=MAX_RESULTS,
+                 depth=None):
+        """
+        Fetches the ``depth`` pages after ``start`` in the background, while
+        less than ZOMATO_PREFETCH_QUOTA_SHARE of today's quota is used.
+        """
+        q, dimension, ids, start, city_id = self.search_key(q, categories=categories, cuisines=cuisines, types=types,
+                                                            start=start)
+        if CATALOG.answers(dimension, ids):
+            return
+        end = min(int(results_found), self.MAX_RESULTS)
+        depth = settings.ZOMATO_PREFETCH_DEPTH if depth is None else depth
+        for next_start in range(start + self.PAGE_SIZE, end, self.PAGE_SIZE)[:depth]:
+            key = (q, dimension, ids, next_start, city_id)
+            if SEARCH_CACHE.get(key) is not None or PREFETCH_CACHE.get(key) is not None:
+                continue
+            if not QUOTA.allows(settings.ZOMATO_PREFETCH_QUOTA_SHARE):
+                break
+            get_executor('prefetch').submit(self._prefetch, key)
+
+    def _prefetch(self, key: Tuple) -> None:
+        try:
+            response = FLIGHTS.do(('search',) + key, lambda: self._search(*key))
+            PREFETCH_CACHE.set(key, response)
+            if settings.ZOMATO_INGEST_SEARCH_RESULTS:
+                get_executor('ingest').submit(self._ingest, key, response)
+        except Exception:
+            logger.warning('Prefetching search page %s failed', key, exc_info=True)
+
+    def _fetch_search(self, key: Tuple):
+        response = CATALOG.search(*key)
+        if response is not None:
+            return response
+
+        response = PREFETCH_CACHE.get(key)
+        if response is not None:
+            PREFETCH_CACHE.stats.hit()
+            return response
+
+        PREFETCH_CACHE.stats.miss()
+        response = FLIGHTS.do(('search',) + key, lambda: self._search(*key))
+        if settings.ZOMATO_INGEST_SEARCH_RESULTS:
+            get_executor('ingest').submit(self._ingest, key, response)
         return response
 
+    @staticmethod
+    def ingest(key: Tuple, response: Dict) -> None:
+        """
+        Adds the restaurants of an upstream search response to the catalog
+        and its text index. A page is only recorded as facet membership when
+        a single facet was searched, with several it is unknown which one
+        each restaurant belongs to.
+        """
+        q, dimension, ids, start, city_id = key
+        try:
+            CATALOG.ingest(response, dimension, ids if len(ids) == 1 else ())
+        except Exception:
+            logger.warning('Ingesting search page %s failed', key, exc_info=True)
+
+    @classmethod
+    def _ingest(cls, key: Tuple, response: Dict) -> None:
+        # Django only closes the connections of request threads.
+        try:
+            cls.ingest(key, response)
+        finally:
+            connections.close_all()
+
+    @classmethod
+    def search_key(cls, q='', categories=None, cuisines=None, types=None, start=0) -> Tuple:
+        """
+        Normalized (q, dimension, ids, start, city) tuple, so equivalent
+        queries share one cache entry and one upstream call.
+        """
+        for dimension, ids in (('categories', categories), ('cuisines', cuisines), ('types', types)):
+            if ids:
+                break
+        else:
+            raise NoSearchCriteriaException('Invalid search criteria')
+
+        ids = tuple(sorted({id.strip() for value in ids for id in str(value).split(',') if id.strip()}))
+        return (q or '').strip().lower(), dimension, ids, int(start or 0), cls.CITY_ID
+
+    def _search(self, q, dimension, ids, start, city_id):
+        kwargs = {SEARCH_PARAMETERS[dimension]: ','.join(ids)}
+        response = self.api.search(q=q, entity_type='city', entity_id=city_id, start=start, **kwargs)
+        return project_search(response)
+
+    @instrumented('get_cuisines')
     def get_cuisines(self):
-        cuisines = self.api.cuisines(city_id=self.CITY_ID)
+        fetch = partial(self.api.cuisines, city_id=self.CITY_ID)
+        cuisines = REFERENCE_CACHES['cuisines'].get_or_set(
+            self.CITY_ID, lambda: FLIGHTS.do(('cuisines', self.CITY_ID), fetch))
         return cuisines
 
+    @instrumented('get_restaurant_details')
     def get_restaurant_details(self, id):
-        restaurant = self.api.restaurant(res_id=id)
+        fetch = partial(self._restaurant, id)
+        restaurant = DETAILS_CACHE.get_or_set(id, lambda: FLIGHTS.do(('restaurant', id), fetch))
         return restaurant
 
+    def _restaurant(self, id) -> Dict:
+        return project_restaurant(self.api.restaurant(res_id=id))
+
+    @instrumented('get_many_restaurant_details')
+    def get_many_restaurant_details(self, ids: Iterable[int]) -> Dict[int, Dict]:
+        """
+        Details of several restaurants: cached entries first, the rest
+        fetched concurrently on the 'fanout' pool. Restaurants the API fails
+        on are left out.
+        """
+        ids = list(ids)
+        restaurants = DETAILS_CACHE.lookup_many(ids, self._restaurant)
+        missing = [id for id in ids if id not in restaurants]
+        fetched, _ = fan_out({id: partial(self._fetch_restaurant_details, id) for id in missing})
+        restaurants.update((id, restaurant) for id, restaurant in fetched.items() if restaurant is not None)
+        return restaurants
+
+    def _fetch_restaurant_details(self, id: int) -> Optional[Dict]:
+        try:
+            restaurant = FLIGHTS.do(('restaurant', id), partial(self._restaurant, id))
+        except ZomatoAPIException:
+            logger.warning('Fetching restaurant %s failed', id, exc_info=True)
+            return None
+        DETAILS_CACHE.store(id, restaurant)
+        return restaurant
+
+    @instrumented('get_categories')
     def get_categories(self):
-        categories = self.api.category()
+        categories = REFERENCE_CACHES['categories'].get_or_set(
+            'all', lambda: FLIGHTS.do(('categories',), self.api.category))
         return categories
 
+    @instrumented('get_types')
     def get_types(self):
-        types = self.api.establishments(city_id=self.CITY_ID)
+        fetch = partial(self.api.establishments, city_id=self.CITY_ID)
+        types = REFERENCE_CACHES['types'].get_or_set(
+            self.CITY_ID, lambda: FLIGHTS.do(('types', self.CITY_ID), fetch))
+        return types
+
+    @classmethod
+    def invalidate_reference_data(cls, *names: str) -> None:
+        keys = {'cuisines': cls.CITY_ID, 'categories': 'all', 'types': cls.CITY_ID}
+        for name in names or REFERENCE_CACHES:
+            REFERENCE_CACHES[name].invalidate(keys[name])
+
+    @classmethod
+    def cache_stats(cls) -> Dict[str, Dict]:
+        stats = {name: reference_cache.stats.as_dict() for name, reference_cache in REFERENCE_CACHES.items()}
+        stats['search'] = SEARCH_CACHE.stats.as_dict()
+        stats['prefetch'] = PREFETCH_CACHE.stats.as_dict()
+        stats['restaurant'] = dict(DETAILS_CACHE.stats.as_dict(), refreshes=DETAILS_CACHE.refreshes)
+        stats['flights'] = FLIGHTS.stats()
+        if hasattr(cache, 'tier_stats'):
+            stats['tiers'] = cache.tier_stats()
+        return stats
+
+    @classmethod
+    def pool_stats(cls) -> Dict:
+        return get_client().stats()
+
+
+class AsyncZomatoHandler:
+    """
+    asyncio counterpart of ``ZomatoHandler`` with the same methods,
+    caches, catalog and exceptions. Upstream calls are awaited on the
+    ``AsyncZomatoClient`` and coalesced with those of sync handlers, see
+    ``AsyncSingleFlight``. Cache and catalog lookups are local and run on
+    the event loop, prefetching and ingesting stay on ZomatoHandler's
+    pools. Close the handler (or use it as an async context manager)
+    before its event loop ends.
+    """
+    CITY_ID = ZomatoHandler.CITY_ID
+
+    def __init__(self, api: AsyncZomatoClient = None):
+        self.api = api or AsyncZomatoClient(key=settings.ZOMATO_KEY)
+        # Background work uses the sync client, it outlives this handler's event loop.
+        self.sync = ZomatoHandler()
+
+    async def __aenter__(self) -> 'AsyncZomatoHandler':
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.api.close()
+
+    @instrumented('search')
+    async def search(self, q='', categories=None, cuisines=None, types=None, start=0):
+        key = ZomatoHandler.search_key(q, categories=categories, cuisines=cuisines, types=types, start=start)
+        response = await self._cached(SEARCH_CACHE, key, lambda: self._fetch_search(key))
+        return response
+
+    @staticmethod
+    def facet_search(categories=None, cuisines=None, types=None, match_all=False, start=0) -> Optional[Dict]:
+        return ZomatoHandler.facet_search(categories=categories, cuisines=cuisines, types=types, match_all=match_all,
+                                          start=start)
+
+    def prefetch(self, q='', categories=None, cuisines=None, types=None, start=0,
+                 results_found=ZomatoHandler.MAX_RESULTS, depth=None):
+        self.sync.prefetch(q, categories=categories, cuisines=cuisines, types=types, start=start,
+                           results_found=results_found, depth=depth)
+
+    async def _fetch_search(self, key: Tuple) -> Dict:
+        response = CATALOG.search(*key)
+        if response is not None:
+            return response
+
+        response = PREFETCH_CACHE.get(key)
+        if response is not None:
+            PREFETCH_CACHE.stats.hit()
+            return response
+
+        PREFETCH_CACHE.stats.miss()
+        response = await ASYNC_FLIGHTS.do(('search',) + key, lambda: self._search(*key))
+        if settings.ZOMATO_INGEST_SEARCH_RESULTS:
+            get_executor('ingest').submit(ZomatoHandler._ingest, key, response)
+        return response
+
+    async def _search(self, q, dimension, ids, start, city_id):
+        kwargs = {SEARCH_PARAMETERS[dimension]: ','.join(ids)}
+        response = await self.api.search(q=q, entity_type='city', entity_id=city_id, start=start, **kwargs)
+        return project_search(response)
+
+    @instrumented('get_cuisines')
+    async def get_cuisines(self):
+        cuisines = await self._cached(REFERENCE_CACHES['cuisines'], self.CITY_ID, lambda: ASYNC_FLIGHTS.do(
+            ('cuisines', self.CITY_ID), lambda: self.api.cuisines(city_id=self.CITY_ID)))
+        return cuisines
+
+    @instrumented('get_restaurant_details')
+    async def get_restaurant_details(self, id):
+        refresh = partial(FLIGHTS.do, ('restaurant', id), partial(self.sync._restaurant, id))
+        restaurant = DETAILS_CACHE.lookup(id, refresh)
+        if restaurant is None:
+            restaurant = await ASYNC_FLIGHTS.do(('restaurant', id), lambda: self._restaurant(id))
+            DETAILS_CACHE.store(id, restaurant)
+        return restaurant
+
+    async def _restaurant(self, id) -> Dict:
+        return project_restaurant(await self.api.restaurant(res_id=id))
+
+    @instrumented('get_categories')
+    async def get_categories(self):
+        categories = await self._cached(REFERENCE_CACHES['categories'], 'all',
+                                        lambda: ASYNC_FLIGHTS.do(('categories',), self.api.category))
+        return categories
+
+    @instrumented('get_types')
+    async def get_types(self):
+        types = await self._cached(REFERENCE_CACHES['types'], self.CITY_ID, lambda: ASYNC_FLIGHTS.do(
+            ('types', self.CITY_ID), lambda: self.api.establishments(city_id=self.CITY_ID)))
         return types
+
+    @staticmethod
+    async def _cached(cache: Union[ZomatoCache, LRUCache], key: Hashable, fetch: Callable[[], Awaitable]) -> Any:
+        value = cache.get(key)
+        if value is not None:
+            cache.stats.hit()
+            return value
+
+        cache.stats.miss()
+        value = await fetch()
+        cache.set(key, value)
+        return value
+
+
+register_process_collector(HandlerStatsCollector(ZomatoHandler.cache_stats, ZomatoHandler.pool_stats))
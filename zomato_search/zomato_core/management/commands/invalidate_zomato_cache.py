@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+
+from zomato_search.zomato_core.classes.zomato_handler import ZomatoHandler, REFERENCE_CACHES
+
+
+class Command(BaseCommand):
+    help = 'Drop cached Zomato reference data (cuisines, categories, types)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('names', nargs='*', choices=sorted(REFERENCE_CACHES),
+                            help='Reference data to invalidate, all of it when omitted')
+
+    def handle(self, *args, **options):
+        names = options['names'] or sorted(REFERENCE_CACHES)
+        ZomatoHandler.invalidate_reference_data(*names)
+        self.stdout.write(self.style.SUCCESS(f'Invalidated {", ".join(names)}'))
@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+
+from zomato_search.zomato_core.models import RestaurantReviewStats
+
+
+class Command(BaseCommand):
+    help = 'Recompute per-restaurant review stats from the Review table'
+
+    def add_arguments(self, parser):
+        parser.add_argument('restaurant_ids', nargs='*', type=int,
+                            help='Restaurants to rebuild, all of them when omitted')
+
+    def handle(self, *args, **options):
+        written = RestaurantReviewStats.rebuild(options['restaurant_ids'] or None)
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt review stats of {written} restaurants'))
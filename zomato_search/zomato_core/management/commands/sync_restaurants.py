@@ -0,0 +1,79 @@
+from concurrent.futures import as_completed
+from datetime import timedelta
+from typing import Dict, List, Optional
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from zomato_search.zomato_core.classes.catalog import CATALOG, FACET_MODELS
+from zomato_search.zomato_core.classes.concurrency import get_executor
+from zomato_search.zomato_core.classes.quota import QUOTA
+from zomato_search.zomato_core.classes.zomato_client import ZomatoAPIException
+from zomato_search.zomato_core.classes.zomato_handler import ZomatoHandler
+
+
+class Command(BaseCommand):
+    help = "Mirror the city's restaurants and their cuisines, categories and types from the Zomato search API"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dimension', action='append', choices=sorted(FACET_MODELS),
+                            help='Facets to walk, all of them when omitted')
+        parser.add_argument('--max-age', type=float, default=24,
+                            help='Skip facets mirrored less than this many hours ago, 0 to walk everything')
+
+    def handle(self, *args, **options):
+        handler = ZomatoHandler()
+        reference_data = {'cuisines': handler.get_cuisines, 'categories': handler.get_categories,
+                          'types': handler.get_types}
+        max_age = timedelta(hours=options['max_age'])
+
+        for dimension in options['dimension'] or sorted(FACET_MODELS):
+            CATALOG.upsert_facets(dimension, reference_data[dimension]())
+            facet_ids = CATALOG.stale_facets(dimension, max_age)
+            self.stdout.write(f'Walking {len(facet_ids)} {dimension}')
+
+            # Pages are fetched on the 'sync' pool, rows are written from
+            # this thread as each facet completes.
+            executor = get_executor('sync')
+            futures = {executor.submit(self._walk, handler, dimension, facet_id): facet_id for facet_id in facet_ids}
+            for future in as_completed(futures):
+                facet_id = futures[future]
+                pages = future.result()
+                if pages is None:
+                    continue
+                restaurant_ids = set()
+                for page in pages:
+                    restaurant_ids.update(CATALOG.ingest(page, dimension, [facet_id]))
+                results_found = int(pages[-1]['results_found']) if pages else 0
+                if results_found > handler.MAX_RESULTS:
+                    # Only the first MAX_RESULTS are reachable, searches on
+                    # this facet keep going to the API.
+                    self.stdout.write(f'  {dimension} {facet_id}: {len(restaurant_ids)} of {results_found} '
+                                      f'restaurants, truncated')
+                    continue
+                # Every member was seen, the rest left the facet upstream.
+                pruned = CATALOG.prune_members(dimension, facet_id, restaurant_ids)
+                CATALOG.mark_synced(dimension, [facet_id])
+                self.stdout.write(f'  {dimension} {facet_id}: {len(restaurant_ids)} restaurants'
+                                  + (f', {pruned} dropped' if pruned else ''))
+
+        self.stdout.write(self.style.SUCCESS(f'Done, {QUOTA.used()} API calls used today'))
+
+    def _walk(self, handler: ZomatoHandler, dimension: str, facet_id: int) -> Optional[List[Dict]]:
+        """Every result page of one facet, or None if it could not be walked."""
+        pages = []
+        start = 0
+        while start < handler.MAX_RESULTS:
+            if not QUOTA.allows(settings.ZOMATO_SYNC_QUOTA_SHARE):
+                self.stderr.write(f'  {dimension} {facet_id}: stopped, daily quota share used')
+                return None
+            try:
+                page = handler._search('', dimension, (str(facet_id),), start, handler.CITY_ID)
+            except ZomatoAPIException as e:
+                self.stderr.write(f'  {dimension} {facet_id}: {e}')
+                return None
+            pages.append(page)
+            start += handler.PAGE_SIZE
+            if page['results_shown'] < handler.PAGE_SIZE or start >= int(page['results_found']):
+                break
+        return pages
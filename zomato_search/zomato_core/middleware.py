@@ -0,0 +1,62 @@
+import json
+import logging
+import time
+
+from django.conf import settings
+from django.db import connection
+
+from zomato_search.zomato_core.classes import timing
+from zomato_search.zomato_core.classes.metrics import VIEW_LATENCY
+
+logger = logging.getLogger(__name__)
+
+
+class ViewMetricsMiddleware:
+    """
+    Records how long every request took by view name, so latency is
+    labelled by route, not by URL.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        started = time.perf_counter()
+        response = self.get_response(request)
+        match = getattr(request, 'resolver_match', None)
+        view = match.view_name if match else 'unresolved'
+        VIEW_LATENCY.labels(view, request.method, response.status_code).observe(time.perf_counter() - started)
+        return response
+
+
+class ServerTimingMiddleware:
+    """
+    Breaks the time of each request down into upstream calls, database
+    queries and template rendering, see ``timing``. Sent as a Server-Timing
+    header when ZOMATO_SERVER_TIMING is set, and logged for requests slower
+    than ZOMATO_SLOW_REQUEST_SECONDS.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        timings = timing.RequestTimings()
+        token = timing.CURRENT.set(timings)
+        try:
+            with connection.execute_wrapper(timing.time_query):
+                response = self.get_response(request)
+        finally:
+            timing.CURRENT.reset(token)
+
+        if settings.ZOMATO_SERVER_TIMING:
+            response['Server-Timing'] = timings.header()
+        threshold = settings.ZOMATO_SLOW_REQUEST_SECONDS
+        if threshold and timings.elapsed() >= threshold:
+            logger.warning('Slow request %s', json.dumps({
+                'method': request.method,
+                'path': request.path,
+                'status': response.status_code,
+                'phases': timings.as_dict(),
+            }, sort_keys=True))
+        return response
@@ -0,0 +1,17 @@
+# Generated by Django 2.2.6 on 2026-10-18 10:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('zomato_core', '0003_review'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='review',
+            index=models.Index(fields=['restaurant_id', 'id'], name='review_restaurant_idx'),
+        ),
+    ]
@@ -0,0 +1,41 @@
+# Generated by Django 2.2.6 on 2026-10-18 11:40
+
+from django.db import migrations, models
+from django.db.models import Count, Q, Sum
+
+
+def build_stats(apps, schema_editor):
+    Review = apps.get_model('zomato_core', 'Review')
+    RestaurantReviewStats = apps.get_model('zomato_core', 'RestaurantReviewStats')
+
+    rows = Review.objects.order_by().values('restaurant_id').annotate(
+        count=Count('id'),
+        total=Sum('rating'),
+        **{f'rating_{rating}': Count('id', filter=Q(rating=rating)) for rating in range(1, 6)}
+    )
+    RestaurantReviewStats.objects.bulk_create([RestaurantReviewStats(**row) for row in rows])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('zomato_core', '0004_review_restaurant_idx'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RestaurantReviewStats',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('restaurant_id', models.IntegerField(unique=True)),
+                ('count', models.PositiveIntegerField(default=0)),
+                ('total', models.PositiveIntegerField(default=0)),
+                ('rating_1', models.PositiveIntegerField(default=0)),
+                ('rating_2', models.PositiveIntegerField(default=0)),
+                ('rating_3', models.PositiveIntegerField(default=0)),
+                ('rating_4', models.PositiveIntegerField(default=0)),
+                ('rating_5', models.PositiveIntegerField(default=0)),
+            ],
+        ),
+        migrations.RunPython(build_stats, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,40 @@
+# Generated by Django 2.2.6 on 2026-10-18 13:05
+
+from django.db import migrations, models
+from django.db.models import Count, Max, Q, Sum
+
+
+def remove_duplicate_reviews(apps, schema_editor):
+    Review = apps.get_model('zomato_core', 'Review')
+    RestaurantReviewStats = apps.get_model('zomato_core', 'RestaurantReviewStats')
+
+    duplicates = Review.objects.order_by().values('user_id', 'restaurant_id') \
+        .annotate(reviews=Count('id'), latest=Max('id')).filter(reviews__gt=1)
+    restaurant_ids = set()
+    for duplicate in duplicates:
+        Review.objects.filter(user_id=duplicate['user_id'], restaurant_id=duplicate['restaurant_id']) \
+            .exclude(id=duplicate['latest']).delete()
+        restaurant_ids.add(duplicate['restaurant_id'])
+
+    rows = Review.objects.filter(restaurant_id__in=restaurant_ids).order_by().values('restaurant_id').annotate(
+        count=Count('id'),
+        total=Sum('rating'),
+        **{f'rating_{rating}': Count('id', filter=Q(rating=rating)) for rating in range(1, 6)}
+    )
+    RestaurantReviewStats.objects.filter(restaurant_id__in=restaurant_ids).delete()
+    RestaurantReviewStats.objects.bulk_create([RestaurantReviewStats(**row) for row in rows])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('zomato_core', '0005_restaurantreviewstats'),
+    ]
+
+    operations = [
+        migrations.RunPython(remove_duplicate_reviews, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='review',
+            constraint=models.UniqueConstraint(fields=('user', 'restaurant_id'), name='unique_review_per_user'),
+        ),
+    ]
@@ -0,0 +1,71 @@
+# Generated by Django 2.2.6 on 2026-10-18 14:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('zomato_core', '0006_review_unique_review_per_user'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Category',
+            fields=[
+                ('id', models.IntegerField(primary_key=True, serialize=False)),
+                ('name', models.CharField(max_length=200)),
+                ('synced_at', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'abstract': False,
+            },
+        ),
+        migrations.CreateModel(
+            name='Cuisine',
+            fields=[
+                ('id', models.IntegerField(primary_key=True, serialize=False)),
+                ('name', models.CharField(max_length=200)),
+                ('synced_at', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'abstract': False,
+            },
+        ),
+        migrations.CreateModel(
+            name='Establishment',
+            fields=[
+                ('id', models.IntegerField(primary_key=True, serialize=False)),
+                ('name', models.CharField(max_length=200)),
+                ('synced_at', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'abstract': False,
+            },
+        ),
+        migrations.CreateModel(
+            name='Restaurant',
+            fields=[
+                ('id', models.IntegerField(primary_key=True, serialize=False)),
+                ('name', models.CharField(max_length=200)),
+                ('url', models.URLField(max_length=500)),
+                ('thumb', models.URLField(blank=True, max_length=500)),
+                ('cuisine_names', models.CharField(blank=True, max_length=500)),
+                ('has_online_delivery', models.BooleanField(default=False)),
+                ('average_cost_for_two', models.IntegerField(default=0)),
+                ('phone_numbers', models.CharField(blank=True, max_length=200)),
+                ('locality', models.CharField(blank=True, max_length=200)),
+                ('address', models.CharField(blank=True, max_length=500)),
+                ('aggregate_rating', models.FloatField(default=0)),
+                ('payload_hash', models.CharField(max_length=32)),
+                ('synced_at', models.DateTimeField()),
+                ('categories', models.ManyToManyField(related_name='restaurants', to='zomato_core.Category')),
+                ('cuisines', models.ManyToManyField(related_name='restaurants', to='zomato_core.Cuisine')),
+                ('establishments', models.ManyToManyField(related_name='restaurants', to='zomato_core.Establishment')),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='restaurant',
+            index=models.Index(fields=['-aggregate_rating', 'id'], name='restaurant_rating_idx'),
+        ),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 2.2.6 on 2026-10-18 16:20
+
+from django.db import migrations
+
+# Kept identical to text_index.SEARCH_VECTOR_SQL, which queries through it.
+SEARCH_VECTOR_SQL = (
+    "setweight(to_tsvector('simple', name), 'A') || "
+    "setweight(to_tsvector('simple', cuisine_names), 'B') || "
+    "setweight(to_tsvector('simple', locality), 'C')"
+)
+
+
+def create_search_index(apps, schema_editor):
+    # Other databases search an in-process index instead.
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute(
+            f'CREATE INDEX restaurant_search_idx ON zomato_core_restaurant USING GIN (({SEARCH_VECTOR_SQL}))'
+        )
+
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute('DROP INDEX IF EXISTS restaurant_search_idx')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('zomato_core', '0007_catalog'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
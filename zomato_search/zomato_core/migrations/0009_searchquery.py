@@ -0,0 +1,26 @@
+# Generated by Django 2.2.6 on 2026-10-18 17:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('zomato_core', '0008_restaurant_search_idx'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SearchQuery',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('query', models.CharField(max_length=300, unique=True)),
+                ('count', models.PositiveIntegerField(default=0)),
+                ('last_searched_at', models.DateTimeField()),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='searchquery',
+            index=models.Index(fields=['-count'], name='search_query_count_idx'),
+        ),
+    ]
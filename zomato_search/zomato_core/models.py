@@ -1,11 +1,245 @@
+from typing import Dict, Iterable, Optional, Tuple
+
 from django.core.validators import MinValueValidator, MaxValueValidator
-from django.db import models
+from django.db import models, transaction, IntegrityError, connections
+from django.db.models import Count, F, Q, Sum
+from django.utils import timezone
 
 from zomato_search.users.models import User
 
+RATINGS = range(1, 6)
+
+
+class ReviewManager(models.Manager):
+    UPSERT_SQL = '''
+        WITH previous AS (
+            SELECT rating FROM {table} WHERE user_id = %s AND restaurant_id = %s FOR UPDATE
+        )
+        INSERT INTO {table} (user_id, restaurant_id, text, rating) VALUES (%s, %s, %s, %s)
+        ON CONFLICT (user_id, restaurant_id) DO UPDATE SET text = EXCLUDED.text, rating = EXCLUDED.rating
+        RETURNING xmax = 0, (SELECT rating FROM previous)
+    '''
+
+    def upsert(self, user: User, restaurant_id: int, text: str, rating: int) -> Tuple[bool, Optional[int]]:
+        """
+        Writes the user's review of a restaurant, creating or replacing it.
+        Returns ``(created, previous_rating)``. ``previous_rating`` is None
+        on a replace that raced with the first insert, as its rating was not
+        visible yet.
+
+        On PostgreSQL this is one INSERT ... ON CONFLICT statement. Other
+        databases lock the existing row and then update or insert it.
+        """
+        connection = connections[self.db]
+        if connection.vendor == 'postgresql':
+            sql = self.UPSERT_SQL.format(table=connection.ops.quote_name(self.model._meta.db_table))
+            with connection.cursor() as cursor:
+                cursor.execute(sql, [user.pk, restaurant_id, user.pk, restaurant_id, text, rating])
+                created, previous_rating = cursor.fetchone()
+            return created, previous_rating
+
+        with transaction.atomic(using=self.db):
+            reviews = self.select_for_update().filter(user=user, restaurant_id=restaurant_id)
+            previous_rating = reviews.values_list('rating', flat=True).first()
+            if previous_rating is not None:
+                reviews.update(text=text, rating=rating)
+                return False, previous_rating
+            try:
+                with transaction.atomic(using=self.db):
+                    self.create(user=user, restaurant_id=restaurant_id, text=text, rating=rating)
+                return True, None
+            except IntegrityError:
+                reviews.update(text=text, rating=rating)
+                return False, None
+
 
 class Review(models.Model):
     user = models.ForeignKey(User, on_delete=models.CASCADE)
     restaurant_id = models.IntegerField()
     text = models.CharField(max_length=2000)
     rating = models.IntegerField(default=1, validators=[MaxValueValidator(5), MinValueValidator(1)])
+
+    objects = ReviewManager()
+
+    class Meta:
+        indexes = [models.Index(fields=['restaurant_id', 'id'], name='review_restaurant_idx')]
+        constraints = [models.UniqueConstraint(fields=['user', 'restaurant_id'], name='unique_review_per_user')]
+
+
+class RestaurantReviewStats(models.Model):
+    """
+    Review count, rating total and rating histogram of a restaurant, kept in
+    step with ``Review`` by ``record`` so pages never aggregate reviews.
+    """
+    restaurant_id = models.IntegerField(unique=True)
+    count = models.PositiveIntegerField(default=0)
+    total = models.PositiveIntegerField(default=0)
+    rating_1 = models.PositiveIntegerField(default=0)
+    rating_2 = models.PositiveIntegerField(default=0)
+    rating_3 = models.PositiveIntegerField(default=0)
+    rating_4 = models.PositiveIntegerField(default=0)
+    rating_5 = models.PositiveIntegerField(default=0)
+
+    @property
+    def average(self) -> Optional[float]:
+        return self.total / self.count if self.count else None
+
+    @property
+    def histogram(self) -> Dict[int, int]:
+        return {rating: getattr(self, f'rating_{rating}') for rating in RATINGS}
+
+    @classmethod
+    def record(cls, restaurant_id: int, rating: int, previous_rating: Optional[int] = None) -> None:
+        """
+        Applies a new review, or a changed rating when ``previous_rating`` is
+        given, as one atomic UPDATE. Call it in the transaction that wrote
+        the review.
+        """
+        rating = int(rating)
+        if previous_rating is None:
+            changes = {'count': 1, 'total': rating, f'rating_{rating}': 1}
+        elif int(previous_rating) != rating:
+            previous_rating = int(previous_rating)
+            changes = {'total': rating - previous_rating, f'rating_{rating}': 1, f'rating_{previous_rating}': -1}
+        else:
+            return
+
+        stats = cls.objects.filter(restaurant_id=restaurant_id)
+        changes = {field: F(field) + change for field, change in changes.items()}
+        if stats.update(**changes):
+            return
+
+        # First review, or reviews written before stats were kept.
+        try:
+            cls.rebuild([restaurant_id])
+        except IntegrityError:
+            # A concurrent first review created the row without this one.
+            stats.update(**changes)
+
+    @classmethod
+    def rebuild(cls, restaurant_ids: Iterable[int] = None) -> int:
+        """
+        Recomputes stats from ``Review``, for every restaurant or only the
+        given ones. Returns the number of restaurants written.
+        """
+        reviews = Review.objects.all()
+        stats = cls.objects.all()
+        if restaurant_ids is not None:
+            reviews = reviews.filter(restaurant_id__in=restaurant_ids)
+            stats = stats.filter(restaurant_id__in=restaurant_ids)
+
+        rows = reviews.order_by().values('restaurant_id').annotate(
+            count=Count('id'),
+            total=Sum('rating'),
+            **{f'rating_{rating}': Count('id', filter=Q(rating=rating)) for rating in RATINGS}
+        )
+        with transaction.atomic():
+            stats.delete()
+            created = cls.objects.bulk_create([cls(**row) for row in rows])
+        return len(created)
+
+
+class Facet(models.Model):
+    """
+    Upstream reference data restaurants are searched by. ``synced_at`` is
+    set once every result page of the facet has been mirrored locally.
+    """
+    id = models.IntegerField(primary_key=True)
+    name = models.CharField(max_length=200)
+    synced_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        abstract = True
+
+    def __str__(self):
+        return self.name
+
+
+class Cuisine(Facet):
+    pass
+
+
+class Category(Facet):
+    pass
+
+
+class Establishment(Facet):
+    pass
+
+
+class Restaurant(models.Model):
+    """
+    Local mirror of a restaurant from the search API, holding the fields
+    search result pages are rendered from.
+    """
+    id = models.IntegerField(primary_key=True)
+    name = models.CharField(max_length=200)
+    url = models.URLField(max_length=500)
+    thumb = models.URLField(max_length=500, blank=True)
+    cuisine_names = models.CharField(max_length=500, blank=True)
+    has_online_delivery = models.BooleanField(default=False)
+    average_cost_for_two = models.IntegerField(default=0)
+    phone_numbers = models.CharField(max_length=200, blank=True)
+    locality = models.CharField(max_length=200, blank=True)
+    address = models.CharField(max_length=500, blank=True)
+    aggregate_rating = models.FloatField(default=0)
+    payload_hash = models.CharField(max_length=32)
+    synced_at = models.DateTimeField()
+
+    cuisines = models.ManyToManyField(Cuisine, related_name='restaurants')
+    categories = models.ManyToManyField(Category, related_name='restaurants')
+    establishments = models.ManyToManyField(Establishment, related_name='restaurants')
+
+    class Meta:
+        indexes = [models.Index(fields=['-aggregate_rating', 'id'], name='restaurant_rating_idx')]
+
+    def __str__(self):
+        return self.name
+
+    def as_payload(self) -> Dict:
+        """The restaurant in the shape of a search API result."""
+        return {
+            'id': self.id,
+            'name': self.name,
+            'url': self.url,
+            'thumb': self.thumb,
+            'cuisines': self.cuisine_names,
+            'has_online_delivery': int(self.has_online_delivery),
+            'average_cost_for_two': self.average_cost_for_two,
+            'phone_numbers': self.phone_numbers,
+            'location': {'locality': self.locality, 'address': self.address},
+            'user_rating': {'aggregate_rating': str(self.aggregate_rating)},
+        }
+
+
+class SearchQuery(models.Model):
+    """Free-text searches and how often they were made, for typeahead suggestions."""
+    query = models.CharField(max_length=300, unique=True)
+    count = models.PositiveIntegerField(default=0)
+    last_searched_at = models.DateTimeField()
+
+    class Meta:
+        indexes = [models.Index(fields=['-count'], name='search_query_count_idx')]
+
+    def __str__(self):
+        return self.query
+
+    @classmethod
+    def normalize(cls, query: str) -> str:
+        return ' '.join(query.lower().split())[:cls._meta.get_field('query').max_length]
+
+    @classmethod
+    def record(cls, query: str) -> None:
+        query = cls.normalize(query or '')
+        if not query:
+            return
+
+        queries = cls.objects.filter(query=query)
+        changes = {'count': F('count') + 1, 'last_searched_at': timezone.now()}
+        if queries.update(**changes):
+            return
+        try:
+            with transaction.atomic():
+                cls.objects.create(query=query, count=1, last_searched_at=timezone.now())
+        except IntegrityError:
+            queries.update(**changes)
@@ -0,0 +1,29 @@
+from django import template
+
+from zomato_search.zomato_core.classes.timing import timed
+
+register = template.Library()
+
+
+class TimedNode(template.Node):
+    def __init__(self, phase: str, nodelist: template.NodeList):
+        self.phase = phase
+        self.nodelist = nodelist
+
+    def render(self, context):
+        with timed(self.phase):
+            return self.nodelist.render(context)
+
+
+@register.tag('timed')
+def do_timed(parser, token):
+    """
+    Records rendering its content as a phase of the request timings:
+    {% timed "form" %}...{% endtimed %}
+    """
+    bits = token.split_contents()
+    if len(bits) != 2 or bits[1][0] not in '"\'' or bits[1][0] != bits[1][-1]:
+        raise template.TemplateSyntaxError(f'{bits[0]} takes the quoted name of a phase')
+    nodelist = parser.parse(('endtimed',))
+    parser.delete_first_token()
+    return TimedNode(bits[1][1:-1], nodelist)
@@ -0,0 +1,129 @@
+import pytest
+from django.core.cache import cache
+from django.urls import reverse
+
+from zomato_search.zomato_core.classes import zomato_handler
+from zomato_search.zomato_core.classes.catalog import CATALOG, FACET_INDEX
+from zomato_search.zomato_core.classes.zomato_handler import SEARCH_CACHE, PREFETCH_CACHE
+from zomato_search.zomato_core.models import Review, RestaurantReviewStats
+from zomato_search.users.tests.factories import UserFactory
+from zomato_search.zomato_core.tests.test_catalog import restaurant_payload, search_payload
+
+pytestmark = pytest.mark.django_db
+
+
+def restaurant(id):
+    return {
+        'id': str(id),
+        'name': f'Restaurant {id}',
+        'url': f'https://www.zomato.com/{id}?utm_source=api',
+        'cuisines': 'Pizza',
+        'location': {'locality': 'Indiranagar', 'address': '1 Main Road'},
+        'user_rating': {'aggregate_rating': '4.1'},
+    }
+
+
+class FakeAPI:
+    def search(self, start, **kwargs):
+        ids = range(start, min(start + 20, 45))
+        return {'results_found': 45, 'results_start': start, 'results_shown': len(ids),
+                'restaurants': [{'restaurant': restaurant(id)} for id in ids]}
+
+    def restaurant(self, res_id):
+        return dict(restaurant(res_id), photos_url='https://www.zomato.com/photos?utm_source=api')
+
+
+@pytest.fixture(autouse=True)
+def api(monkeypatch, client, user):
+    cache.clear()
+    SEARCH_CACHE.clear()
+    PREFETCH_CACHE.clear()
+    monkeypatch.setattr(zomato_handler, 'get_client', FakeAPI)
+    monkeypatch.setattr(zomato_handler.ZomatoHandler, 'prefetch', lambda self, **kwargs: None)
+    client.force_login(user)
+    return client
+
+
+class TestSearchAPI:
+    def test_pages_with_cursors(self, client):
+        response = client.get(reverse('v1:search'), {'cuisines': '55', 'fields': 'id,name,url'})
+
+        data = response.json()
+        assert data['count'] == 45
+        assert data['previous'] is None
+        assert data['results'][0] == {'id': 0, 'name': 'Restaurant 0', 'url': 'https://www.zomato.com/0'}
+
+        data = client.get(data['next']).json()
+        assert data['results'][0]['id'] == 20
+
+        data = client.get(data['next']).json()
+        assert [item['id'] for item in data['results']] == list(range(40, 45))
+        assert data['next'] is None
+        assert data['previous'] is not None
+
+    def test_needs_criteria_and_valid_cursor(self, client):
+        assert client.get(reverse('v1:search')).status_code == 400
+        assert client.get(reverse('v1:search'), {'cuisines': '55', 'cursor': 'nope'}).status_code == 404
+
+    def test_etag(self, client):
+        response = client.get(reverse('v1:search'), {'cuisines': '55'})
+
+        assert response.status_code == 200
+        response = client.get(reverse('v1:search'), {'cuisines': '55'}, HTTP_IF_NONE_MATCH=response['ETag'])
+        assert response.status_code == 304
+
+    def test_requires_login(self, client):
+        client.logout()
+
+        assert client.get(reverse('v1:search'), {'cuisines': '55'}).status_code == 403
+
+
+class TestFacetSearchAPI:
+    @pytest.fixture(autouse=True)
+    def mirror(self):
+        FACET_INDEX.clear()
+        CATALOG.ingest(search_payload(restaurant_payload(1, 'Pizza Place', rating='3.5'),
+                                      restaurant_payload(2, 'Pizza Hut', rating='4.5')), 'cuisines', [55])
+        CATALOG.ingest(search_payload(restaurant_payload(2, 'Pizza Hut', rating='4.5')), 'types', [7])
+        yield
+        FACET_INDEX.clear()
+
+    def test_combines_dimensions_with_counts(self, client):
+        CATALOG.mark_synced('cuisines', [55])
+        CATALOG.mark_synced('types', [7])
+
+        data = client.get(reverse('v1:search'), {'cuisines': '55', 'types': '7', 'fields': 'id'}).json()
+
+        assert data['results'] == [{'id': 2}]
+        assert data['facets'] == {'cuisines': {'55': 1}, 'categories': {}, 'types': {'7': 1}}
+
+        data = client.get(reverse('v1:search'), {'cuisines': '55', 'match_all': 'true', 'fields': 'id'}).json()
+
+        assert data['results'] == [{'id': 2}, {'id': 1}]
+        assert data['facets']['types'] == {'7': 1}
+
+    def test_needs_mirrored_facets_and_no_query(self, client):
+        assert client.get(reverse('v1:search'), {'cuisines': '55', 'types': '7'}).status_code == 503
+
+        CATALOG.mark_synced('cuisines', [55])
+        CATALOG.mark_synced('types', [7])
+        assert client.get(reverse('v1:search'), {'cuisines': '55', 'types': '7', 'q': 'pizza'}).status_code == 400
+
+
+class TestRestaurantAPI:
+    def test_details(self, client):
+        RestaurantReviewStats.objects.create(restaurant_id=7, count=2, total=7, rating_3=1, rating_4=1)
+
+        data = client.get(reverse('v1:restaurant', kwargs={'id': 7})).json()
+
+        assert data['photos_url'] == 'https://www.zomato.com/photos'
+        assert (data['review_count'], data['review_average']) == (2, 3.5)
+
+    def test_reviews_newest_first(self, client):
+        reviews = [Review.objects.create(user=UserFactory(), restaurant_id=7, text='Good', rating=4)
+                   for _ in range(3)]
+
+        data = client.get(reverse('v1:restaurant_reviews', kwargs={'id': 7}), {'fields': 'id'}).json()
+
+        assert data['results'] == [{'id': review.id} for review in reversed(reviews)]
+        assert data['next'] is None
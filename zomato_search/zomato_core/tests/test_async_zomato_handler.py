@@ -0,0 +1,118 @@
+import asyncio
+from typing import List, Tuple
+
+import pytest
+from django.core.cache import cache
+
+from zomato_search.zomato_core.classes import zomato_handler
+from zomato_search.zomato_core.classes.catalog import CATALOG
+from zomato_search.zomato_core.classes.zomato_handler import AsyncZomatoHandler, SEARCH_CACHE, PREFETCH_CACHE, \
+    NoSearchCriteriaException
+from zomato_search.zomato_core.tests.test_cache import ImmediatePool
+from zomato_search.zomato_core.tests.test_catalog import restaurant_payload, search_payload
+
+pytestmark = pytest.mark.django_db
+
+
+class FakeAsyncAPI:
+    def __init__(self):
+        self.calls = []  # type: List[Tuple]
+        self.closed = False
+
+    async def search(self, **kwargs):
+        self.calls.append(('search', kwargs))
+        return {'results_shown': 0, 'results_start': kwargs['start'], 'restaurants': []}
+
+    async def restaurant(self, res_id):
+        self.calls.append(('restaurant', res_id))
+        # Yields to the loop like a real request.
+        await asyncio.sleep(0)
+        return {'id': res_id}
+
+    async def close(self):
+        self.closed = True
+
+
+class FakeSyncAPI:
+    def search(self, **kwargs):
+        return {'results_shown': 0, 'results_start': kwargs['start'], 'restaurants': []}
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    cache.clear()
+    SEARCH_CACHE.clear()
+    PREFETCH_CACHE.clear()
+
+
+def run(coroutine):
+    return asyncio.get_event_loop().run_until_complete(coroutine)
+
+
+class TestAsyncZomatoHandler:
+    def test_search_shares_normalized_cache(self):
+        api = FakeAsyncAPI()
+        handler = AsyncZomatoHandler(api=api)
+
+        run(handler.search(q=' Pizza', cuisines=['55', '1']))
+        run(handler.search(q='pizza', cuisines=['1,55']))
+
+        assert api.calls == [('search', {'q': 'pizza', 'cuisines': '1,55', 'entity_type': 'city',
+                                         'entity_id': AsyncZomatoHandler.CITY_ID, 'start': 0})]
+
+    def test_search_requires_criteria(self):
+        with pytest.raises(NoSearchCriteriaException):
+            run(AsyncZomatoHandler(api=FakeAsyncAPI()).search(q='pizza'))
+
+    def test_restaurant_details_cached(self):
+        api = FakeAsyncAPI()
+        handler = AsyncZomatoHandler(api=api)
+
+        run(handler.get_restaurant_details(1))
+
+        assert run(handler.get_restaurant_details(1)) == {'id': 1}
+        assert len(api.calls) == 1
+
+    def test_search_reads_the_mirror(self):
+        api = FakeAsyncAPI()
+        CATALOG.ingest(search_payload(restaurant_payload(1, 'Pizza Place')), 'cuisines', [55])
+        CATALOG.mark_synced('cuisines', [55])
+
+        response = run(AsyncZomatoHandler(api=api).search(cuisines=['55']))
+
+        assert [item['restaurant']['id'] for item in response['restaurants']] == [1]
+        assert api.calls == []
+
+    def test_search_serves_prefetched_pages(self, monkeypatch):
+        api = FakeAsyncAPI()
+        handler = AsyncZomatoHandler(api=api)
+        handler.sync.api = FakeSyncAPI()
+        pool = ImmediatePool()
+        monkeypatch.setattr(zomato_handler, 'get_executor', lambda name: pool)
+
+        handler.prefetch(q='pizza', cuisines=['1'], results_found=60, depth=1)
+        run(handler.search(q='pizza', cuisines=['1'], start=20))
+
+        assert [key[3] for key, in pool.submitted] == [20]
+        assert api.calls == []
+
+    def test_concurrent_lookups_share_one_request(self):
+        api = FakeAsyncAPI()
+        handler = AsyncZomatoHandler(api=api)
+
+        async def look_up():
+            return await asyncio.gather(*(handler.get_restaurant_details(1) for _ in range(3)))
+
+        assert run(look_up()) == [{'id': 1}] * 3
+        assert api.calls == [('restaurant', 1)]
+
+    def test_context_manager_closes_client(self):
+        api = FakeAsyncAPI()
+
+        async def use():
+            async with AsyncZomatoHandler(api=api):
+                pass
+
+        run(use())
+
+        assert api.closed
@@ -0,0 +1,204 @@
+import time
+
+import pytest
+from django.core.cache import cache
+
+from zomato_search.zomato_core.classes import cache as cache_module, zomato_handler
+from zomato_search.zomato_core.classes.cache import ZomatoCache, LRUCache, StaleWhileRevalidateCache
+from zomato_search.zomato_core.classes.zomato_client import ZomatoAPIException
+from zomato_search.zomato_core.classes.zomato_handler import ZomatoHandler, REFERENCE_CACHES, SEARCH_CACHE, \
+    PREFETCH_CACHE, DETAILS_CACHE, NoSearchCriteriaException
+
+pytestmark = pytest.mark.django_db
+
+
+class FakeAPI:
+    def __init__(self):
+        self.calls = 0
+
+    def cuisines(self, city_id):
+        self.calls += 1
+        return {'cuisines': [{'cuisine': {'cuisine_id': 1, 'cuisine_name': 'American'}}]}
+
+    def restaurant(self, res_id):
+        self.calls += 1
+        if res_id < 0:
+            raise ZomatoAPIException('Invalid restaurant')
+        return {'id': res_id}
+
+    def search(self, **kwargs):
+        self.calls += 1
+        return {'results_shown': 0, 'results_start': kwargs['start'], 'restaurants': []}
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    cache.clear()
+    SEARCH_CACHE.clear()
+    PREFETCH_CACHE.clear()
+    for reference_cache in REFERENCE_CACHES.values():
+        reference_cache.stats.reset()
+
+
+@pytest.fixture
+def handler() -> ZomatoHandler:
+    handler = ZomatoHandler()
+    handler.api = FakeAPI()
+    return handler
+
+
+class TestZomatoCache:
+    def test_get_or_set_counts_hits_and_misses(self):
+        zomato_cache = ZomatoCache('test', timeout=60)
+
+        assert zomato_cache.get_or_set('key', lambda: 'value') == 'value'
+        assert zomato_cache.get_or_set('key', lambda: 'other') == 'value'
+        assert zomato_cache.stats.as_dict() == {'hits': 1, 'misses': 1, 'hit_rate': 0.5}
+
+    def test_version_change_misses(self, settings):
+        zomato_cache = ZomatoCache('test', timeout=60)
+        zomato_cache.set('key', 'value')
+
+        settings.ZOMATO_CACHE_VERSION += 1
+
+        assert zomato_cache.get('key') is None
+
+
+class TestLRUCache:
+    def test_evicts_least_recently_used(self):
+        lru_cache = LRUCache(max_entries=2, timeout=60)
+        lru_cache.set('a', 1)
+        lru_cache.set('b', 2)
+        lru_cache.get('a')
+        lru_cache.set('c', 3)
+
+        assert lru_cache.get('b') is None
+        assert lru_cache.get('a') == 1
+        assert len(lru_cache) == 2
+
+    def test_expired_entries_are_misses(self):
+        lru_cache = LRUCache(max_entries=2, timeout=0)
+        lru_cache.set('a', 1)
+
+        assert lru_cache.get('a') is None
+
+
+class ImmediateExecutor:
+    def submit(self, fn, *args):
+        fn(*args)
+
+
+class TestStaleWhileRevalidateCache:
+    def test_fresh_entry_is_not_refreshed(self):
+        details_cache = StaleWhileRevalidateCache('test', soft_timeout=60, hard_timeout=120)
+        details_cache.get_or_set(1, lambda: 'first')
+
+        assert details_cache.get_or_set(1, lambda: 'second') == 'first'
+        assert details_cache.refreshes == 0
+
+    def test_stale_entry_is_served_then_refreshed(self, monkeypatch):
+        monkeypatch.setattr(cache_module, 'get_executor', lambda name: ImmediateExecutor())
+        details_cache = StaleWhileRevalidateCache('test', soft_timeout=60, hard_timeout=120)
+        details_cache.set(1, (time.time() - 61, 'stale'))
+
+        assert details_cache.get_or_set(1, lambda: 'fresh') == 'stale'
+        assert details_cache.refreshes == 1
+        assert details_cache.get_or_set(1, lambda: 'newer') == 'fresh'
+
+    def test_failed_refresh_keeps_stale_entry(self, monkeypatch):
+        def fail():
+            raise ValueError('upstream down')
+
+        monkeypatch.setattr(cache_module, 'get_executor', lambda name: ImmediateExecutor())
+        details_cache = StaleWhileRevalidateCache('test', soft_timeout=60, hard_timeout=120)
+        details_cache.set(1, (time.time() - 61, 'stale'))
+
+        assert details_cache.get_or_set(1, fail) == 'stale'
+        assert details_cache.get(1)[1] == 'stale'
+
+
+class TestReferenceData:
+    def test_cuisines_fetched_once(self, handler: ZomatoHandler):
+        first = handler.get_cuisines()
+        second = handler.get_cuisines()
+
+        assert first == second
+        assert handler.api.calls == 1
+        assert ZomatoHandler.cache_stats()['cuisines']['hits'] == 1
+
+    def test_invalidate(self, handler: ZomatoHandler):
+        handler.get_cuisines()
+        ZomatoHandler.invalidate_reference_data('cuisines')
+        handler.get_cuisines()
+
+        assert handler.api.calls == 2
+
+
+class TestRestaurantDetails:
+    def test_many_fetches_only_uncached(self, handler: ZomatoHandler):
+        DETAILS_CACHE.store(1, {'id': 1, 'cached': True})
+
+        restaurants = handler.get_many_restaurant_details([1, 2, 3])
+
+        assert restaurants == {1: {'id': 1, 'cached': True}, 2: {'id': 2}, 3: {'id': 3}}
+        assert handler.api.calls == 2
+        assert handler.get_restaurant_details(2) == {'id': 2}
+        assert handler.api.calls == 2
+
+    def test_many_leaves_out_failures(self, handler: ZomatoHandler):
+        assert handler.get_many_restaurant_details([1, -1]) == {1: {'id': 1}}
+
+
+class TestSearch:
+    def test_search_key_is_normalized(self):
+        first = ZomatoHandler.search_key(' Pizza ', cuisines=['55', '1'])
+        second = ZomatoHandler.search_key('pizza', cuisines=['1,55'], start='0')
+
+        assert first == second == ('pizza', 'cuisines', ('1', '55'), 0, ZomatoHandler.CITY_ID)
+
+    def test_search_key_requires_criteria(self):
+        with pytest.raises(NoSearchCriteriaException):
+            ZomatoHandler.search_key('pizza')
+
+    def test_equivalent_searches_share_upstream_call(self, handler: ZomatoHandler):
+        handler.search(q='Pizza', cuisines=['1', '55'])
+        handler.search(q='pizza ', cuisines=['55', '1'])
+
+        assert handler.api.calls == 1
+
+
+class ImmediatePool:
+    def __init__(self):
+        self.submitted = []
+
+    def submit(self, fn, *args):
+        self.submitted.append(args)
+        fn(*args)
+
+
+class TestPrefetch:
+    @pytest.fixture
+    def pool(self, monkeypatch) -> ImmediatePool:
+        pool = ImmediatePool()
+        monkeypatch.setattr(zomato_handler, 'get_executor', lambda name: pool)
+        return pool
+
+    def test_next_page_is_served_from_prefetch(self, handler: ZomatoHandler, pool: ImmediatePool):
+        handler.prefetch(q='pizza', cuisines=['1'], results_found=60, depth=2)
+
+        assert [key[3] for key, in pool.submitted] == [20, 40]
+        calls = handler.api.calls
+        handler.search(q='pizza', cuisines=['1'], start=20)
+        assert handler.api.calls == calls
+
+    def test_stops_at_results_found(self, handler: ZomatoHandler, pool: ImmediatePool):
+        handler.prefetch(q='pizza', cuisines=['1'], start=20, results_found=30, depth=3)
+
+        assert pool.submitted == []
+
+    def test_respects_quota(self, handler: ZomatoHandler, pool: ImmediatePool, settings):
+        settings.ZOMATO_PREFETCH_QUOTA_SHARE = 0
+
+        handler.prefetch(q='pizza', cuisines=['1'], results_found=60)
+
+        assert pool.submitted == []
@@ -0,0 +1,115 @@
+from typing import Iterator
+
+import pytest
+
+from zomato_search.zomato_core.classes.catalog import Catalog, FACET_INDEX
+from zomato_search.zomato_core.classes.text_index import TEXT_INDEX
+from zomato_search.zomato_core.models import Restaurant, Cuisine
+
+pytestmark = pytest.mark.django_db
+
+
+def restaurant_payload(id, name, rating='4.1', cuisines='Pizza, Italian'):
+    return {'restaurant': {
+        'id': str(id),
+        'name': name,
+        'url': f'https://www.zomato.com/{id}?utm_source=api',
+        'thumb': '',
+        'cuisines': cuisines,
+        'has_online_delivery': 1,
+        'average_cost_for_two': 800,
+        'phone_numbers': '080 1234',
+        'location': {'locality': 'Indiranagar', 'address': '1 Main Road'},
+        'user_rating': {'aggregate_rating': rating},
+    }}
+
+
+def search_payload(*restaurants):
+    return {'results_found': len(restaurants), 'results_start': 0, 'results_shown': len(restaurants),
+            'restaurants': list(restaurants)}
+
+
+@pytest.fixture
+def catalog() -> Iterator[Catalog]:
+    TEXT_INDEX.clear()
+    FACET_INDEX.clear()
+    yield Catalog()
+    TEXT_INDEX.clear()
+    FACET_INDEX.clear()
+
+
+class TestCatalog:
+    def test_ingest_upserts_changed_rows(self, catalog: Catalog):
+        catalog.ingest(search_payload(restaurant_payload(1, 'Pizza Place')))
+        catalog.ingest(search_payload(restaurant_payload(1, 'Pizza Palace'), restaurant_payload(2, 'Slice')))
+
+        assert list(Restaurant.objects.order_by('id').values_list('name', flat=True)) == ['Pizza Palace', 'Slice']
+
+    def test_search_needs_synced_facets(self, catalog: Catalog):
+        catalog.ingest(search_payload(restaurant_payload(1, 'Pizza Place')), 'cuisines', [55])
+
+        assert catalog.search('', 'cuisines', ('55',), 0, 4) is None
+
+        catalog.mark_synced('cuisines', [55])
+        response = catalog.search('', 'cuisines', ('55',), 0, 4)
+
+        assert response is not None
+        assert response['results_found'] == 1
+        assert response['restaurants'][0]['restaurant']['name'] == 'Pizza Place'
+
+    def test_search_ranks_by_relevance(self, catalog: Catalog):
+        catalog.ingest(search_payload(restaurant_payload(1, 'Slice Place', rating='4.5'),
+                                      restaurant_payload(2, 'Pizza Hut', rating='3.5'),
+                                      restaurant_payload(3, 'Dosa Corner', cuisines='South Indian')),
+                       'cuisines', [55])
+        catalog.mark_synced('cuisines', [55])
+
+        response = catalog.search('pizza', 'cuisines', ('55',), 0, 4)
+
+        assert response is not None
+        assert [item['restaurant']['id'] for item in response['restaurants']] == [2, 1]
+
+    def test_search_ranks_within_the_facet_before_the_limit(self, catalog: Catalog, settings):
+        settings.ZOMATO_TEXT_SEARCH_LIMIT = 1
+        catalog.ingest(search_payload(restaurant_payload(1, 'Pizza Hut')), 'cuisines', [56])
+        catalog.ingest(search_payload(restaurant_payload(2, 'Slice', cuisines='Pizza')), 'cuisines', [55])
+        catalog.mark_synced('cuisines', [55])
+
+        response = catalog.search('pizza', 'cuisines', ('55',), 0, 4)
+
+        assert response is not None
+        assert [item['restaurant']['id'] for item in response['restaurants']] == [2]
+
+    def test_search_without_local_match_falls_back(self, catalog: Catalog):
+        catalog.ingest(search_payload(restaurant_payload(1, 'Pizza Place')), 'cuisines', [55])
+        catalog.mark_synced('cuisines', [55])
+
+        assert catalog.search('biryani', 'cuisines', ('55',), 0, 4) is None
+
+    def test_facet_search_combines_dimensions(self, catalog: Catalog):
+        catalog.ingest(search_payload(restaurant_payload(1, 'Pizza Place', rating='3.5'),
+                                      restaurant_payload(2, 'Pizza Hut', rating='4.5')), 'cuisines', [55])
+        catalog.ingest(search_payload(restaurant_payload(2, 'Pizza Hut', rating='4.5'),
+                                      restaurant_payload(3, 'Cafe', rating='4.0')), 'types', [7])
+
+        assert catalog.facet_search({'cuisines': ['55'], 'types': ['7']}) is None
+
+        catalog.mark_synced('cuisines', [55])
+        catalog.mark_synced('types', [7])
+        response = catalog.facet_search({'cuisines': ['55'], 'types': ['7']})
+
+        assert response is not None
+        assert [item['restaurant']['id'] for item in response['restaurants']] == [2]
+        assert response['facets'] == {'cuisines': {55: 1}, 'categories': {}, 'types': {7: 1}}
+
+        response = catalog.facet_search({'cuisines': ['55']})
+
+        assert response is not None
+        assert [item['restaurant']['id'] for item in response['restaurants']] == [2, 1]
+        assert response['facets']['types'] == {7: 1}
+
+    def test_upsert_facets_renames(self, catalog: Catalog):
+        catalog.upsert_facets('cuisines', {'cuisines': [{'cuisine': {'cuisine_id': 55, 'cuisine_name': 'Pizza'}}]})
+        catalog.upsert_facets('cuisines', {'cuisines': [{'cuisine': {'cuisine_id': 55, 'cuisine_name': 'Pizzas'}}]})
+
+        assert Cuisine.objects.get(id=55).name == 'Pizzas'
@@ -0,0 +1,51 @@
+import json
+import pickle
+from pathlib import Path
+
+from zomato_search.zomato_core.classes import codec
+from zomato_search.zomato_core.classes.codec import project, project_search, project_restaurant, dumps, loads, \
+    CompactSerializer
+from zomato_search.zomato_core.classes.mapping import SEARCH_RESTAURANT, RESTAURANT_DETAILS
+
+FIXTURES = Path(__file__).resolve().parent.parent / 'fixtures' / 'upstream'
+
+
+def load(name):
+    return json.loads((FIXTURES / f'{name}.json').read_text())
+
+
+class TestProjection:
+    def test_project_paths(self):
+        item = {'name': 'Toit', 'R': {'res_id': 1}, 'location': {'locality': 'Indiranagar', 'city': 'Bangalore'}}
+
+        assert project(item, {'name', 'location.locality', 'location.zipcode', 'user_rating.votes'}) == {
+            'name': 'Toit', 'location': {'locality': 'Indiranagar'}}
+
+    def test_projected_payloads_map_alike(self):
+        search, restaurant = load('search'), load('restaurant')
+
+        assert SEARCH_RESTAURANT.map_many(project_search(search)['restaurants']) == \
+            SEARCH_RESTAURANT.map_many(search['restaurants'])
+        assert RESTAURANT_DETAILS.map(project_restaurant(restaurant)) == RESTAURANT_DETAILS.map(restaurant)
+        assert project_search(search)['results_found'] == search['results_found']
+
+
+class TestCodec:
+    def test_round_trip(self, settings):
+        settings.ZOMATO_CODEC_COMPRESS_MIN_BYTES = 100
+
+        assert loads(dumps({'small': 1})) == {'small': 1}
+        assert dumps({'small': 1})[:1] == codec.PICKLED
+        assert dumps(load('search'))[:1] == codec.COMPRESSED
+        assert loads(dumps(load('search'))) == load('search')
+
+    def test_reads_plain_pickles(self):
+        assert loads(pickle.dumps({'a': 1})) == {'a': 1}
+
+    def test_projected_compressed_page_is_smaller(self):
+        search = load('search')
+
+        raw = len(json.dumps(search).encode())
+        compact = len(CompactSerializer({'COMPRESS_MIN_BYTES': 1024}).dumps(project_search(search)))
+
+        assert compact < raw / 4
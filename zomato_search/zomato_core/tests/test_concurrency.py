@@ -0,0 +1,38 @@
+import threading
+import time
+
+import pytest
+
+from zomato_search.zomato_core.classes.concurrency import fan_out, get_executor
+
+
+def test_get_executor_is_shared():
+    assert get_executor('fanout') is get_executor('fanout')
+
+
+def test_fan_out_runs_producers_concurrently():
+    def slow(value):
+        time.sleep(0.2)
+        return value
+
+    started = time.perf_counter()
+    results, timings = fan_out({'a': lambda: slow(1), 'b': lambda: slow(2)})
+
+    assert results == {'a': 1, 'b': 2}
+    assert time.perf_counter() - started < 0.35
+    assert set(timings) == {'a', 'b'}
+
+
+def test_inline_producers_run_on_calling_thread():
+    results, _ = fan_out({'db': threading.get_ident, 'http': threading.get_ident}, inline=['db'])
+
+    assert results['db'] == threading.get_ident()
+    assert results['http'] != threading.get_ident()
+
+
+def test_producer_errors_propagate():
+    def fail():
+        raise ValueError('boom')
+
+    with pytest.raises(ValueError):
+        fan_out({'a': fail})
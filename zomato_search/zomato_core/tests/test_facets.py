@@ -0,0 +1,37 @@
+from zomato_search.zomato_core.classes.facets import BitsetIndex, iter_bits, count_bits
+
+
+def build() -> BitsetIndex:
+    index = BitsetIndex(['cuisines', 'types'])
+    index.add('cuisines', 1, [10, 20, 30])
+    index.add('cuisines', 2, [20, 40])
+    index.add('types', 7, [20, 30, 40])
+    return index
+
+
+class TestBitsetIndex:
+    def test_bits(self):
+        assert list(iter_bits(0b10110)) == [1, 2, 4]
+        assert count_bits(0b10110) == 3
+
+    def test_match_any_and_all(self):
+        index = build()
+
+        assert index.restaurant_ids(index.match({'cuisines': [1, 2]})) == [10, 20, 30, 40]
+        assert index.restaurant_ids(index.match({'cuisines': [1, 2]}, match_all=True)) == [20]
+        assert index.restaurant_ids(index.match({'cuisines': [1], 'types': [7]})) == [20, 30]
+        assert index.match({'cuisines': [3]}) == 0
+
+    def test_counts(self):
+        index = build()
+
+        assert index.counts('cuisines') == {1: 3, 2: 2}
+        assert index.counts('cuisines', index.match({'types': [7]})) == {1: 2, 2: 2}
+
+    def test_order_and_paging(self):
+        index = BitsetIndex(['cuisines'])
+        index.register([30, 10, 20])
+        index.add('cuisines', 1, [10, 20, 30])
+
+        assert index.restaurant_ids(index.match({'cuisines': [1]}), start=1, limit=1) == [10]
+        assert len(index) == 3
@@ -0,0 +1,64 @@
+import json
+from pathlib import Path
+
+import pytest
+
+from zomato_search.zomato_core.classes.entities import Restaurant, Cuisine
+from zomato_search.zomato_core.classes.mapping import Mapping, Field, CUISINE, TYPE, SEARCH_RESTAURANT, \
+    RESTAURANT_DETAILS
+
+FIXTURES = Path(__file__).resolve().parent.parent / 'fixtures' / 'upstream'
+
+
+def load(name):
+    return json.loads((FIXTURES / f'{name}.json').read_text())
+
+
+class TestEntities:
+    def test_slots(self):
+        restaurant = Restaurant(id=1, name='Toit')
+
+        assert not hasattr(restaurant, '__dict__')
+        assert restaurant.as_dict()['name'] == 'Toit'
+        assert restaurant.rating is None
+        with pytest.raises(TypeError):
+            Restaurant(colour='red')
+
+
+class TestMapping:
+    def test_reference_data(self):
+        cuisines = CUISINE.map_many(load('cuisines')['cuisines'])
+
+        assert cuisines[0] == Cuisine(id=1, name='Afghan')
+        assert TYPE.map_many(load('establishments')['establishments'])[0].name == 'Quick Bites'
+
+    def test_search_restaurant(self):
+        item = load('search')['restaurants'][0]
+        restaurant = SEARCH_RESTAURANT.map(item)
+
+        assert restaurant.id == item['restaurant']['id']
+        assert restaurant.url == item['restaurant']['url'].split('?')[0]
+        assert restaurant.location == item['restaurant']['location']['locality']
+        assert restaurant.address is None
+
+    def test_restaurant_details(self):
+        details = load('restaurant')
+        restaurant = RESTAURANT_DETAILS.map(details)
+
+        assert restaurant.rating == details['user_rating']['aggregate_rating']
+        assert restaurant.thumbnail_url == details['featured_image']
+        del details['id']
+        assert RESTAURANT_DETAILS.map(details).name == details['name']
+
+    def test_required_and_optional_fields(self):
+        rating = Field('user_rating.aggregate_rating', float, required=False)
+        mapping = Mapping(Restaurant, {'name': 'name', 'rating': rating})
+
+        assert mapping.map({'name': 'Toit'}).rating is None
+        assert mapping.map({'name': 'Toit', 'user_rating': {'aggregate_rating': '4.5'}}).rating == 4.5
+        with pytest.raises(KeyError):
+            mapping.map({})
+
+    def test_unknown_field(self):
+        with pytest.raises(TypeError):
+            Mapping(Cuisine, {'colour': 'colour'})
@@ -0,0 +1,115 @@
+import asyncio
+
+import pytest
+from django.urls import reverse
+from prometheus_client import CollectorRegistry, REGISTRY
+
+from zomato_search.zomato_core.classes.metrics import HandlerStatsCollector, instrumented
+from zomato_search.zomato_core.classes.zomato_client import ZomatoClient, ZomatoAPIException
+from zomato_search.zomato_core.tests.test_zomato_client import HOST, RecordingAdapter
+
+pytestmark = pytest.mark.django_db
+
+
+def sample(name, **labels):
+    return REGISTRY.get_sample_value(name, labels) or 0
+
+
+class TestInstrumented:
+    def test_records_calls_and_errors(self):
+        @instrumented('test_sync')
+        def fail(value):
+            if value:
+                raise ValueError(value)
+            return value
+
+        assert fail(0) == 0
+        with pytest.raises(ValueError):
+            fail(1)
+
+        assert sample('zomato_handler_seconds_count', method='test_sync') == 2
+        assert sample('zomato_handler_errors_total', method='test_sync', exception='ValueError') == 1
+        assert sample('zomato_handler_in_flight', method='test_sync') == 0
+
+    def test_wraps_coroutine_functions(self):
+        @instrumented('test_async')
+        async def succeed():
+            assert sample('zomato_handler_in_flight', method='test_async') == 1
+            return 'done'
+
+        assert asyncio.iscoroutinefunction(succeed)
+        assert asyncio.get_event_loop().run_until_complete(succeed()) == 'done'
+        assert sample('zomato_handler_seconds_count', method='test_async') == 1
+        assert sample('zomato_handler_in_flight', method='test_async') == 0
+
+
+class TestUpstreamMetrics:
+    def test_client_records_requests_by_endpoint(self):
+        client = ZomatoClient(key='secret', host=HOST)
+        before = sample('zomato_upstream_seconds_count', endpoint='/categories')
+        errors = sample('zomato_upstream_errors_total', endpoint='/categories')
+
+        client.session.mount(HOST, RecordingAdapter(payload={'categories': []}))
+        client.category()
+        client.session.mount(HOST, RecordingAdapter(status_code=500))
+        with pytest.raises(ZomatoAPIException):
+            client.category()
+
+        assert sample('zomato_upstream_seconds_count', endpoint='/categories') == before + 2
+        assert sample('zomato_upstream_errors_total', endpoint='/categories') == errors + 1
+
+
+class TestHandlerStats:
+    def test_exports_cache_and_pool_stats(self):
+        caches = {
+            'cuisines': {'hits': 3, 'misses': 1, 'hit_rate': 0.75},
+            'restaurant': {'hits': 0, 'misses': 2, 'hit_rate': 0.0, 'refreshes': 1},
+            'flights': {'leaders': 2, 'local_waits': 5, 'remote_waits': 0},
+        }
+        pool = {'pool_size': 10, 'requests': 7, 'errors': 0, 'in_flight': 1, 'max_in_flight': 4,
+                'connections_opened': 3, 'idle_connections': 2}
+        registry = CollectorRegistry()
+        registry.register(HandlerStatsCollector(lambda: dict(caches), lambda: pool))
+
+        assert registry.get_sample_value('zomato_cache_hits_total', {'cache': 'cuisines'}) == 3
+        assert registry.get_sample_value('zomato_cache_misses_total', {'cache': 'restaurant'}) == 2
+        assert registry.get_sample_value('zomato_cache_refreshes_total', {'cache': 'restaurant'}) == 1
+        assert registry.get_sample_value('zomato_cache_refreshes_total', {'cache': 'cuisines'}) is None
+        assert registry.get_sample_value('zomato_flight_calls_total', {'role': 'local_waits'}) == 5
+        assert registry.get_sample_value('zomato_upstream_pool_size') == 10
+        assert registry.get_sample_value('zomato_upstream_max_in_flight') == 4
+
+
+class TestMetricsView:
+    def test_exposes_view_timings_to_allowed_ips(self, client, settings):
+        settings.ZOMATO_METRICS_ALLOWED_IPS = ['127.0.0.1']
+        client.get(reverse('home'))
+
+        response = client.get(reverse('metrics'))
+
+        assert response.status_code == 200
+        assert response['Content-Type'].startswith('text/plain')
+        assert b'zomato_view_seconds_count' in response.content
+        assert sample('zomato_view_seconds_count', view='home', method='GET', status='302') >= 1
+
+    def test_exposes_handler_stats(self, client, settings):
+        settings.ZOMATO_METRICS_ALLOWED_IPS = ['127.0.0.1']
+
+        response = client.get(reverse('metrics'))
+
+        assert b'zomato_cache_hits_total{cache="cuisines"}' in response.content
+        assert b'zomato_upstream_pool_size ' in response.content
+
+    def test_other_addresses_need_the_token(self, client, settings):
+        settings.ZOMATO_METRICS_ALLOWED_IPS = []
+        settings.ZOMATO_METRICS_TOKEN = 'scrape'
+
+        assert client.get(reverse('metrics')).status_code == 403
+        assert client.get(reverse('metrics'), HTTP_AUTHORIZATION='Bearer wrong').status_code == 403
+        assert client.get(reverse('metrics'), HTTP_AUTHORIZATION='Bearer scrape').status_code == 200
+
+    def test_closed_without_token_or_allowed_ips(self, client, settings):
+        settings.ZOMATO_METRICS_ALLOWED_IPS = []
+        settings.ZOMATO_METRICS_TOKEN = ''
+
+        assert client.get(reverse('metrics'), HTTP_AUTHORIZATION='Bearer ').status_code == 403
@@ -0,0 +1,79 @@
+import threading
+import time
+
+import pytest
+from django.core.cache import cache
+
+from zomato_search.zomato_core.classes.singleflight import SingleFlight
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    cache.clear()
+
+
+class TestSingleFlight:
+    def test_concurrent_callers_share_one_fetch(self):
+        flights = SingleFlight(timeout=5, poll_interval=0.01)
+        calls = []
+
+        def fetch():
+            calls.append(1)
+            time.sleep(0.2)
+            return 'result'
+
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(flights.do('key', fetch))) for _ in range(5)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert results == ['result'] * 5
+        assert len(calls) == 1
+        assert flights.stats() == {'leaders': 1, 'local_waits': 4, 'remote_waits': 0}
+
+    def test_waits_for_result_of_lock_holder(self):
+        flights = SingleFlight(timeout=5, poll_interval=0.01)
+        other_process = SingleFlight(timeout=5, poll_interval=0.01)
+        lock_taken = threading.Event()
+
+        def slow_fetch():
+            lock_taken.set()
+            time.sleep(0.2)
+            return 'remote'
+
+        thread = threading.Thread(target=other_process.do, args=('key', slow_fetch))
+        thread.start()
+        lock_taken.wait()
+
+        assert flights.do('key', lambda: 'local') == 'remote'
+        assert flights.stats()['remote_waits'] == 1
+        thread.join()
+
+    def test_errors_reach_every_waiter_and_release_key(self):
+        flights = SingleFlight(timeout=5, poll_interval=0.01)
+
+        def fail():
+            raise ValueError('upstream down')
+
+        with pytest.raises(ValueError):
+            flights.do('key', fail)
+
+        assert flights.do('key', lambda: 'recovered') == 'recovered'
+
+    def test_rereads_result_published_as_lock_is_released(self, monkeypatch):
+        flights = SingleFlight(timeout=5, poll_interval=0.01)
+        get = cache.get
+
+        def racing_get(key, *args, **kwargs):
+            value = get(key, *args, **kwargs)
+            if key.endswith(':result') and value is None:
+                # The lock holder publishes and releases right after this read.
+                cache.set(key, 'remote')
+            return value
+
+        monkeypatch.setattr(cache, 'add', lambda *args, **kwargs: False)
+        monkeypatch.setattr(cache, 'get', racing_get)
+
+        assert flights.do('key', lambda: 'local') == 'remote'
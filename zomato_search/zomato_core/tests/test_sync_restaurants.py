@@ -0,0 +1,77 @@
+from io import StringIO
+
+import pytest
+from django.core.cache import cache
+from django.core.management import call_command
+
+from zomato_search.zomato_core.classes.catalog import CATALOG, FACET_INDEX
+from zomato_search.zomato_core.classes.text_index import TEXT_INDEX
+from zomato_search.zomato_core.classes.zomato_handler import ZomatoHandler
+from zomato_search.zomato_core.management.commands import sync_restaurants
+from zomato_search.zomato_core.models import Restaurant
+from zomato_search.zomato_core.tests.test_catalog import restaurant_payload
+
+pytestmark = pytest.mark.django_db
+
+
+class FakeHandler(ZomatoHandler):
+    # results_found per cuisine
+    FOUND = {55: 3, 56: 5000}
+
+    def __init__(self):
+        pass
+
+    def get_cuisines(self):
+        return {'cuisines': [{'cuisine': {'cuisine_id': id, 'cuisine_name': f'Cuisine {id}'}} for id in self.FOUND]}
+
+    def _search(self, q, dimension, ids, start, city_id):
+        facet_id = int(ids[0])
+        found = self.FOUND[facet_id]
+        shown = max(0, min(self.PAGE_SIZE, found - start))
+        return {'results_found': found, 'results_start': start, 'results_shown': shown,
+                'restaurants': [restaurant_payload(facet_id * 10000 + start + index, 'Restaurant')
+                                for index in range(shown)]}
+
+
+@pytest.fixture(autouse=True)
+def clear_indexes(monkeypatch):
+    cache.clear()
+    TEXT_INDEX.clear()
+    FACET_INDEX.clear()
+    monkeypatch.setattr(sync_restaurants, 'ZomatoHandler', FakeHandler)
+    yield
+    TEXT_INDEX.clear()
+    FACET_INDEX.clear()
+
+
+def test_only_complete_facets_are_marked_mirrored():
+    out = StringIO()
+
+    call_command('sync_restaurants', dimension=['cuisines'], stdout=out)
+
+    assert CATALOG.covers('cuisines', ['55'])
+    assert not CATALOG.covers('cuisines', ['56'])
+    assert 'cuisines 56: 100 of 5000 restaurants, truncated' in out.getvalue()
+
+
+def test_answers_respects_local_search_switch(settings):
+    call_command('sync_restaurants', dimension=['cuisines'], stdout=StringIO())
+
+    assert CATALOG.answers('cuisines', ['55'])
+    settings.ZOMATO_LOCAL_SEARCH = False
+    assert not CATALOG.answers('cuisines', ['55'])
+
+
+# The index drops bits on commit.
+@pytest.mark.django_db(transaction=True)
+def test_full_resync_drops_restaurants_that_left_the_facet(monkeypatch):
+    call_command('sync_restaurants', dimension=['cuisines'], stdout=StringIO())
+    assert FACET_INDEX.get().restaurant_ids(FACET_INDEX.get().match({'cuisines': [55]})) == [550000, 550001, 550002]
+
+    monkeypatch.setattr(FakeHandler, 'FOUND', {55: 2, 56: 5000})
+    out = StringIO()
+    call_command('sync_restaurants', dimension=['cuisines'], max_age=0, stdout=out)
+
+    assert 'cuisines 55: 2 restaurants, 1 dropped' in out.getvalue()
+    assert sorted(Restaurant.objects.filter(cuisines=55).values_list('id', flat=True)) == [550000, 550001]
+    assert FACET_INDEX.get().restaurant_ids(FACET_INDEX.get().match({'cuisines': [55]})) == [550000, 550001]
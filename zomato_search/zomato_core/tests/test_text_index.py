@@ -0,0 +1,48 @@
+from zomato_search.zomato_core.classes.text_index import InvertedIndex, tokenize
+
+
+def build(*documents) -> InvertedIndex:
+    index = InvertedIndex()
+    index.build(documents)
+    return index
+
+
+class TestInvertedIndex:
+    def test_tokenize(self):
+        assert tokenize('Chicken Biryani, North-Indian') == ['chicken', 'biryani', 'north', 'indian']
+
+    def test_all_tokens_must_match(self):
+        index = build((1, 'Biryani House', 'Biryani', 'Koramangala'),
+                      (2, 'Meghana Foods', 'Biryani, Andhra', 'Indiranagar'))
+
+        assert index.search('biryani indiranagar') == [2]
+        assert index.search('pizza') == []
+        assert index.search('') == []
+
+    def test_last_token_matches_prefix(self):
+        index = build((1, 'Truffles', 'Burger', 'Koramangala'), (2, 'Burma Burma', 'Burmese', 'Indiranagar'))
+
+        assert sorted(index.search('bur')) == [1, 2]
+        assert index.search('burg') == [1]
+        assert index.search('bur koramangala') == []
+
+    def test_name_matches_rank_first(self):
+        index = build((1, 'Dosa Camp', 'Pizza', 'Jayanagar'), (2, 'Pizza Bakery', 'Italian', 'Jayanagar'))
+
+        assert index.search('pizza') == [2, 1]
+        assert index.search('pizza', limit=1) == [2]
+
+    def test_candidates_filter_before_the_limit(self):
+        index = build((1, 'Dosa Camp', 'Pizza', 'Jayanagar'), (2, 'Pizza Bakery', 'Italian', 'Jayanagar'))
+
+        assert index.search('pizza', limit=1, candidates={1}) == [1]
+        assert index.search('pizza', candidates={3}) == []
+
+    def test_add_replaces_document(self):
+        index = build((1, 'Pizza Place', 'Pizza', 'Indiranagar'))
+
+        index.add([(1, 'Dosa Place', 'South Indian', 'Indiranagar')])
+
+        assert index.search('pizza') == []
+        assert index.search('dosa') == [1]
+        assert len(index) == 1
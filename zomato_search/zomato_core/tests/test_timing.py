@@ -0,0 +1,81 @@
+import json
+import logging
+
+import pytest
+from django.template import engines
+from django.urls import reverse
+
+from zomato_search.zomato_core.classes import timing
+from zomato_search.zomato_core.classes.concurrency import fan_out
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def timings():
+    timings = timing.RequestTimings()
+    token = timing.CURRENT.set(timings)
+    yield timings
+    timing.CURRENT.reset(token)
+
+
+class TestRequestTimings:
+    def test_header_lists_phases_with_counts(self):
+        timings = timing.RequestTimings()
+        timings.add('db', 0.002)
+        timings.add('db', 0.0015)
+        timings.add('upstream', 0.25)
+
+        metrics = timings.header().split(', ')
+
+        assert metrics[:2] == ['db;dur=3.5;desc="2x"', 'upstream;dur=250.0']
+        assert metrics[2].startswith('total;dur=')
+
+    def test_nested_phases_count_once(self, timings):
+        with timing.timed('template'):
+            with timing.timed('template'):
+                pass
+
+        assert timings.as_dict()['template']['count'] == 1
+
+    def test_nothing_is_recorded_outside_requests(self):
+        with timing.timed('template'):
+            timing.record('upstream', 1)
+
+        assert timing.CURRENT.get() is None
+
+    def test_fan_out_records_into_the_callers_timings(self, timings):
+        fan_out({'upstream': lambda: timing.record('upstream', 0.1)})
+
+        assert timings.as_dict()['upstream'] == {'ms': 100.0, 'count': 1}
+
+    def test_timed_tag_records_its_content(self, timings):
+        template = engines['django'].from_string('{% load timing %}{% timed "form" %}form{% endtimed %}')
+
+        assert template.render({}) == 'form'
+        assert set(timings.as_dict()) == {'form', 'template', 'total'}
+
+
+class TestServerTimingMiddleware:
+    def test_sends_phase_breakdown(self, client, user, settings):
+        settings.ZOMATO_SLOW_REQUEST_SECONDS = 0
+        client.force_login(user)
+
+        response = client.get(reverse('home'))
+
+        phases = [metric.split(';')[0] for metric in response['Server-Timing'].split(', ')]
+        assert phases == ['db', 'template', 'total']
+
+    def test_logs_slow_requests(self, client, settings, caplog):
+        settings.ZOMATO_SERVER_TIMING = False
+        settings.ZOMATO_SLOW_REQUEST_SECONDS = 1e-9
+
+        with caplog.at_level(logging.WARNING, logger='zomato_search.zomato_core.middleware'):
+            response = client.get(reverse('home'))
+
+        assert not response.has_header('Server-Timing')
+        message = caplog.records[-1].getMessage()
+        assert message.startswith('Slow request ')
+        logged = json.loads(message[len('Slow request '):])
+        assert (logged['path'], logged['status']) == (reverse('home'), 302)
+        assert 'total' in logged['phases']
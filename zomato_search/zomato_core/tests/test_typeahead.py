@@ -0,0 +1,76 @@
+import threading
+import time
+
+import pytest
+from django.urls import reverse
+
+from zomato_search.zomato_core.classes.typeahead import PrefixIndex, Typeahead, TYPEAHEAD
+from zomato_search.zomato_core.models import SearchQuery, Cuisine
+
+
+class TestPrefixIndex:
+    def test_completes_any_word(self):
+        index = PrefixIndex([('Pizza Hut', 'restaurant', 3.9), ('Pizza', 'cuisine', 12), ('Hutong', 'restaurant', 4.2)])
+
+        assert [suggestion['text'] for suggestion in index.complete('hut', 5)] == ['Hutong', 'Pizza Hut']
+        assert index.complete('PIZZA h', 5) == [{'text': 'Pizza Hut', 'kind': 'restaurant'}]
+        assert index.complete('  ', 5) == []
+
+    def test_ranks_by_weight_within_kind(self):
+        index = PrefixIndex([('biryani', 'query', 10), ('biryani house', 'query', 2), ('Biryani', 'cuisine', 40)])
+
+        assert index.complete('bir', 2) == [{'text': 'Biryani', 'kind': 'cuisine'},
+                                            {'text': 'biryani', 'kind': 'query'}]
+
+
+class TestFirstBuild:
+    def test_concurrent_first_requests_build_once(self, monkeypatch):
+        builds = []
+
+        def suggestions():
+            builds.append(1)
+            time.sleep(0.05)
+            return [('Pizza Hut', 'restaurant', 3.9)]
+
+        typeahead = Typeahead()
+        monkeypatch.setattr(typeahead, '_suggestions', suggestions)
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(typeahead.complete('piz', 5))) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert len(builds) == 1
+        assert results == [[{'text': 'Pizza Hut', 'kind': 'restaurant'}]] * 4
+
+
+@pytest.mark.django_db
+class TestTypeahead:
+    @pytest.fixture(autouse=True)
+    def clear_typeahead(self):
+        TYPEAHEAD.clear()
+        yield
+        TYPEAHEAD.clear()
+
+    def test_record_counts_normalized_queries(self):
+        SearchQuery.record('Chicken  Biryani')
+        SearchQuery.record('chicken biryani')
+        SearchQuery.record(' ')
+
+        assert list(SearchQuery.objects.values_list('query', 'count')) == [('chicken biryani', 2)]
+
+    def test_suggestions_view(self, client, user, settings):
+        settings.ZOMATO_TYPEAHEAD_MIN_QUERY_COUNT = 2
+        Cuisine.objects.create(id=7, name='Chinese')
+        SearchQuery.record('chilli chicken')
+        SearchQuery.record('chilli chicken')
+        SearchQuery.record('chicken 65')
+        client.force_login(user)
+
+        response = client.get(reverse('search_suggestions'), {'q': 'ch'})
+
+        assert response.json()['suggestions'] == [
+            {'text': 'chilli chicken', 'kind': 'query'},
+            {'text': 'Chinese', 'kind': 'cuisine'},
+        ]
@@ -0,0 +1,159 @@
+import json
+
+import pytest
+from django.conf import settings
+from django.db import IntegrityError
+from django.urls import reverse
+
+from zomato_search.users.tests.factories import UserFactory
+from zomato_search.zomato_core.classes import zomato_handler
+from zomato_search.zomato_core.classes.catalog import CATALOG
+from zomato_search.zomato_core.classes.zomato_client import ZomatoAPIException
+from zomato_search.zomato_core.classes.zomato_handler import SEARCH_CACHE
+from zomato_search.zomato_core.models import Review, RestaurantReviewStats
+from zomato_search.zomato_core.tests.test_catalog import restaurant_payload, search_payload
+from zomato_search.zomato_core.views import RestaurantDetails
+
+pytestmark = pytest.mark.django_db
+
+
+class TestRestaurantDetails:
+    def test_get_reviews_pages_newest_first(self, django_assert_num_queries):
+        users = [UserFactory(username=f'user{index}') for index in range(3)]
+        reviews = [Review.objects.create(user=user, restaurant_id=1, text='Good', rating=4) for user in users]
+        Review.objects.create(user=users[0], restaurant_id=2, text='Other', rating=1)
+        view = RestaurantDetails()
+        view.REVIEWS_PAGE_SIZE = 2
+
+        with django_assert_num_queries(1):
+            page, before = view._get_reviews(1)
+            usernames = [review.user.username for review in page]
+
+        assert [review.id for review in page] == [reviews[2].id, reviews[1].id]
+        assert usernames == ['user2', 'user1']
+        assert before == reviews[1].id
+
+        page, before = view._get_reviews(1, before=before)
+
+        assert [review.id for review in page] == [reviews[2].id, reviews[1].id, reviews[0].id]
+        assert before is None
+
+    def test_save_review_updates_existing(self, user: settings.AUTH_USER_MODEL):
+        view = RestaurantDetails()
+
+        view._save_review(1, {'rating': 2, 'text': 'Bad'}, user)
+        view._save_review(1, {'rating': 5, 'text': 'Better now'}, user)
+
+        review = Review.objects.get(restaurant_id=1, user=user)
+        assert (review.rating, review.text) == (5, 'Better now')
+
+
+class TestReviewUpsert:
+    def test_upsert_creates_then_replaces(self, user: settings.AUTH_USER_MODEL):
+        assert Review.objects.upsert(user, 1, 'Bad', 2) == (True, None)
+        assert Review.objects.upsert(user, 1, 'Better now', 5) == (False, 2)
+
+        review = Review.objects.get(user=user, restaurant_id=1)
+        assert (review.text, review.rating) == ('Better now', 5)
+
+    def test_duplicate_reviews_are_rejected(self, user: settings.AUTH_USER_MODEL):
+        Review.objects.create(user=user, restaurant_id=1, text='Good', rating=4)
+
+        with pytest.raises(IntegrityError):
+            Review.objects.create(user=user, restaurant_id=1, text='Again', rating=4)
+
+
+class TestRestaurantReviewStats:
+    def test_save_review_keeps_stats(self):
+        view = RestaurantDetails()
+        first, second = UserFactory(username='first'), UserFactory(username='second')
+
+        view._save_review(1, {'rating': '2', 'text': 'Bad'}, first)
+        view._save_review(1, {'rating': '4', 'text': 'Good'}, second)
+        view._save_review(1, {'rating': '5', 'text': 'Better now'}, first)
+
+        stats = RestaurantReviewStats.objects.get(restaurant_id=1)
+        assert (stats.count, stats.total, stats.average) == (2, 9, 4.5)
+        assert stats.histogram == {1: 0, 2: 0, 3: 0, 4: 1, 5: 1}
+
+    def test_rebuild_matches_reviews(self, user: settings.AUTH_USER_MODEL):
+        Review.objects.create(user=user, restaurant_id=1, text='Good', rating=4)
+        Review.objects.create(user=UserFactory(username='other'), restaurant_id=1, text='Meh', rating=3)
+
+        assert RestaurantReviewStats.rebuild() == 1
+
+        stats = RestaurantReviewStats.objects.get(restaurant_id=1)
+        assert (stats.count, stats.total, stats.rating_3, stats.rating_4) == (2, 7, 1, 1)
+
+    def test_rebuild_many_restaurants(self, user: settings.AUTH_USER_MODEL):
+        # More rows than SQLite allows in one compound insert.
+        Review.objects.bulk_create(Review(user=user, restaurant_id=id, text='Good', rating=4) for id in range(600))
+
+        assert RestaurantReviewStats.rebuild() == 600
+
+
+class TestSearchExport:
+    @pytest.fixture(autouse=True)
+    def api(self, monkeypatch, client, user, settings):
+        settings.ZOMATO_EXPORT_FETCH_AHEAD = 2
+        SEARCH_CACHE.clear()
+        monkeypatch.setattr(zomato_handler, 'get_client', FakeSearchAPI)
+        client.force_login(user)
+
+    def test_streams_every_page_as_ndjson(self, client):
+        response = client.get(reverse('search_export'), {'cuisines': '55'})
+
+        rows = [json.loads(line) for line in b''.join(response.streaming_content).decode().splitlines()]
+        assert [row['id'] for row in rows] == list(range(45))
+        assert rows[0]['url'] == 'https://www.zomato.com/0'
+
+    def test_streams_csv(self, client):
+        response = client.get(reverse('search_export'), {'cuisines': '55', 'format': 'csv'})
+
+        lines = b''.join(response.streaming_content).decode().splitlines()
+        assert lines[0].startswith('id,name,url,')
+        assert lines[1].startswith('0,Restaurant 0,https://www.zomato.com/0,')
+        assert len(lines) == 46
+
+    def test_rejects_bad_requests(self, client):
+        assert client.get(reverse('search_export')).status_code == 400
+        assert client.get(reverse('search_export'), {'cuisines': '55', 'format': 'xml'}).status_code == 400
+
+    def test_first_page_failure_is_an_error_status(self, client, monkeypatch):
+        monkeypatch.setattr(FakeSearchAPI, 'FAIL_FROM', 0)
+
+        assert client.get(reverse('search_export'), {'cuisines': '55'}).status_code == 502
+
+    def test_marks_exports_cut_short(self, client, monkeypatch):
+        monkeypatch.setattr(FakeSearchAPI, 'FAIL_FROM', 20)
+
+        response = client.get(reverse('search_export'), {'cuisines': '55'})
+
+        rows = [json.loads(line) for line in b''.join(response.streaming_content).decode().splitlines()]
+        assert [row['id'] for row in rows[:-1]] == list(range(20))
+        assert 'error' in rows[-1]
+
+    def test_reads_the_catalog_only_when_local_search_is_on(self, client, settings):
+        CATALOG.ingest(search_payload(restaurant_payload(1000, 'Mirrored')), 'cuisines', [55])
+        CATALOG.mark_synced('cuisines', [55])
+
+        rows = b''.join(client.get(reverse('search_export'), {'cuisines': '55'}).streaming_content).splitlines()
+        assert [json.loads(row)['id'] for row in rows] == [1000]
+
+        settings.ZOMATO_LOCAL_SEARCH = False
+        rows = b''.join(client.get(reverse('search_export'), {'cuisines': '55'}).streaming_content).splitlines()
+        assert len(rows) == 45
+
+
+class FakeSearchAPI:
+    # Pages from this start on fail.
+    FAIL_FROM = None
+
+    def search(self, start, **kwargs):
+        if self.FAIL_FROM is not None and start >= self.FAIL_FROM:
+            raise ZomatoAPIException('/search failed: 503')
+        ids = range(start, min(start + 20, 45))
+        return {'results_found': 45, 'results_start': start, 'results_shown': len(ids), 'restaurants': [
+            {'restaurant': {'id': id, 'name': f'Restaurant {id}', 'url': f'https://www.zomato.com/{id}?utm_source=api'}}
+            for id in ids
+        ]}
@@ -0,0 +1,68 @@
+import json
+
+import pytest
+from requests import Response
+from requests.adapters import BaseAdapter
+
+from zomato_search.zomato_core.classes.zomato_client import ZomatoClient, ZomatoAPIException, get_client
+
+HOST = 'https://zomato.test/api/v2.1'
+
+
+class RecordingAdapter(BaseAdapter):
+    def __init__(self, status_code=200, payload=None):
+        super().__init__()
+        self.status_code = status_code
+        self.payload = payload or {}
+        self.requests = []
+
+    def send(self, request, **kwargs):
+        self.requests.append((request, kwargs))
+        response = Response()
+        response.status_code = self.status_code
+        response._content = json.dumps(self.payload).encode()
+        response.request = request
+        return response
+
+    def close(self):
+        pass
+
+
+@pytest.fixture
+def client() -> ZomatoClient:
+    return ZomatoClient(key='secret', host=HOST, pool_size=2, timeout=(1, 2))
+
+
+class TestZomatoClient:
+    def test_get_sends_key_and_timeout(self, client: ZomatoClient):
+        adapter = RecordingAdapter(payload={'cuisines': []})
+        client.session.mount(HOST, adapter)
+
+        assert client.cuisines(city_id=4) == {'cuisines': []}
+        request, kwargs = adapter.requests[0]
+        assert request.url == f'{HOST}/cuisines?city_id=4'
+        assert request.headers['user-key'] == 'secret'
+        assert kwargs['timeout'] == (1, 2)
+
+    def test_per_call_timeout(self, client: ZomatoClient):
+        adapter = RecordingAdapter()
+        client.session.mount(HOST, adapter)
+
+        client.restaurant(res_id=1, timeout=5)
+
+        assert adapter.requests[0][1]['timeout'] == 5
+
+    def test_http_error_raises_and_is_counted(self, client: ZomatoClient):
+        client.session.mount(HOST, RecordingAdapter(status_code=503))
+
+        with pytest.raises(ZomatoAPIException):
+            client.category()
+
+        stats = client.stats()
+        assert stats['requests'] == 1
+        assert stats['errors'] == 1
+        assert stats['in_flight'] == 0
+
+
+def test_get_client_is_shared():
+    assert get_client() is get_client()
@@ -1,13 +1,19 @@
 from django.urls import path
 
 from zomato_search.zomato_core.views import RestaurantDetails, Home, SearchCuisine, SearchResults, SearchCategory, \
-    SearchType
+    SearchType, RestaurantBatchDetails, RestaurantComparison, SearchSuggestions, SearchExport, \
+    Metrics
 
 urlpatterns = [
     path('', Home.as_view(), name='home'),
     path('details/<int:id>', RestaurantDetails.as_view(), name='restaurant_details'),
+    path('details/batch/', RestaurantBatchDetails.as_view(), name='restaurant_batch_details'),
+    path('compare/', RestaurantComparison.as_view(), name='restaurant_compare'),
     path('search/cuisine/', SearchCuisine.as_view(), name='search_cuisine'),
     path('search/category/', SearchCategory.as_view(), name='search_category'),
     path('search/type/', SearchType.as_view(), name='search_type'),
-    path('search-results/', SearchResults.as_view(), name='search_results')
+    path('search/suggestions/', SearchSuggestions.as_view(), name='search_suggestions'),
+    path('search/export/', SearchExport.as_view(), name='search_export'),
+    path('search-results/', SearchResults.as_view(), name='search_results'),
+    path('metrics', Metrics.as_view(), name='metrics'),
 ]
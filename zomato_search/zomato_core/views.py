@@ -1,20 +1,38 @@
+import csv
+import json
+import logging
 from abc import abstractmethod
-from typing import Dict, List
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
 
 from boto.connection import HTTPRequest
 from django.contrib import messages
 from django.contrib.auth.mixins import LoginRequiredMixin
 from django.core.handlers.wsgi import WSGIRequest
-from django.http import HttpResponseRedirect, HttpResponse
+from django.conf import settings
+from django.db import transaction
+from django.http import HttpResponseRedirect, HttpResponse, JsonResponse, HttpResponseBadRequest, \
+    HttpResponseForbidden, StreamingHttpResponse
 from django.shortcuts import render
+from django.utils.crypto import constant_time_compare
+from django.utils.decorators import method_decorator
 from django.views import View
+from prometheus_client import CONTENT_TYPE_LATEST
 
 from zomato_search.users.models import User
-from zomato_search.zomato_core.classes.entities import Restaurant, Cuisine, Category, Type
+from zomato_search.zomato_core.api.serializers import RestaurantSerializer
+from zomato_search.zomato_core.classes.concurrency import fan_out
+from zomato_search.zomato_core.classes.entities import Restaurant
+from zomato_search.zomato_core.classes.mapping import CUISINE, CATEGORY, TYPE, SEARCH_RESTAURANT, RESTAURANT_DETAILS
+from zomato_search.zomato_core.classes.metrics import render as render_metrics
+from zomato_search.zomato_core.classes.quota import QUOTA
+from zomato_search.zomato_core.classes.typeahead import TYPEAHEAD
+from zomato_search.zomato_core.classes.zomato_client import ZomatoAPIException
 from zomato_search.zomato_core.classes.zomato_handler import ZomatoHandler, NoSearchCriteriaException, \
     NoMoreResultsException
 from zomato_search.zomato_core.forms.review_form import ReviewForm
-from zomato_search.zomato_core.models import Review
+from zomato_search.zomato_core.models import Review, RestaurantReviewStats, SearchQuery
+
+logger = logging.getLogger(__name__)
 
 
 class Home(LoginRequiredMixin, View):
@@ -44,15 +62,8 @@ class SearchBase(LoginRequiredMixin, View):
 
 class SearchCuisine(SearchBase):
     def get_items(self):
-        cuisines = list()
         data = self.api.get_cuisines()
-        for item in data['cuisines']:
-            cuisine = Cuisine()
-            item_dict = item['cuisine']
-            cuisine.id = item_dict['cuisine_id']
-            cuisine.name = item_dict['cuisine_name']
-            cuisines.append(cuisine)
-        return cuisines
+        return CUISINE.map_many(data['cuisines'])
 
     def get_template(self):
         return 'search_cuisine.html'
@@ -60,15 +71,8 @@ class SearchCuisine(SearchBase):
 
 class SearchCategory(SearchBase):
     def get_items(self):
-        categories = list()
         data = self.api.get_categories()
-        for item in data['categories']:
-            category = Category()
-            item_dict = item['categories']
-            category.id = item_dict['id']
-            category.name = item_dict['name']
-            categories.append(category)
-        return categories
+        return CATEGORY.map_many(data['categories'])
 
     def get_template(self):
         return 'search_category.html'
@@ -76,43 +80,46 @@ class SearchCategory(SearchBase):
 
 class SearchType(SearchBase):
     def get_items(self):
-        types = list()
         data = self.api.get_types()
-        for item in data['establishments']:
-            type = Type()
-            item_dict = item['establishment']
-            type.id = item_dict['id']
-            type.name = item_dict['name']
-            types.append(type)
-        return types
+        return TYPE.map_many(data['establishments'])
 
     def get_template(self):
         return 'search_type.html'
 
 
+class SearchSuggestions(LoginRequiredMixin, View):
+    def get(self, request: WSGIRequest) -> JsonResponse:
+        return JsonResponse({'suggestions': TYPEAHEAD.complete(request.GET.get('q', ''))})
+
+
 class SearchResults(LoginRequiredMixin, View):
     def post(self, request):
         by = request.POST.get('by')
         ids = request.POST.getlist('ids')
         search_text = request.POST.get('search_dish')
 
+        handler = ZomatoHandler()
         try:
             if 'next' not in request.POST and 'previous' not in request.POST:
                 kwargs = {by: ids}
-                data = ZomatoHandler().search(q=search_text, **kwargs)
-                next_value = data['results_shown'] + 1
+                data = handler.search(q=search_text, **kwargs)
+                SearchQuery.record(search_text)
+                next_value = data['results_shown']
                 previous_value = 0
             elif 'next' in request.POST:
                 kwargs = {by: ids, 'start': request.POST.get('next_page')}
-                data = ZomatoHandler().search(q=search_text, **kwargs)
+                data = handler.search(q=search_text, **kwargs)
                 next_value = int(request.POST.get('next_page')) + data['results_shown']
                 previous_value = int(request.POST.get('previous_page')) + 20
             else:
                 kwargs = {by: ids, 'start': int(request.POST.get('previous_page')) - 20}
-                data = ZomatoHandler().search(q=search_text, **kwargs)
+                data = handler.search(q=search_text, **kwargs)
                 next_value = int(request.POST.get('next_page')) - data['results_shown']
                 previous_value = int(request.POST.get('previous_page')) - 20
 
+            if data['results_shown'] == ZomatoHandler.PAGE_SIZE:
+                handler.prefetch(q=search_text, results_found=data['results_found'], **kwargs)
+
         except NoSearchCriteriaException:
             message = 'Select at least one item'
             messages.error(request, message)
@@ -138,21 +145,7 @@ class SearchResults(LoginRequiredMixin, View):
         return context
 
     def _get_restaurants(self, data):
-        restaurants = list()
-        for item in data['restaurants']:
-            restaurant = Restaurant()
-            item = item['restaurant']
-            restaurant.id = item['id']
-            restaurant.name = item['name']
-            restaurant.url = item['url'].split('?')[0]
-            restaurant.has_online_delivery = item['has_online_delivery']
-            restaurant.cuisines = item['cuisines']
-            restaurant.average_cost_for_two = item['average_cost_for_two']
-            restaurant.phone_numbers = item['phone_numbers']
-            restaurant.thumbnail_url = item['thumb']
-            restaurant.location = item['location']['locality']
-            restaurants.append(restaurant)
-        return restaurants
+        return SEARCH_RESTAURANT.map_many(data['restaurants'])
 
     def _get_next(self, data):
         if data['results_shown'] == 0:
@@ -163,9 +156,93 @@ class SearchResults(LoginRequiredMixin, View):
         return data['results_start'] != 0
 
 
+class Echo:
+    """File-like object keeping the last line written, for csv.writer."""
+
+    def __init__(self):
+        self.line = ''
+
+    def write(self, value: str) -> None:
+        self.line = value
+
+
+class SearchExport(LoginRequiredMixin, View):
+    """
+    Every restaurant matching a search, streamed as NDJSON or CSV rows
+    while later result pages are still being fetched.
+    """
+    CONTENT_TYPES = {'ndjson': 'application/x-ndjson', 'csv': 'text/csv'}
+    INCOMPLETE = 'Export incomplete, the Zomato API stopped answering.'
+
+    def get(self, request: WSGIRequest) -> HttpResponse:
+        format = request.GET.get('format', 'ndjson')
+        if format not in self.CONTENT_TYPES:
+            return HttpResponseBadRequest(f'format must be one of {", ".join(self.CONTENT_TYPES)}')
+
+        kwargs = {dimension: request.GET.getlist(dimension) for dimension in ('categories', 'cuisines', 'types')}
+        handler = ZomatoHandler()
+        try:
+            handler.search_key(**kwargs)
+        except NoSearchCriteriaException:
+            return HttpResponseBadRequest('Pass categories, cuisines or types to export')
+
+        try:
+            restaurants = handler.iter_search(q=request.GET.get('q', ''), **kwargs)
+        except ZomatoAPIException as e:
+            logger.warning('Export of %s failed before streaming', kwargs, exc_info=True)
+            status = 503 if self._quota_exhausted(e) else 502
+            return HttpResponse('The Zomato API did not answer, try again later.', status=status)
+
+        rows = (RestaurantSerializer(item).data for item in restaurants)
+        lines = self._csv(rows) if format == 'csv' else self._ndjson(rows)
+        response = StreamingHttpResponse(lines, content_type=self.CONTENT_TYPES[format])
+        response['Content-Disposition'] = f'attachment; filename="restaurants.{format}"'
+        return response
+
+    @staticmethod
+    def _quota_exhausted(e: ZomatoAPIException) -> bool:
+        response = getattr(e.__cause__, 'response', None)
+        return QUOTA.remaining() == 0 or getattr(response, 'status_code', None) == 429
+
+    # Once streaming the 200 is sent, so a later page failing ends the body
+    # with a row saying the export is incomplete.
+    @staticmethod
+    def _ndjson(rows: Iterable[Dict]) -> Iterator[str]:
+        try:
+            for row in rows:
+                yield json.dumps(row) + '\n'
+        except ZomatoAPIException:
+            logger.warning('Export stopped mid-stream', exc_info=True)
+            yield json.dumps({'error': SearchExport.INCOMPLETE}) + '\n'
+
+    @staticmethod
+    def _csv(rows: Iterable[Dict]) -> Iterator[str]:
+        columns = list(RestaurantSerializer().fields)
+        echo = Echo()
+        writer = csv.writer(echo)
+
+        def line(row: Dict) -> str:
+            writer.writerow([row.get(column, '') for column in columns])
+            return echo.line
+
+        yield line(dict(zip(columns, columns)))
+        try:
+            for row in rows:
+                yield line(row)
+        except ZomatoAPIException:
+            logger.warning('Export stopped mid-stream', exc_info=True)
+            yield line({columns[0]: 'ERROR', columns[1]: SearchExport.INCOMPLETE})
+
+
+# Reviews are written in their own short transaction, not one held for the
+# whole request including the upstream call.
+@method_decorator(transaction.non_atomic_requests, name='dispatch')
 class RestaurantDetails(LoginRequiredMixin, View):
+    REVIEWS_PAGE_SIZE = 20
+
     def get(self, request: WSGIRequest, id: int) -> HttpResponse:
-        context = self._get_context(id)
+        before = request.GET.get('before')
+        context = self._get_context(id, before=int(before) if before and before.isdigit() else None)
         return render(request, 'restaurant_details.html', context)
 
     def post(self, request: WSGIRequest, id: int) -> HttpResponse:
@@ -175,39 +252,134 @@ class RestaurantDetails(LoginRequiredMixin, View):
             context = self._get_context(id)
             return render(request, 'restaurant_details.html', context)
 
-    def _get_reviews(self, restaurant_id: int) -> List[Review]:
-        return list(Review.objects.filter(restaurant_id=restaurant_id))
+    def _get_reviews(self, restaurant_id: int, before: Optional[int] = None) -> Tuple[List[Review], Optional[int]]:
+        """
+        Newest reviews first: those down to ``before`` followed by one page
+        keyed on it, so "Load more" extends the list rather than replacing
+        it. Both are index range scans on (restaurant_id, id). Returns the
+        reviews and the id to pass as ``before`` for the next page.
+        """
+        reviews = Review.objects.filter(restaurant_id=restaurant_id).select_related('user') \
+            .only('id', 'text', 'rating', 'user__username').order_by('-id')
+        shown = []  # type: List[Review]
+        if before is not None:
+            shown = list(reviews.filter(id__gte=before))
+            reviews = reviews.filter(id__lt=before)
+        page = list(reviews[:self.REVIEWS_PAGE_SIZE + 1])
+        if len(page) > self.REVIEWS_PAGE_SIZE:
+            page = page[:self.REVIEWS_PAGE_SIZE]
+            return shown + page, page[-1].id
+        return shown + page, None
 
     def _get_restaurant_details(self, restaurant_id: int) -> Restaurant:
         details = ZomatoHandler().get_restaurant_details(restaurant_id)
-        restaurant = Restaurant()
-        restaurant.id = restaurant_id
-        restaurant.name = details['name']
-        restaurant.url = details['url'].split('?')[0]
-        restaurant.has_online_delivery = details['has_online_delivery']
-        restaurant.cuisines = details['cuisines']
-        restaurant.average_cost_for_two = details['average_cost_for_two']
-        restaurant.phone_numbers = details['phone_numbers']
-        restaurant.thumbnail_url = details['featured_image']
-        restaurant.address = details['location']['address']
-        restaurant.rating = details['user_rating']['aggregate_rating']
-        restaurant.photos_url = details['photos_url']
-        restaurant.menu_url = details['menu_url']
+        return self.build_restaurant(restaurant_id, details)
 
+    @staticmethod
+    def build_restaurant(restaurant_id: int, details: Dict) -> Restaurant:
+        restaurant = RESTAURANT_DETAILS.map(details)
+        restaurant.id = restaurant_id
         return restaurant
 
     def _save_review(self, id: int, data: Dict, user: User) -> None:
-        defaults = {'rating': data['rating'],
-                    'text': data['text']}
-        kwargs = {'restaurant_id': id, 'user': user}
+        rating = int(data['rating'])
+        with transaction.atomic():
+            created, previous_rating = Review.objects.upsert(user, id, data['text'], rating)
+            if created or previous_rating is not None:
+                RestaurantReviewStats.record(id, rating, previous_rating=previous_rating)
+            else:
+                RestaurantReviewStats.rebuild([id])
 
-        Review.objects.update_or_create(defaults=defaults, **kwargs)
+    def _get_review_stats(self, restaurant_id: int) -> Optional[RestaurantReviewStats]:
+        return RestaurantReviewStats.objects.filter(restaurant_id=restaurant_id).first()
 
-    def _get_context(self, restaurant_id: int) -> Dict:
-        reviews = self._get_reviews(restaurant_id)
+    def _get_context(self, restaurant_id: int, before: Optional[int] = None) -> Dict:
+        producers = {
+            'restaurant': lambda: self._get_restaurant_details(restaurant_id),
+            'reviews': lambda: self._get_reviews(restaurant_id, before=before),
+            'review_stats': lambda: self._get_review_stats(restaurant_id),
+        }
+        results, timings = fan_out(producers, inline=['reviews', 'review_stats'])
+        logger.debug('Restaurant %s context: %s', restaurant_id,
+                     ', '.join(f'{name}={duration:.1f}ms' for name, duration in timings.items()))
+        reviews, next_reviews = results['reviews']
         context = {
-            'restaurant': self._get_restaurant_details(restaurant_id),
+            'restaurant': results['restaurant'],
             'reviews': reviews,
+            'next_reviews': next_reviews,
+            'review_stats': results['review_stats'],
             'review_form': ReviewForm()
         }
         return context
+
+
+class RestaurantBatchBase(LoginRequiredMixin, View):
+    def get(self, request: WSGIRequest) -> HttpResponse:
+        try:
+            ids = self._get_ids(request)
+        except ValueError as e:
+            return HttpResponseBadRequest(str(e))
+
+        details = ZomatoHandler().get_many_restaurant_details(ids)
+        restaurants = [RestaurantDetails.build_restaurant(id, details[id]) for id in ids if id in details]
+        self._add_review_stats(restaurants)
+        return self.render(request, ids, restaurants)
+
+    @abstractmethod
+    def render(self, request: WSGIRequest, ids: List[int], restaurants: List[Restaurant]) -> HttpResponse:
+        pass
+
+    def _get_ids(self, request: WSGIRequest) -> List[int]:
+        ids = []  # type: List[int]
+        for value in request.GET.getlist('ids'):
+            for id in value.split(','):
+                if id.strip() and int(id) not in ids:
+                    ids.append(int(id))
+        if not ids:
+            raise ValueError('Pass restaurant ids as ?ids=1,2,3')
+        if len(ids) > settings.ZOMATO_COMPARE_MAX_RESTAURANTS:
+            raise ValueError(f'At most {settings.ZOMATO_COMPARE_MAX_RESTAURANTS} restaurants at a time')
+        return ids
+
+    def _add_review_stats(self, restaurants: List[Restaurant]) -> None:
+        stats = RestaurantReviewStats.objects.filter(restaurant_id__in=[restaurant.id for restaurant in restaurants])
+        stats = {row.restaurant_id: row for row in stats}
+        for restaurant in restaurants:
+            row = stats.get(restaurant.id)
+            restaurant.review_count = row.count if row else 0
+            restaurant.review_average = row.average if row else None
+
+
+class RestaurantBatchDetails(RestaurantBatchBase):
+    def render(self, request, ids, restaurants):
+        found = {restaurant.id for restaurant in restaurants}
+        return JsonResponse({
+            'restaurants': [restaurant.as_dict() for restaurant in restaurants],
+            'missing': [id for id in ids if id not in found],
+        })
+
+
+class RestaurantComparison(RestaurantBatchBase):
+    def render(self, request, ids, restaurants):
+        return render(request, 'restaurant_compare.html', {'restaurants': restaurants})
+
+
+class Metrics(View):
+    """
+    Prometheus scrape target. Scrapers have no session, so it is open to
+    ZOMATO_METRICS_ALLOWED_IPS and to requests with the bearer token in
+    ZOMATO_METRICS_TOKEN, if set.
+    """
+
+    def get(self, request: WSGIRequest) -> HttpResponse:
+        if not self._allowed(request):
+            return HttpResponseForbidden()
+        return HttpResponse(render_metrics(), content_type=CONTENT_TYPE_LATEST)
+
+    @staticmethod
+    def _allowed(request: WSGIRequest) -> bool:
+        if request.META.get('REMOTE_ADDR') in settings.ZOMATO_METRICS_ALLOWED_IPS:
+            return True
+        token = settings.ZOMATO_METRICS_TOKEN
+        authorization = request.META.get('HTTP_AUTHORIZATION', '')
+        return bool(token) and constant_time_compare(authorization, f'Bearer {token}')